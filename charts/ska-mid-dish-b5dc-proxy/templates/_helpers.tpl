@@ -0,0 +1,18 @@
+{{/*
+Names of the B5dcProxy device server instances as a JSON list. With the default of
+one device per server the instances are named after the dishes, otherwise the dishes
+are grouped into instances of b5dcproxy.devicesPerServer devices each.
+*/}}
+{{- define "ska-mid-dish-b5dc-proxy.instances" -}}
+{{- $dishes := .Values.global.dishes | toStrings }}
+{{- $perServer := int (default 1 .Values.b5dcproxy.devicesPerServer) }}
+{{- if le $perServer 1 }}
+{{- $dishes | toJson }}
+{{- else }}
+{{- $instances := list }}
+{{- range $group := until (int (div (add (len $dishes) (sub $perServer 1)) $perServer)) }}
+{{- $instances = append $instances (printf "group%d" $group) }}
+{{- end }}
+{{- $instances | toJson }}
+{{- end }}
+{{- end }}
@@ -0,0 +1,189 @@
+"""Tango device aggregating the B5DC sensors of a fleet of B5dcProxy devices."""
+
+# pylint: disable=protected-access,invalid-name,attribute-defined-outside-init
+
+import enum
+from typing import Any, Dict, List, Set, Tuple
+
+import numpy as np
+from ska_control_model import ResultCode
+from ska_tango_base import SKABaseDevice
+from tango import AttrWriteType, CmdArgType, SpectrumAttr, UserDefaultAttrProp
+from tango.server import attribute, device_property, run
+
+from ska_mid_dish_b5dc_proxy.b5dc_aggregator_cm import (
+    AGGREGATE_PUSH_PERIOD_SEC,
+    B5dcAggregatorComponentManager,
+)
+from ska_mid_dish_b5dc_proxy.models.registers import B5DC_REGISTERS, B5DC_SNAPSHOT_FIELDS
+from ska_mid_dish_b5dc_proxy.telemetry.fleet_matrix import CONNECTION_STATE_FIELD
+
+MAX_DISHES = 256
+# Reported for an integer field, e.g. PLL lock, of a dish whose value is unknown
+UNKNOWN_INTEGER_VALUE = -1
+
+
+def _integer_column(column: np.ndarray) -> np.ndarray:
+    """Return a column of enum values as integers, unknown values as -1."""
+    return np.where(np.isnan(column), UNKNOWN_INTEGER_VALUE, column).astype(np.int32)
+
+
+class B5dcAggregator(SKABaseDevice):
+    """Fleet-wide view of the B5DC sensors of many B5dcProxy devices."""
+
+    # -----------------
+    # Device Properties
+    # -----------------
+    B5dc_dish_devices = device_property(dtype=(str,), default_value=[])
+    B5dc_aggregate_push_period = device_property(
+        dtype=float, default_value=AGGREGATE_PUSH_PERIOD_SEC
+    )
+
+    class InitCommand(SKABaseDevice.InitCommand):
+        """Initializes the attributes of the B5dcAggregator Tango device."""
+
+        # pylint: disable=unused-argument
+        def do(
+            self: SKABaseDevice.InitCommand,
+            *args: Any,
+            **kwargs: Any,
+        ) -> tuple[ResultCode, str]:
+            """
+            Initialise B5dcAggregator tango device.
+
+            :param args: positional arguments
+            :param kwargs: keyword arguments
+
+            :return: A tuple containing a return code and a string
+            """
+            self._device._create_aggregate_attributes()
+            for attr in [*self._device._aggregate_fields, "sensorMatrix"]:
+                self._device.set_change_event(attr, True, False)
+                self._device.set_archive_event(attr, True, False)
+
+            (result_code, message) = super().do()  # type: ignore
+            self._device.component_manager.start_communicating()
+            return ResultCode(result_code), message
+
+    def delete_device(self: "B5dcAggregator") -> None:
+        """Stop communicating before the device is deleted, e.g. by the Init command."""
+        if getattr(self, "component_manager", None) is not None:
+            self.component_manager.stop_communicating()
+        super().delete_device()
+
+    def create_component_manager(self: "B5dcAggregator") -> B5dcAggregatorComponentManager:
+        """
+        Create B5dcAggregator component manager.
+
+        :return: The B5dcAggregator component manager
+        """
+        return B5dcAggregatorComponentManager(
+            self.B5dc_dish_devices,
+            logger=self.logger,
+            push_period=self.B5dc_aggregate_push_period,
+            matrix_update_callback=self._matrix_updated,
+            communication_state_callback=None,
+            component_state_callback=None,
+        )
+
+    def _attribute_names(self) -> Set[str]:
+        """Return the names of the attributes of the device."""
+        return {attr.get_name() for attr in self.get_device_attr().get_attribute_list()}
+
+    def _create_aggregate_attributes(self) -> None:
+        """
+        Create a fleet-wide spectrum attribute for each register, e.g. rfTemperatureAll.
+
+        Each attribute holds one value per dish, in B5dc_dish_devices order. Enum
+        registers are reported as integers, -1 where the value is unknown.
+        """
+        existing_attributes = self._attribute_names()
+        self._aggregate_fields: Dict[str, Tuple[str, bool]] = {
+            "connectionStateAll": (CONNECTION_STATE_FIELD, True)
+        }
+        for register in B5DC_REGISTERS:
+            attribute_name = f"{register.attribute_name}All"
+            is_enum = issubclass(register.dtype, enum.Enum)
+            self._aggregate_fields[attribute_name] = (register.name, is_enum)
+            if attribute_name in existing_attributes:
+                continue
+
+            properties = UserDefaultAttrProp()
+            properties.set_description(f"{register.doc} One value per dish.")
+            if register.unit:
+                properties.set_unit(register.unit)
+            attr = SpectrumAttr(
+                attribute_name,
+                CmdArgType.DevLong if is_enum else CmdArgType.DevDouble,
+                AttrWriteType.READ,
+                MAX_DISHES,
+            )
+            attr.set_default_properties(properties)
+            self.add_attribute(attr, r_meth=self._read_aggregate_attribute)
+
+    def _aggregate_value(self, attribute_name: str) -> np.ndarray:
+        """Return the fleet-wide value of an aggregate attribute."""
+        field, is_integer = self._aggregate_fields[attribute_name]
+        column = self.component_manager.sensor_matrix.column(field)
+        return _integer_column(column) if is_integer else column
+
+    def _read_aggregate_attribute(self, attr: Any) -> None:
+        """Read a fleet-wide register attribute from the sensor matrix."""
+        attr.set_value(self._aggregate_value(attr.get_name()))
+
+    def _matrix_updated(self) -> None:
+        """Push and archive events of the fleet-wide attributes."""
+        for attribute_name in self._aggregate_fields:
+            value = self._aggregate_value(attribute_name)
+            self.push_change_event(attribute_name, value)
+            self.push_archive_event(attribute_name, value)
+        _, matrix = self.component_manager.sensor_matrix.snapshot()
+        self.push_change_event("sensorMatrix", matrix)
+        self.push_archive_event("sensorMatrix", matrix)
+
+    # ===========
+    # Attributes
+    # ===========
+    @attribute(
+        dtype=(str,),
+        max_dim_x=MAX_DISHES,
+        access=AttrWriteType.READ,
+        doc="Tango device names of the aggregated B5dcProxy devices, in the order "
+        "of the values of the fleet-wide attributes.",
+    )
+    def dishDevices(self: "B5dcAggregator") -> List[str]:
+        """Return the aggregated B5dcProxy device names."""
+        return list(self.component_manager.dish_devices)
+
+    @attribute(
+        dtype=(int,),
+        max_dim_x=MAX_DISHES,
+        access=AttrWriteType.READ,
+        doc="Connection state of each dish to its B5DC, NOT_ESTABLISHED where the "
+        "B5dcProxy is unreachable and -1 until its first snapshot.",
+    )
+    def connectionStateAll(self: "B5dcAggregator") -> np.ndarray:
+        """Return the connection state of each dish."""
+        return self._aggregate_value("connectionStateAll")
+
+    @attribute(
+        dtype=((float,),),
+        max_dim_x=len(B5DC_SNAPSHOT_FIELDS),
+        max_dim_y=MAX_DISHES,
+        access=AttrWriteType.READ,
+        doc="Dish by field matrix of the latest sensorSnapshot of each dish, NaN "
+        "where unknown. Rows follow dishDevices and columns the sensorSnapshot fields.",
+    )
+    def sensorMatrix(self: "B5dcAggregator") -> np.ndarray:
+        """Return the dish by field sensor matrix."""
+        _, matrix = self.component_manager.sensor_matrix.snapshot()
+        return matrix
+
+
+def main(args: Any = None, **kwargs: Any) -> None:
+    """Launch an instance of the B5dcAggregator Tango device."""
+    return run((B5dcAggregator,), args=args, **kwargs)
+
+
+if __name__ == "__main__":
+    main()
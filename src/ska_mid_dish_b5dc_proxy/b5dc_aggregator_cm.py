@@ -0,0 +1,137 @@
+"""Component manager aggregating the B5DC sensors of a fleet of B5dcProxy devices."""
+
+# pylint: disable=too-many-instance-attributes
+
+import logging
+from functools import partial
+from threading import Event, Thread
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import tango
+from ska_control_model import CommunicationStatus
+from ska_tango_base.base import BaseComponentManager
+
+from ska_mid_dish_b5dc_proxy.models.registers import B5DC_SNAPSHOT_FIELDS
+from ska_mid_dish_b5dc_proxy.telemetry.fleet_matrix import FleetSensorMatrix
+
+# Attribute of each B5dcProxy to which the aggregator subscribes
+SNAPSHOT_ATTRIBUTE_NAME = "sensorSnapshot"
+# Default period at which fleet-wide attributes are pushed
+AGGREGATE_PUSH_PERIOD_SEC = 1.0
+
+
+class B5dcAggregatorComponentManager(BaseComponentManager):
+    """Component manager maintaining a dish by sensor matrix of a B5dcProxy fleet."""
+
+    def __init__(
+        self: "B5dcAggregatorComponentManager",
+        dish_devices: Sequence[str],
+        logger: logging.Logger,
+        *args: Any,
+        push_period: float = AGGREGATE_PUSH_PERIOD_SEC,
+        matrix_update_callback: Optional[Callable[[], None]] = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Initialize B5dcAggregatorComponentManager.
+
+        :param dish_devices: Tango device names of the B5dcProxy devices.
+        :param logger: Logger.
+        :param push_period: Period at which matrix_update_callback is called if
+            any dish snapshot has been received since the last call.
+        :param matrix_update_callback: Called with no arguments when the fleet-wide
+            attributes should be pushed.
+        """
+        self._logger = logger
+        self._dish_devices = list(dish_devices)
+        self._push_period = push_period
+        self._matrix_update_callback = matrix_update_callback
+        self.sensor_matrix = FleetSensorMatrix(self._dish_devices, B5DC_SNAPSHOT_FIELDS)
+        self._proxies: Dict[str, tango.DeviceProxy] = {}
+        self._subscriptions: Dict[str, int] = {}
+        self._push_thread: Optional[Thread] = None
+        self._stop_push = Event()
+        super().__init__(logger, *args, **kwargs)
+
+    @property
+    def dish_devices(self) -> Sequence[str]:
+        """Return the Tango device names of the aggregated dishes in row order."""
+        return self._dish_devices
+
+    def start_communicating(self) -> None:
+        """Subscribe once to the snapshot of each dish and start pushing updates."""
+        if self._push_thread is not None:
+            return
+        self._update_communication_state(CommunicationStatus.NOT_ESTABLISHED)
+        for dish_device in self._dish_devices:
+            self._subscribe(dish_device)
+        self._stop_push.clear()
+        self._push_thread = Thread(
+            target=self._push_matrix_updates, name="Aggregate push thread", daemon=True
+        )
+        self._push_thread.start()
+        self._update_communication_state(CommunicationStatus.ESTABLISHED)
+
+    def stop_communicating(self) -> None:
+        """Unsubscribe from the dishes and stop pushing updates."""
+        self._stop_push.set()
+        if self._push_thread is not None:
+            self._push_thread.join()
+            self._push_thread = None
+        for dish_device, subscription_id in self._subscriptions.items():
+            try:
+                self._proxies[dish_device].unsubscribe_event(subscription_id)
+            except tango.DevFailed as ex:
+                self._logger.warning(f"Failed to unsubscribe from {dish_device}: {ex}")
+        self._subscriptions.clear()
+        self._proxies.clear()
+        self._update_communication_state(CommunicationStatus.DISABLED)
+
+    def _subscribe(self, dish_device: str) -> None:
+        """
+        Subscribe to the snapshot change events of a dish.
+
+        The subscription is stateless, so Tango keeps retrying it in the background
+        for a dish which is not running yet.
+
+        :param dish_device: Tango device name of the B5dcProxy
+        """
+        try:
+            proxy = tango.DeviceProxy(dish_device)
+            self._subscriptions[dish_device] = proxy.subscribe_event(
+                SNAPSHOT_ATTRIBUTE_NAME,
+                tango.EventType.CHANGE_EVENT,
+                partial(self._snapshot_event_received, dish_device),
+                stateless=True,
+            )
+            self._proxies[dish_device] = proxy
+        except tango.DevFailed as ex:
+            self._logger.error(f"Failed to subscribe to {dish_device}: {ex}")
+            self.sensor_matrix.invalidate(dish_device, float(CommunicationStatus.NOT_ESTABLISHED))
+
+    def _snapshot_event_received(self, dish_device: str, event: Any) -> None:
+        """
+        Update the matrix row of a dish from a snapshot change event.
+
+        :param dish_device: Tango device name of the B5dcProxy
+        :param event: the Tango event data
+        """
+        if event.err:
+            self._logger.debug(f"Snapshot event error from {dish_device}: {event.errors}")
+            self.sensor_matrix.invalidate(dish_device, float(CommunicationStatus.NOT_ESTABLISHED))
+            return
+        self.sensor_matrix.update(dish_device, event.attr_value.value)
+
+    def _push_matrix_updates(self) -> None:
+        """Call the matrix update callback at the push period while the matrix changes."""
+        pushed_generation = None
+        while not self._stop_push.wait(self._push_period):
+            generation = self.sensor_matrix.generation
+            if generation == pushed_generation:
+                continue
+            pushed_generation = generation
+            if self._matrix_update_callback is not None:
+                try:
+                    self._matrix_update_callback()
+                except tango.DevFailed as ex:
+                    self._logger.error(f"Failed to push the fleet-wide attributes: {ex}")
@@ -1,38 +1,139 @@
 """Specialization of B5dc Device functionality."""
 
-# pylint: disable=abstract-method,too-many-instance-attributes
+# pylint: disable=abstract-method,too-many-instance-attributes,too-many-lines
+# pylint: disable=too-many-arguments,too-many-locals,too-many-statements
 
 import asyncio
+import concurrent.futures
 import dataclasses
 import json
 import logging
-from asyncio import AbstractEventLoop, BaseProtocol, DatagramTransport
+import os
+import tempfile
+import time
+from asyncio import AbstractEventLoop
 from threading import Event, Lock, Thread
-from typing import Any, Callable, Optional, Tuple
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Sequence, Set, Tuple
 
-from ska_control_model import CommunicationStatus, TaskStatus
+import numpy as np
+from ska_control_model import CommunicationStatus, HealthState, TaskStatus
 from ska_mid_dish_dcp_lib.device.b5dc_device import (
     B5dcDeviceAttenuationException,
-    B5dcDeviceConfigureAttenuation,
-    B5dcDeviceConfigureFrequency,
     B5dcDeviceFrequencyException,
-    B5dcDeviceSensors,
 )
 from ska_mid_dish_dcp_lib.device.b5dc_device_mappings import B5dcFrequency, B5dcPllState
-from ska_mid_dish_dcp_lib.device.b5dc_pca import (
-    B5dcFpgaFirmware,
-    B5dcIicDevice,
-    B5dcPhysicalConfiguration,
-)
-from ska_mid_dish_dcp_lib.interface.b5dc_interface import B5dcInterface, B5dcPropertyParser
-from ska_mid_dish_dcp_lib.protocol.b5dc_protocol import B5dcProtocol, B5dcProtocolTimeout
+from ska_mid_dish_dcp_lib.protocol.b5dc_protocol import B5dcProtocolTimeout
 from ska_tango_base.executor import TaskExecutorComponentManager
 
-from ska_mid_dish_b5dc_proxy.models.constants import B5DC_BUILD_STATE_DEVICE_NAME
-from ska_mid_dish_b5dc_proxy.models.data_classes import B5dcBuildStateDataclass
+from ska_mid_dish_b5dc_proxy.client.b5dc_client import B5dcClient
+from ska_mid_dish_b5dc_proxy.diagnostics.log_handling import AggregatedLog, LogQueue
+from ska_mid_dish_b5dc_proxy.diagnostics.openmetrics import METRICS_EXPORTER, MetricFamily
+from ska_mid_dish_b5dc_proxy.diagnostics.profiler import MemoryTracer, SamplingProfiler
+from ska_mid_dish_b5dc_proxy.diagnostics.task_queue import TaskQueueTracker
+from ska_mid_dish_b5dc_proxy.diagnostics.tracing import CommandTracer, Trace
+from ska_mid_dish_b5dc_proxy.models.constants import (
+    B5DC_BUILD_STATE_DEVICE_NAME,
+    B5DC_MAX_ATTENUATION_DB,
+    B5DC_MIN_ATTENUATION_DB,
+)
+from ska_mid_dish_b5dc_proxy.models.data_classes import (
+    B5dcBuildStateDataclass,
+    B5dcRegisterDefinition,
+    PendingSetCommand,
+)
+from ska_mid_dish_b5dc_proxy.models.registers import B5DC_REGISTERS, B5DC_REGISTERS_BY_NAME
+from ska_mid_dish_b5dc_proxy.telemetry.alarm_engine import AlarmEngine, AlarmRule
+from ska_mid_dish_b5dc_proxy.telemetry.histogram import Histogram
+from ska_mid_dish_b5dc_proxy.telemetry.link_state import LinkStateDebouncer
+from ska_mid_dish_b5dc_proxy.telemetry.rolling_statistics import SensorStatistics
+from ska_mid_dish_b5dc_proxy.telemetry.sample_journal import SampleJournal
+from ska_mid_dish_b5dc_proxy.telemetry.sensor_history import SampleQuality, SensorHistory
+from ska_mid_dish_b5dc_proxy.telemetry.sensor_store import SensorStore
+from ska_mid_dish_b5dc_proxy.transport.event_loops import (
+    DEFAULT_EVENT_LOOP,
+    close_abandoned_loop,
+    new_event_loop,
+)
+from ska_mid_dish_b5dc_proxy.transport.loop_monitor import LoopLagProbe, RestartBackoff
+from ska_mid_dish_b5dc_proxy.transport.shared_loop import SHARED_EVENT_LOOP
 
 WAIT_BEFORE_CONNECTION_RETRY_SEC = 5
+# Deadline of stop_communicating for the connection tasks, loop thread and journal
+STOP_COMMUNICATING_TIMEOUT_SEC = 5.0
+# Period at which the loop lag is measured and the loop and connection task checked,
+# the lag above which the loop is considered stuck and the bounds of the delay
+# between consecutive restarts, which bound the worst-case telemetry gap
+LOOP_SUPERVISOR_PERIOD_SEC = 1.0
+LOOP_STUCK_TIMEOUT_SEC = 10.0
+RESTART_BACKOFF_MIN_SEC = 1.0
+RESTART_BACKOFF_MAX_SEC = 60.0
 MAX_RETRY_COUNT = 3
+# Window over which repeated read timeouts and failures are logged as one count
+LOG_AGGREGATION_WINDOW_SEC = 60.0
+# Consecutive successful reads which report the connection ESTABLISHED, and failed
+# reads, two exhausted retry rounds by default, which report it NOT_ESTABLISHED
+LINK_UP_SUCCESS_COUNT = 3
+LINK_DOWN_FAILURE_COUNT = 2 * MAX_RETRY_COUNT
+# Period at which in-flight commands check for an abort request
+COMMAND_ABORT_POLL_PERIOD_SEC = 0.05
+# Poll cycle reads are held off while a command is in flight, up to this bound,
+# so that a hung command cannot stall monitoring indefinitely. Client reads are
+# served from the sensor store instead
+COMMAND_PREEMPT_MAX_WAIT_SEC = 5.0
+COMMAND_PREEMPT_POLL_PERIOD_SEC = 0.01
+# Bound of the wait of a client read for a poll cycle read to release the monitoring
+# lane, well under the 3 s Tango client timeout, after which the stored value is served
+CLIENT_READ_MAX_LOCK_WAIT_SEC = 1.0
+# Default bound of the PLL lock wait following SetFrequency
+PLL_LOCK_TIMEOUT_SEC = 2.0
+# Upper bounds of the PLL lock acquisition time histogram buckets
+PLL_LOCK_TIME_BUCKETS_SEC = (0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0)
+# Upper bounds of the poll cycle duration and register read round trip histogram
+# buckets exported as OpenMetrics
+POLL_CYCLE_BUCKETS_SEC = (0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0)
+READ_RTT_BUCKETS_SEC = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0)
+# Default number of polled samples kept in memory per register
+SENSOR_HISTORY_DEPTH = 3600
+# Default rolling statistics windows in seconds
+STATISTICS_WINDOWS_SEC = (60,)
+# Demand-driven polling: registers always on the fast schedule, the period at which
+# registers nobody consumes are still read, and how long a client read counts as demand
+DEFAULT_CORE_REGISTERS = ("spi_rfcm_pll_lock",)
+KEEP_ALIVE_PERIOD_SEC = 300.0
+RECENT_READ_WINDOW_SEC = 60.0
+JOURNAL_MAX_SIZE_MB = 64
+JOURNAL_SEGMENT_SIZE_BYTES = 4 * 1024 * 1024
+# On-demand profiles stop by themselves after this bound, and the sampling profiler
+# reads the thread stacks at this interval, which bounds its overhead
+PROFILE_MAX_DURATION_SEC = 300.0
+PROFILE_SAMPLE_INTERVAL_SEC = 0.01
+# Stages of a traced command, from the Tango call through the executor queue and
+# the connection loop to the B5DC and the result and state pushes, their latency
+# statistics covering the most recent spans, and the rotation of the trace file
+COMMAND_TRACE_STAGES = (
+    "command",
+    "queue",
+    "execute",
+    "loop_dispatch",
+    "b5dc_io",
+    "result_push",
+    "state_push",
+)
+COMMAND_TRACE_WINDOW = 100
+TRACE_FILE_MAX_BYTES = 16 * 1024 * 1024
+TRACE_FILE_BACKUP_COUNT = 3
+# Alarm rules applied when none are configured
+DEFAULT_ALARM_RULES = (
+    AlarmRule(
+        "spi_rfcm_pll_lock",
+        "spi_rfcm_pll_lock",
+        alarm_values=(
+            float(B5dcPllState.NOT_LOCKED),
+            float(B5dcPllState.NOT_LOCKED_WITH_LOSS_DETECTED),
+        ),
+        severity="FAILED",
+    ),
+)
 
 
 class B5dcDeviceComponentManager(TaskExecutorComponentManager):
@@ -45,6 +146,29 @@ class B5dcDeviceComponentManager(TaskExecutorComponentManager):
         b5dc_sensor_update_period: int,
         logger: logging.Logger,
         *args: Any,
+        coalesce_set_commands: bool = False,
+        wait_for_pll_lock: bool = False,
+        pll_lock_timeout: float = PLL_LOCK_TIMEOUT_SEC,
+        sensor_history_depth: int = SENSOR_HISTORY_DEPTH,
+        statistics_windows: Sequence[int] = STATISTICS_WINDOWS_SEC,
+        journal_directory: str = "",
+        journal_max_size_mb: int = JOURNAL_MAX_SIZE_MB,
+        alarm_rules: Sequence[AlarmRule] = DEFAULT_ALARM_RULES,
+        sensor_update_callback: Optional[
+            Callable[[str, float, float, SampleQuality], None]
+        ] = None,
+        shared_event_loop: bool = False,
+        event_loop: str = DEFAULT_EVENT_LOOP,
+        demand_driven_polling: bool = False,
+        core_registers: Sequence[str] = DEFAULT_CORE_REGISTERS,
+        keep_alive_period: float = KEEP_ALIVE_PERIOD_SEC,
+        subscribed_registers_callback: Optional[Callable[[], Set[str]]] = None,
+        profile_directory: str = "",
+        metrics_port: int = 0,
+        device_name: str = "b5dc",
+        trace_file: str = "",
+        max_queued_commands: int = 0,
+        max_queue_wait: float = 0.0,
         **kwargs: Any,
     ) -> None:
         """
@@ -53,63 +177,179 @@ class B5dcDeviceComponentManager(TaskExecutorComponentManager):
         :param b5dc_server_ip: IP address of the B5DC server.
         :param b5dc_server_port: Port on which to communicate with the B5DC server.
         :param b5dc_sensor_update_period: B5DC device sensor value polling period.
+        :param coalesce_set_commands: Supersede queued set commands which have not
+            started when a newer command for the same register is submitted.
+        :param wait_for_pll_lock: Complete SetFrequency only once the PLL has locked.
+        :param pll_lock_timeout: Maximum time in seconds to wait for the PLL to lock.
+        :param sensor_history_depth: Number of polled samples kept in memory per register.
+        :param statistics_windows: Lengths in seconds of the rolling statistics windows.
+        :param journal_directory: Directory of the on-disk sample journal, an empty
+            string disables the journal.
+        :param journal_max_size_mb: Hard cap on the size of the sample journal in MB.
+        :param alarm_rules: Threshold alarm rules evaluated after each poll cycle.
+        :param sensor_update_callback: Called with the register name, value, timestamp
+            and quality when the value or quality of a register changes.
+        :param shared_event_loop: Run the connection on the event loop thread and UDP
+            socket pool shared by the devices in this process, rather than on a
+            dedicated thread and sockets.
+        :param event_loop: Implementation of the connection event loop, asyncio or
+            uvloop, which falls back to asyncio if uvloop is not installed. The
+            first device to start the shared event loop chooses its implementation.
+        :param demand_driven_polling: Keep only the core registers and the registers
+            with event subscribers or recent client reads on the fast poll schedule,
+            reading the others every keep_alive_period.
+        :param core_registers: Registers always polled on the fast schedule.
+        :param keep_alive_period: Poll period in seconds of registers not in demand.
+        :param subscribed_registers_callback: Returns the registers whose attributes
+            have event subscribers.
+        :param profile_directory: Directory the profiles are written to, an empty
+            string selects the temporary directory.
+        :param metrics_port: Port of the OpenMetrics endpoint of the process, which
+            serves the performance counters of the device, 0 disables it.
+        :param device_name: Name of the device, which labels its metrics.
+        :param trace_file: File the spans of the traced commands are written to in
+            the Chrome trace event format, an empty string disables the file.
+        :param max_queued_commands: Reject commands while this many are queued, 0
+            for no limit beyond the executor queue size.
+        :param max_queue_wait: Reject commands whose estimated queue wait in seconds
+            exceeds this deadline, 0 for no deadline.
         :param args: positional arguments to pass to the parent class.
         :param kwargs: keyword arguments to pass to the parent class.
         """
-        self._logger = logger
-        self._logger.setLevel(logging.DEBUG)
+        # Records are logged at the device logging level and passed on to the device
+        # logging targets by a listener thread, never on the connection loop
+        self._log_queue = LogQueue(logger)
+        self._logger = self._log_queue.logger
+        self._timeout_log = AggregatedLog(
+            self._logger, logging.WARNING, "Timeout updating sensor %s", LOG_AGGREGATION_WINDOW_SEC
+        )
+        self._read_failure_log = AggregatedLog(
+            self._logger,
+            logging.ERROR,
+            "Exceeded maximum retries updating sensor %s",
+            LOG_AGGREGATION_WINDOW_SEC,
+        )
+        self._disconnected_read_log = AggregatedLog(
+            self._logger,
+            logging.WARNING,
+            "Connection not yet established or lost, not reading %s",
+            LOG_AGGREGATION_WINDOW_SEC,
+        )
         self._polling_period = b5dc_sensor_update_period
-        self._server_addr = (b5dc_server_ip, b5dc_server_port)
+        # All B5DC I/O goes through the client, which runs on the connection loop
+        self.b5dc_client = B5dcClient(b5dc_server_ip, b5dc_server_port, self._logger)
 
         self.loop: Optional[AbstractEventLoop] = None
-        self._transport: Optional[DatagramTransport] = None
-        self._protocol: Optional[BaseProtocol] = None
-        self._b5dc_iic: B5dcIicDevice = None
-        self._b5dc_pca: B5dcPhysicalConfiguration = None
-        self._b5dc_fw: B5dcFpgaFirmware = None
-
-        self._b5dc_property_parser: B5dcPropertyParser = None
-        self._b5dc_interface: B5dcInterface = None
-        self._b5dc_device_sensors: B5dcDeviceSensors = None
-        self._b5dc_device_attn_conf: B5dcDeviceConfigureAttenuation = None
-        self._b5dc_device_freq_conf: B5dcDeviceConfigureFrequency = None
-
         self.loop_thread: Optional[Thread] = None
+        # Connection task, as seen from outside and inside the loop, and its poll task
+        self._connection_future: Optional[concurrent.futures.Future] = None
+        self._connection_task: Optional[asyncio.Task] = None
+        self._poll_task: Optional[asyncio.Task] = None
+        # Commands running on the loop, cancelled by stop_communicating
+        self._command_futures: Set[concurrent.futures.Future] = set()
+        # Supervision of the loop and connection task from a separate thread
+        self.loop_lag = 0.0
+        self._lag_probe: Optional[LoopLagProbe] = None
+        self._restart_backoff = RestartBackoff(RESTART_BACKOFF_MIN_SEC, RESTART_BACKOFF_MAX_SEC)
+        self._restart_due = 0.0
+        # Dedicated loops replaced by a restart, closed with the transports of their
+        # client once their thread exits
+        self._abandoned_loops: List[Tuple[AbstractEventLoop, Thread, B5dcClient]] = []
+        self._supervisor_thread: Optional[Thread] = None
+        self._stop_supervisor = Event()
+        self._shared_event_loop = shared_event_loop
+        self._event_loop = event_loop
         # Flag to indicate server connection established
         self._con_established = Event()
-        # Lock to prevent contention on request to update B5dc device
-        # sensors across the event loops running on different threads
-        self._sensor_update_lock = Lock()
-
-        self._reg_to_sensor_map = {
-            "spi_rfcm_frequency": "rfcm_frequency",
-            "spi_rfcm_pll_lock": "rfcm_pll_lock",
-            "spi_rfcm_h_attenuation": "rfcm_h_attenuation_db",
-            "spi_rfcm_v_attenuation": "rfcm_v_attenuation_db",
-            "spi_rfcm_photo_diode_ain0": "clk_photodiode_current_ma",
-            "spi_rfcm_rf_in_h_ain1": "h_pol_rf_power_in_dbm",
-            "spi_rfcm_rf_in_v_ain2": "v_pol_rf_power_in_dbm",
-            "spi_rfcm_if_out_h_ain3": "h_pol_if_power_out_dbm",
-            "spi_rfcm_if_out_v_ain4": "v_pol_if_power_out_dbm",
-            "spi_rfcm_rf_temp_ain5": "rf_temperature_degc",
-            "spi_rfcm_psu_pcb_temp_ain7": "rfcm_psu_pcb_temperature_degc",
+        # Cleared while a command is in flight so that monitoring reads yield to it
+        self._command_lane_idle = Event()
+        self._command_lane_idle.set()
+
+        self._coalesce_set_commands = coalesce_set_commands
+        # Queued set commands which have not started yet, keyed by register name
+        self._pending_set_commands: Dict[str, PendingSetCommand] = {}
+        self._pending_set_commands_lock = Lock()
+
+        self._wait_for_pll_lock = wait_for_pll_lock
+        self._pll_lock_timeout = pll_lock_timeout
+        self.pll_lock_time_histogram = Histogram(PLL_LOCK_TIME_BUCKETS_SEC)
+        self.last_pll_lock_time = 0.0
+
+        # Read outcomes are counted on the read path and the resulting communication
+        # state is applied once per poll cycle
+        self._link_state = LinkStateDebouncer(LINK_UP_SUCCESS_COUNT, LINK_DOWN_FAILURE_COUNT)
+
+        self._register_names = [register.name for register in B5DC_REGISTERS]
+        # Monotonic time at which registers with their own poll period are next due
+        self._register_poll_due: Dict[str, float] = {}
+        self._demand_driven_polling = demand_driven_polling
+        self._core_registers = set(core_registers)
+        self._keep_alive_period = keep_alive_period
+        self._subscribed_registers_callback = subscribed_registers_callback
+        # Monotonic time of the last client read of each register
+        self._register_last_read: Dict[str, float] = {}
+
+        # Latest register values, read by the attributes without taking a lock
+        self.sensor_store = SensorStore(
+            self._register_names,
+            initial_values={register.name: register.default_value for register in B5DC_REGISTERS},
+        )
+        self._sensor_update_callback = sensor_update_callback
+        # Sensor store generation and communication state of the last published snapshot
+        self._snapshot_state: Optional[Tuple[int, CommunicationStatus]] = None
+        self.sensor_history = SensorHistory(self._register_names, sensor_history_depth)
+        self.sensor_statistics = SensorStatistics(
+            [register.name for register in B5DC_REGISTERS if register.statistics],
+            statistics_windows,
+        )
+        # Statistics updated by the samples of the current poll cycle, published once
+        # the cycle completes rather than on every sample
+        self._pending_statistics: Dict[str, float] = {}
+        self._sample_journal: Optional[SampleJournal] = None
+        if journal_directory:
+            journal_max_size_bytes = journal_max_size_mb * 1024 * 1024
+            self._sample_journal = SampleJournal(
+                journal_directory,
+                self._register_names,
+                self._logger,
+                segment_size_bytes=min(JOURNAL_SEGMENT_SIZE_BYTES, journal_max_size_bytes),
+                max_size_bytes=journal_max_size_bytes,
+            )
+        self.alarm_engine = AlarmEngine(self._register_names, alarm_rules)
+        self.profiler = SamplingProfiler(PROFILE_SAMPLE_INTERVAL_SEC, PROFILE_MAX_DURATION_SEC)
+        self.memory_tracer = MemoryTracer(PROFILE_MAX_DURATION_SEC)
+        self._profile_directory = profile_directory or tempfile.gettempdir()
+
+        # Performance counters, updated without a lock by the loop and served as
+        # OpenMetrics from the endpoint thread
+        self.poll_cycle_histogram = Histogram(POLL_CYCLE_BUCKETS_SEC)
+        self.read_rtt_histograms = {
+            register_name: Histogram(READ_RTT_BUCKETS_SEC)
+            for register_name in self._register_names
         }
+        self.read_timeouts = dict.fromkeys(self._register_names, 0)
+        self.read_retries = dict.fromkeys(self._register_names, 0)
+        self.events_pushed = 0
+        self.events_suppressed = 0
+        # Commands are admitted to the executor queue only within these limits
+        self.task_queue = TaskQueueTracker()
+        self._max_queued_commands = max_queued_commands
+        self._max_queue_wait = max_queue_wait
+        self._metrics_port = metrics_port
+        self._device_name = device_name
+        # Spans of the commands traced from the device, summarised per stage
+        self.tracer = CommandTracer(COMMAND_TRACE_STAGES, COMMAND_TRACE_WINDOW)
+        self._trace_file = trace_file
+        statistics_state = {key: 0.0 for key, *_ in self.sensor_statistics.state_keys()}
 
         super().__init__(
             logger,
             *args,
-            spi_rfcm_frequency=0.0,
-            spi_rfcm_pll_lock=B5dcPllState.NOT_LOCKED,
-            spi_rfcm_h_attenuation=0.0,
-            spi_rfcm_v_attenuation=0.0,
-            spi_rfcm_photo_diode_ain0=0.0,
-            spi_rfcm_rf_in_h_ain1=0.0,
-            spi_rfcm_rf_in_v_ain2=0.0,
-            spi_rfcm_if_out_h_ain3=0.0,
-            spi_rfcm_if_out_v_ain4=0.0,
-            spi_rfcm_rf_temp_ain5=0.0,
-            spi_rfcm_psu_pcb_temp_ain7=0.0,
             buildstate="",
+            b5dchealth=HealthState.UNKNOWN,
+            activealarms=[],
+            sensorsnapshot=(),
+            **statistics_state,
             **kwargs,
         )
 
@@ -117,69 +357,55 @@ class B5dcDeviceComponentManager(TaskExecutorComponentManager):
     #  Connection handling methods
     # =============================
 
-    def _start_connection_event_loop(self) -> None:
-        """Assign server connection task and run event loop."""
-        self.loop = asyncio.new_event_loop()
-        self.loop.create_task(self._establish_server_connection())
-        self.loop.run_forever()
-
     async def _establish_server_connection(self) -> None:
         """Establish and maintain server connection within event loop."""
+        connection_task = self._connection_task = asyncio.current_task()
+        # A stuck loop replaced by the supervisor keeps its own client
+        client = self.b5dc_client
         while True:
-            if self.loop is None:
-                raise RuntimeError("No tasks added on the event loop")
-            server_connection_lost = self.loop.create_future()
-            self._transport, self._protocol = await self.loop.create_datagram_endpoint(
-                lambda: B5dcProtocol(server_connection_lost, self._logger, self._server_addr),
-                local_addr=("0.0.0.0", 0),
-                remote_addr=self._server_addr,
-            )
-
-            # Update B5dc interface objects using newly created
-            # transport and protocol
-            self._update_b5dc_interface()
-            self._b5dc_iic = B5dcIicDevice(self._protocol)
-            self._b5dc_fw = B5dcFpgaFirmware(self._logger, self._protocol)
-            self._b5dc_pca = B5dcPhysicalConfiguration(self._logger, self._b5dc_iic)
-            await self._update_build_state()
-
-            self._con_established.set()
-
-            poll_loop = self.loop.create_task(self._periodically_poll_sensor_values())
-
             try:
-                await server_connection_lost
-                self._update_communication_state(CommunicationStatus.NOT_ESTABLISHED)
+                await client.connect()
+            except OSError as ex:
+                # No reads are polled until reconnected, so each failed attempt counts
+                self._logger.warning(f"Failed to reconnect to the B5dc server: {ex}")
+                self._link_state.record_failure()
+                self._apply_link_state()
+                await asyncio.sleep(WAIT_BEFORE_CONNECTION_RETRY_SEC)
+                continue
+            poll_task = None
+            try:
+                await self._update_build_state()
+
+                self._con_established.set()
 
-                poll_loop.cancel()
+                poll_task = self._poll_task = asyncio.create_task(
+                    self._periodically_poll_sensor_values()
+                )
 
-                self._con_established.clear()
+                await client.wait_connection_lost()
+                # Reported once the reconnected link keeps failing reads, or the
+                # reconnection keeps failing
+                self._link_state.record_failure()
+                self._apply_link_state()
 
                 self._logger.warning("Reestablishing lost B5dc server connection")
             finally:
-                # Clean up transport for later recreation
-                if self._transport:
-                    self._transport.close()
-                await asyncio.sleep(WAIT_BEFORE_CONNECTION_RETRY_SEC)
+                # Clean up the poll task and transports for later recreation, also
+                # when the connection task is cancelled by stop_communicating
+                if poll_task is not None:
+                    poll_task.cancel()
+                client.close()
+                if self._connection_task is connection_task:
+                    self._con_established.clear()
+            await asyncio.sleep(WAIT_BEFORE_CONNECTION_RETRY_SEC)
 
-    def _update_b5dc_interface(self) -> None:
-        """Create instances of B5dc freq and atten config and device sensor classes."""
-        if self._protocol is None:
-            raise RuntimeError("Protocol is not initialized")
-        self._b5dc_property_parser = B5dcPropertyParser(self._logger)
-        self._b5dc_interface = B5dcInterface(
-            self._logger,
-            self._b5dc_property_parser,
-            get_method=self._protocol.sync_read_register,  # type: ignore
-            set_method=self._protocol.sync_write_register,  # type: ignore
-        )
-        self._b5dc_device_sensors = B5dcDeviceSensors(self._logger, self._b5dc_interface)
-        self._b5dc_device_attn_conf = B5dcDeviceConfigureAttenuation(
-            self._logger, self._b5dc_interface
-        )
-        self._b5dc_device_freq_conf = B5dcDeviceConfigureFrequency(
-            self._logger, self._b5dc_interface
-        )
+    async def _stop_connection_tasks(self) -> None:
+        """Cancel the connection and poll tasks and wait for them to finish."""
+        tasks = [task for task in (self._connection_task, self._poll_task) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._connection_task = self._poll_task = None
 
     def is_connection_established(self) -> bool:
         """Return if connection is established."""
@@ -189,41 +415,52 @@ class B5dcDeviceComponentManager(TaskExecutorComponentManager):
     #  Sensor synchronisation methods
     # ================================
 
-    async def _update_sensor_with_lock(self, register_name: str) -> None:
-        """Acquire the sensor map lock and request b5dc device sensor update."""
-        with self._sensor_update_lock:
-            await self._b5dc_device_sensors.update_sensor(register_name)
+    async def _update_sensor_with_lock(
+        self, register_name: str, max_lock_wait: Optional[float] = None
+    ) -> bool:
+        """Request a B5dc register update on the monitoring lane."""
+        return await self.b5dc_client.update_register(register_name, max_lock_wait)
 
     def sync_register_outside_event_loop(self, register_name: str) -> None:
-        """Update singular B5dc device sensor and sync component state."""
+        """
+        Update singular B5dc device sensor and publish it to the sensor store.
+
+        While a command is in flight, or if the monitoring lane stays busy for
+        CLIENT_READ_MAX_LOCK_WAIT_SEC, the register is not read, so that the calling
+        attribute read is not held up, and the last value in the store is served.
+        """
+        self._register_last_read[register_name] = time.monotonic()
         if self.is_connection_established():
+            if not self._command_lane_idle.is_set():
+                return None
+            started = time.perf_counter()
             try:
-                asyncio.run(self._update_sensor_with_lock(register_name))
-                self._update_communication_state(CommunicationStatus.ESTABLISHED)
+                if not asyncio.run(
+                    self._update_sensor_with_lock(register_name, CLIENT_READ_MAX_LOCK_WAIT_SEC)
+                ):
+                    return None
+                self.read_rtt_histograms[register_name].observe(time.perf_counter() - started)
+                self._link_state.record_success()
             except KeyError:
                 self._logger.error(
                     f"Error on request to update " f"unknown register: {register_name}"
                 )
                 return None
             except B5dcProtocolTimeout:
-                self._logger.error(
-                    f"Protocol exception raised on request to update "
-                    f"sensor: {self._reg_to_sensor_map[register_name]}"
-                )
-                # TODO: In future we want to set the attribute quality to indicate that
-                # the value returned is unreliable
+                self.read_timeouts[register_name] += 1
+                self._timeout_log.record(B5DC_REGISTERS_BY_NAME[register_name].sensor_field)
+                self._link_state.record_failure()
+                self._publish_sensor(register_name, None, time.time(), SampleQuality.INVALID)
                 return None
 
-            self._update_component_state(
-                **{
-                    register_name: getattr(
-                        self._b5dc_device_sensors,
-                        self._reg_to_sensor_map[register_name],
-                    )
-                }
+            self._publish_sensor(
+                register_name,
+                self.b5dc_client.register_value(register_name),
+                time.time(),
+                SampleQuality.VALID,
             )
         else:
-            self._logger.warning("Connection not yet established or lost")
+            self._disconnected_read_log.record(register_name)
         return None
 
     # Polling loop task to be added to event loop in thread
@@ -231,62 +468,521 @@ class B5dcDeviceComponentManager(TaskExecutorComponentManager):
         """Run indefinite loop to periodically update all sensors values."""
         while True:
             if self.is_connection_established():
-                await self._update_all_registers()
+                await self._poll_cycle()
+            self._flush_aggregated_logs()
             await asyncio.sleep(self._polling_period)
 
+    async def _poll_cycle(self) -> None:
+        """Read the registers which are due and publish the resulting device state."""
+        started = time.perf_counter()
+        await self._update_all_registers()
+        self._publish_statistics()
+        self._apply_link_state()
+        self._evaluate_alarms()
+        self._publish_snapshot()
+        self.poll_cycle_histogram.observe(time.perf_counter() - started)
+
     async def _update_all_registers(self) -> None:
-        """Update all B5dc device sensors and sync component state."""
-        for register, sensor in self._reg_to_sensor_map.items():
+        """Update the B5dc device sensors which are due and publish them to the sensor store."""
+        now = time.monotonic()
+        registers_in_demand = self._registers_in_demand(now)
+        for definition in B5DC_REGISTERS:
+            register, sensor = definition.name, definition.sensor_field
+            if not self._register_due(definition, register in registers_in_demand, now):
+                continue
             attempt = 0
             while attempt < MAX_RETRY_COUNT:
+                await self._yield_to_command_lane()
                 try:
                     await self._sync_register_within_event_loop(register)
                     break
                 except B5dcProtocolTimeout:
                     attempt += 1
-                    self._logger.warning(
-                        f"Timeout updating sensor {sensor}. Retry attempt {attempt}"
-                    )
-                    if attempt >= MAX_RETRY_COUNT:
-                        self._logger.warning(
-                            f"Exceeded maximum retries for sensor update req: {sensor}"
-                        )
+                    self._timeout_log.record(sensor)
+                    if attempt < MAX_RETRY_COUNT:
+                        self.read_retries[register] += 1
+                    else:
+                        self._read_failure_log.record(sensor)
+                        self._record_sample(register, None, time.time(), SampleQuality.INVALID)
                         break
             if attempt >= MAX_RETRY_COUNT:
                 break
 
+    def _register_due(
+        self, definition: B5dcRegisterDefinition, in_demand: bool, now: float
+    ) -> bool:
+        """
+        Return whether a register is due to be polled and schedule its next poll.
+
+        :param definition: the register definition
+        :param in_demand: whether the register is on the fast poll schedule
+        :param now: the current monotonic time
+        :return: whether the register should be read in this poll cycle
+        """
+        poll_period = definition.poll_period
+        if not in_demand:
+            poll_period = max(poll_period or 0.0, self._keep_alive_period)
+        elif poll_period is None:
+            # Back in demand, so no longer held to the keep-alive period
+            self._register_poll_due.pop(definition.name, None)
+        if self._register_poll_due.get(definition.name, now) > now:
+            return False
+        if poll_period is not None:
+            self._register_poll_due[definition.name] = now + poll_period
+        return True
+
+    def _registers_in_demand(self, now: float) -> Set[str]:
+        """
+        Return the registers to keep on the fast poll schedule.
+
+        :param now: the current monotonic time
+        :return: all registers, or in demand-driven mode the core registers and the
+            registers with event subscribers or a recent client read
+        """
+        if not self._demand_driven_polling:
+            return set(self._register_names)
+        registers_in_demand = set(self._core_registers)
+        registers_in_demand.update(
+            register
+            for register, last_read in self._register_last_read.items()
+            if now - last_read < RECENT_READ_WINDOW_SEC
+        )
+        if self._subscribed_registers_callback is not None:
+            registers_in_demand.update(self._subscribed_registers_callback())
+        return registers_in_demand
+
+    def _flush_aggregated_logs(self) -> None:
+        """Log the counts of the repeated read timeouts and failures whose window ended."""
+        self._timeout_log.flush()
+        self._read_failure_log.flush()
+        self._disconnected_read_log.flush()
+
+    def _apply_link_state(self) -> None:
+        """Update the communication state if the debounced link state has changed."""
+        communication_state = (
+            CommunicationStatus.ESTABLISHED
+            if self._link_state.connected
+            else CommunicationStatus.NOT_ESTABLISHED
+        )
+        if communication_state != self.communication_state:
+            self._update_communication_state(communication_state)
+
+    def _evaluate_alarms(self) -> None:
+        """Evaluate the alarm rules and update the health and alarms on a transition."""
+        if self.alarm_engine.evaluate(self.sensor_store.valid_values()):
+            self._update_component_state(
+                b5dchealth=HealthState(self.alarm_engine.severity),
+                activealarms=self.alarm_engine.active_alarms,
+            )
+
+    def _publish_snapshot(self) -> None:
+        """Publish the compact snapshot of all registers if any of them have changed."""
+        snapshot_state = (self.sensor_store.generation, self.communication_state)
+        if snapshot_state == self._snapshot_state:
+            return
+        self._snapshot_state = snapshot_state
+        self._update_component_state(
+            sensorsnapshot=tuple(self.sensor_store.valid_values().tolist())
+            + (float(self.communication_state),)
+        )
+
+    def _update_communication_state(self, communication_state: CommunicationStatus) -> None:
+        """Update the communication state, publishing the snapshot on a transition."""
+        previous_state = self.communication_state
+        super()._update_communication_state(communication_state)
+        if communication_state != previous_state:
+            self._publish_snapshot()
+
+    async def _yield_to_command_lane(self) -> None:
+        """Hold off a monitoring read while a command is in flight, up to a bound."""
+        waited = 0.0
+        while not self._command_lane_idle.is_set() and waited < COMMAND_PREEMPT_MAX_WAIT_SEC:
+            await asyncio.sleep(COMMAND_PREEMPT_POLL_PERIOD_SEC)
+            waited += COMMAND_PREEMPT_POLL_PERIOD_SEC
+
     async def _sync_register_within_event_loop(self, register_name: str) -> None:
-        """Update singular B5dc device sensor and sync component state."""
+        """Update singular B5dc device sensor and publish it to the sensor store."""
         if self.is_connection_established():
+            started = time.perf_counter()
             try:
                 await self._update_sensor_with_lock(register_name)
-                self._update_communication_state(CommunicationStatus.ESTABLISHED)
+                self.read_rtt_histograms[register_name].observe(time.perf_counter() - started)
+                self._link_state.record_success()
             except KeyError:
                 self._logger.error(
-                    f"Failure on request to update register " f"value: {register_name}"
+                    "Failure on request to update register value: %s", register_name
                 )
             except B5dcProtocolTimeout:
-                self._logger.error(
-                    f"Protocol exception raised on request to update "
-                    f"sensor: {self._reg_to_sensor_map[register_name]}"
-                )
-                # TODO: In future we want to set the attribute quality to
-                # indicate that the value returned is unreliable
+                self.read_timeouts[register_name] += 1
+                self._link_state.record_failure()
+                # Logged, and the sample recorded as invalid, by the retrying caller
                 raise
 
-            self._update_component_state(
-                **{
-                    register_name: getattr(
-                        self._b5dc_device_sensors,
-                        self._reg_to_sensor_map[register_name],
-                    )
-                }
+            value = self.b5dc_client.register_value(register_name)
+            timestamp = time.time()
+            self._record_sample(register_name, value, timestamp, SampleQuality.VALID)
+            self._pending_statistics.update(
+                self.sensor_statistics.add(register_name, value, timestamp)
+            )
+
+    def _publish_statistics(self) -> None:
+        """Publish the rolling statistics updated during the poll cycle to the component state."""
+        if self._pending_statistics:
+            statistics, self._pending_statistics = self._pending_statistics, {}
+            self._update_component_state(**statistics)
+
+    def _record_sample(
+        self, register_name: str, value: Any, timestamp: float, quality: SampleQuality
+    ) -> None:
+        """Record a polled sample in the store, history and, if enabled, the journal."""
+        self.sensor_history.append(register_name, value, timestamp, quality)
+        if self._sample_journal is not None:
+            self._sample_journal.record(register_name, value, timestamp, quality)
+        self._publish_sensor(register_name, value, timestamp, quality)
+
+    def _publish_sensor(
+        self, register_name: str, value: Any, timestamp: float, quality: SampleQuality
+    ) -> None:
+        """Write a register sample to the sensor store and report a change."""
+        if not self.sensor_store.write(register_name, value, timestamp, quality):
+            self.events_suppressed += 1
+        elif self._sensor_update_callback is not None:
+            self._sensor_update_callback(register_name, *self.sensor_store.read(register_name))
+            self.events_pushed += 1
+
+    def get_sensor_history(
+        self, register_name: str, num_samples: int
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return the most recent polled samples of a register, oldest first.
+
+        :param register_name: the register to return samples for
+        :param num_samples: the maximum number of samples to return
+        :return: arrays of the sample values, timestamps and qualities
+        """
+        return self.sensor_history.latest(register_name, num_samples)
+
+    # =====================
+    #  Diagnostics methods
+    # =====================
+
+    def start_profile(self, duration: float) -> str:
+        """
+        Start sampling the stacks of the event loop, executor and other threads.
+
+        :param duration: time in seconds after which the profile stops by itself
+        :return: a message with the bounded duration of the profile
+        :raises RuntimeError: if a profile is already running
+        """
+        duration = self.profiler.start(duration)
+        self._logger.info("Started a %g s profile", duration)
+        return f"Profiling for {duration:g} s"
+
+    def stop_profile(self, top: int = 20) -> str:
+        """
+        Stop the profile and write its stacks to the profile directory.
+
+        :param top: number of functions listed per thread
+        :return: the path of the collapsed stacks file and the profile report
+        """
+        self.profiler.stop()
+        path = os.path.join(
+            self._profile_directory,
+            f"b5dc_profile_{time.strftime('%Y%m%dT%H%M%S')}_{os.getpid()}.txt",
+        )
+        self.profiler.write_collapsed_stacks(path)
+        return f"Collapsed stacks written to {path}\n{self.profiler.report(top)}"
+
+    def start_memory_trace(self, duration: float) -> str:
+        """
+        Start tracing memory allocations.
+
+        :param duration: time in seconds after which tracing stops by itself
+        :return: a message with the bounded duration of the trace
+        :raises RuntimeError: if a trace is already running
+        """
+        duration = self.memory_tracer.start(duration)
+        self._logger.info("Started a %g s memory trace", duration)
+        return f"Tracing memory allocations for {duration:g} s"
+
+    def memory_snapshot(self, top: int = 20) -> str:
+        """
+        Return the allocation sites holding the most memory.
+
+        :param top: number of allocation sites listed
+        :return: the allocations of each site and their growth since the trace started
+        :raises RuntimeError: if no trace was started
+        """
+        return self.memory_tracer.report(top)
+
+    def collect_metrics(self) -> List[MetricFamily]:
+        """Return the performance counters of the device as OpenMetrics families."""
+        device = self._device_name
+        poll_cycle = MetricFamily(
+            "b5dc_poll_cycle_duration_seconds", "histogram", "Duration of a poll cycle", "seconds"
+        )
+        poll_cycle.add_histogram(self.poll_cycle_histogram, device=device)
+        read_rtt = MetricFamily(
+            "b5dc_read_rtt_seconds", "histogram", "Round trip time of a register read", "seconds"
+        )
+        timeouts = MetricFamily("b5dc_read_timeouts", "counter", "Register reads timed out")
+        retries = MetricFamily("b5dc_read_retries", "counter", "Register reads retried")
+        for register_name in self._register_names:
+            labels = {"device": device, "register": register_name}
+            read_rtt.add_histogram(self.read_rtt_histograms[register_name], **labels)
+            timeouts.add(self.read_timeouts[register_name], "_total", **labels)
+            retries.add(self.read_retries[register_name], "_total", **labels)
+        events = MetricFamily(
+            "b5dc_sensor_events",
+            "counter",
+            "Register samples pushed as events on a change or suppressed as unchanged",
+        )
+        events.add(self.events_pushed, "_total", device=device, outcome="pushed")
+        events.add(self.events_suppressed, "_total", device=device, outcome="suppressed")
+        queue_depth = MetricFamily(
+            "b5dc_executor_queue_depth", "gauge", "Commands waiting in the executor queue"
+        )
+        queue_depth.add(self.task_queue.depth, device=device)
+        queue_wait = MetricFamily(
+            "b5dc_command_queue_wait_seconds",
+            "histogram",
+            "Time a command waited in the executor queue",
+            "seconds",
+        )
+        execution = MetricFamily(
+            "b5dc_command_execution_seconds", "histogram", "Execution time of a command", "seconds"
+        )
+        rejections = MetricFamily(
+            "b5dc_command_rejections", "counter", "Commands rejected instead of queued"
+        )
+        for command, statistics in self.task_queue.statistics().items():
+            queue_wait.add_histogram(statistics.queue_wait, device=device, command=command)
+            execution.add_histogram(statistics.execution, device=device, command=command)
+            rejections.add(statistics.rejections, "_total", device=device, command=command)
+        connection_state = MetricFamily(
+            "b5dc_connection_state",
+            "gauge",
+            "Communication state, 0 DISABLED, 1 NOT_ESTABLISHED or 2 ESTABLISHED",
+        )
+        connection_state.add(int(self.communication_state), device=device)
+        loop_lag = MetricFamily(
+            "b5dc_loop_lag_seconds", "gauge", "Scheduling lag of the event loop", "seconds"
+        )
+        loop_lag.add(self.loop_lag, device=device)
+        return [
+            poll_cycle,
+            read_rtt,
+            timeouts,
+            retries,
+            events,
+            queue_depth,
+            queue_wait,
+            execution,
+            rejections,
+            connection_state,
+            loop_lag,
+        ]
+
+    def _register_metrics(self) -> None:
+        """Serve the performance counters on the OpenMetrics endpoint, if enabled."""
+        if not self._metrics_port:
+            return
+        try:
+            port = METRICS_EXPORTER.register(
+                self._device_name, self._metrics_port, self.collect_metrics
             )
+        except OSError as ex:
+            self._logger.error("Failed to serve metrics on port %d: %s", self._metrics_port, ex)
+            return
+        if port != self._metrics_port:
+            self._logger.warning("Metrics served on port %d of the device server", port)
 
     # ==========================
     #  Command handling methods
     # ==========================
 
+    def _report_task_failure(self, message: str, task_callback: Optional[Callable]) -> None:
+        """Log a command failure and report it as the task result."""
+        self._logger.error(message)
+        if task_callback:
+            task_callback(status=TaskStatus.FAILED, result=message)
+
+    def _run_command_coroutine(
+        self, coroutine: Coroutine[Any, Any, Any], task_abort_event: Optional[Event] = None
+    ) -> Any:
+        """
+        Run a command coroutine on the connection event loop, honouring abort requests.
+
+        The calling executor thread waits for the coroutine while checking the abort
+        event. On abort the coroutine is cancelled on the event loop so that a slow
+        or hung B5DC operation does not hold up the executor. Monitoring reads are
+        held off while the command is in flight.
+
+        :param coroutine: the command coroutine to run
+        :param task_abort_event: event set when the command is to be aborted
+        :return: the result of the coroutine
+        :raises RuntimeError: if the connection event loop is not running
+        :raises concurrent.futures.CancelledError: if the command was aborted
+        """
+        if self.loop is None or not self.loop.is_running():
+            coroutine.close()
+            raise RuntimeError("Connection event loop is not running")
+
+        trace = self.tracer.current()
+        if trace is not None:
+            coroutine = self._traced_coroutine(coroutine, trace, time.perf_counter())
+        self._command_lane_idle.clear()
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        self._command_futures.add(future)
+        try:
+            while True:
+                try:
+                    return future.result(timeout=COMMAND_ABORT_POLL_PERIOD_SEC)
+                except concurrent.futures.TimeoutError:
+                    if task_abort_event and task_abort_event.is_set():
+                        future.cancel()
+                        raise concurrent.futures.CancelledError() from None
+        finally:
+            self._command_futures.discard(future)
+            self._command_lane_idle.set()
+
+    async def _traced_coroutine(
+        self, coroutine: Coroutine[Any, Any, Any], trace: Trace, dispatched: float
+    ) -> Any:
+        """
+        Run a command coroutine as part of a trace handed over from the executor.
+
+        :param coroutine: the command coroutine to run
+        :param trace: the trace of the command
+        :param dispatched: perf_counter time at which the coroutine was dispatched
+        :return: the result of the coroutine
+        """
+        with self.tracer.resume(trace):
+            self.tracer.record("loop_dispatch", dispatched, time.perf_counter() - dispatched)
+            with self.tracer.span("b5dc_io"):
+                return await coroutine
+
+    def submit_task(
+        self,
+        func: Callable,
+        args: Optional[Any] = None,
+        kwargs: Optional[Any] = None,
+        is_cmd_allowed: Optional[Callable[[], bool]] = None,
+        task_callback: Optional[Callable] = None,
+    ) -> Tuple[TaskStatus, str]:
+        """
+        Submit a task to the executor, tracking it while it is queued.
+
+        A task submitted within a command trace carries the trace to the executor.
+        The task is rejected without being queued if the queue is deeper than
+        max_queued_commands or its estimated wait exceeds max_queue_wait.
+
+        :param func: the task to execute
+        :param args: positional arguments for the task
+        :param kwargs: keyword arguments for the task
+        :param is_cmd_allowed: whether the task may execute once dequeued
+        :param task_callback: callback for long running command updates
+        :return: the task status and response message
+        """
+        command = getattr(func, "__name__", "task").lstrip("_")
+        refusal = self.task_queue.admission_refusal(
+            self._max_queued_commands, self._max_queue_wait
+        )
+        if refusal is not None:
+            self.task_queue.record_rejection(command)
+            self._logger.warning(f"Rejected {command}: {refusal}")
+            return TaskStatus.REJECTED, f"Command rejected, {refusal}"
+
+        func, task_callback = self.tracer.wrap_task(func, task_callback)
+        func, task_callback = self.task_queue.track(func, task_callback, command)
+        status, response = super().submit_task(
+            func,
+            args=args,
+            kwargs=kwargs,
+            is_cmd_allowed=is_cmd_allowed,
+            task_callback=task_callback,
+        )
+        if status == TaskStatus.REJECTED:
+            self.task_queue.record_rejection(command)
+        return status, response
+
+    def _submit_set_command(
+        self,
+        func: Callable,
+        args: List[Any],
+        register_name: str,
+        task_callback: Optional[Callable] = None,
+    ) -> Tuple[TaskStatus, str]:
+        """
+        Submit a set command, superseding an older queued command if coalescing.
+
+        A superseded command reports ABORTED once, when it is superseded, and its
+        queued task then returns without reporting any other status.
+
+        :param func: the task to execute
+        :param args: positional arguments for the task
+        :param register_name: the register written by the task
+        :param task_callback: callback for long running command updates
+        :return: the task status and response message
+        """
+        if not self._coalesce_set_commands:
+            return self.submit_task(
+                func,
+                args=args,
+                task_callback=task_callback,
+                is_cmd_allowed=self.is_connection_established,
+            )
+
+        pending_command = PendingSetCommand(register_name, task_callback)
+
+        def is_pending_command_allowed() -> bool:
+            # A superseded task returns without a status, it has already reported ABORTED
+            return pending_command.superseded or self.is_connection_established()
+
+        def pending_task_callback(**kwargs: Any) -> None:
+            # Drop the executor updates of a superseded task, e.g. ABORTED on AbortCommands
+            if not pending_command.superseded:
+                task_callback(**kwargs)  # type: ignore[misc]
+
+        status, response = self.submit_task(
+            func,
+            args=args,
+            kwargs={"pending_command": pending_command},
+            task_callback=pending_task_callback if task_callback is not None else None,
+            is_cmd_allowed=is_pending_command_allowed,
+        )
+        if status != TaskStatus.QUEUED:
+            return status, response
+
+        with self._pending_set_commands_lock:
+            superseded_command = self._pending_set_commands.get(register_name)
+            if superseded_command is not None and not superseded_command.started:
+                superseded_command.superseded = True
+                self._logger.debug(f"Superseding queued set command for {register_name}")
+                if superseded_command.task_callback:
+                    superseded_command.task_callback(
+                        status=TaskStatus.ABORTED,
+                        result=f"Superseded by a newer request to set {register_name}",
+                    )
+            if not pending_command.started:
+                self._pending_set_commands[register_name] = pending_command
+        return status, response
+
+    def _start_pending_set_command(self, pending_command: PendingSetCommand) -> bool:
+        """
+        Mark a queued set command as started unless it has been superseded.
+
+        :param pending_command: the queued set command about to execute
+        :return: whether the command should go ahead
+        """
+        with self._pending_set_commands_lock:
+            if pending_command.superseded:
+                return False
+            pending_command.started = True
+            if self._pending_set_commands.get(pending_command.register_name) is pending_command:
+                del self._pending_set_commands[pending_command.register_name]
+        return True
+
     def set_attenuation(
         self,
         attenuation_db: int,
@@ -294,11 +990,11 @@ class B5dcDeviceComponentManager(TaskExecutorComponentManager):
         task_callback: Optional[Callable] = None,
     ) -> Tuple[TaskStatus, str]:
         """Set the attenuation on the band 5 down converter."""
-        status, response = self.submit_task(
+        status, response = self._submit_set_command(
             self._set_attenuation,
-            args=[attenuation_db, attn_reg_name],
-            task_callback=task_callback,
-            is_cmd_allowed=self.is_connection_established,
+            [attenuation_db, attn_reg_name],
+            attn_reg_name,
+            task_callback,
         )
         return status, response
 
@@ -306,10 +1002,14 @@ class B5dcDeviceComponentManager(TaskExecutorComponentManager):
         self,
         attenuation_db: int,
         attn_reg_name: str,
+        pending_command: Optional[PendingSetCommand] = None,
         task_callback: Optional[Callable] = None,
         task_abort_event: Optional[Event] = None,
     ) -> None:
         """Set the attenuation on the band 5 down converter."""
+        if pending_command and not self._start_pending_set_command(pending_command):
+            return
+
         self._logger.debug(
             f"Called SetAttenuation with args (attenuation_db={attenuation_db}, "
             f"attn_reg_name={attn_reg_name})"
@@ -329,7 +1029,15 @@ class B5dcDeviceComponentManager(TaskExecutorComponentManager):
             )
 
         try:
-            asyncio.run(self._b5dc_device_attn_conf.set_attenuation(attenuation_db, attn_reg_name))
+            self._run_command_coroutine(
+                self.b5dc_client.set_attenuation(attenuation_db, attn_reg_name),
+                task_abort_event,
+            )
+        except concurrent.futures.CancelledError:
+            self._logger.warning(f"SetAttenuation on {attn_reg_name} aborted while in progress")
+            if task_callback:
+                task_callback(status=TaskStatus.ABORTED)
+            return
         except B5dcDeviceAttenuationException as ex:
             self._logger.error(
                 f"An error occured on setting the B5dc attenuation " f"on {attn_reg_name}: {ex}"
@@ -365,21 +1073,25 @@ class B5dcDeviceComponentManager(TaskExecutorComponentManager):
                 f"B5dcFrequency.F_13_2_GHZ(2) or B5dcFrequency.F_13_86_GHZ(3))",
             )
 
-        status, response = self.submit_task(
+        status, response = self._submit_set_command(
             self._set_frequency,
-            args=[freq_enum],
-            task_callback=task_callback,
-            is_cmd_allowed=self.is_connection_established,
+            [freq_enum],
+            "spi_rfcm_frequency",
+            task_callback,
         )
         return status, response
 
     def _set_frequency(
         self,
         frequency: int,
+        pending_command: Optional[PendingSetCommand] = None,
         task_callback: Optional[Callable] = None,
         task_abort_event: Optional[Event] = None,
     ) -> None:
         """Set the frequency on the band 5 down converter."""
+        if pending_command and not self._start_pending_set_command(pending_command):
+            return
+
         self._logger.debug(f"Called SetFrequency with arg (frequency={frequency})")
 
         if task_abort_event and task_abort_event.is_set():
@@ -395,60 +1107,433 @@ class B5dcDeviceComponentManager(TaskExecutorComponentManager):
             )
 
         try:
-            asyncio.run(self._b5dc_device_freq_conf.set_frequency(frequency))
+            self._run_command_coroutine(
+                self.b5dc_client.set_frequency(frequency), task_abort_event
+            )
+        except concurrent.futures.CancelledError:
+            self._logger.warning("SetFrequency aborted while in progress")
+            if task_callback:
+                task_callback(status=TaskStatus.ABORTED)
+            return
         except B5dcDeviceFrequencyException as ex:
-            self._logger.error(f"An error occured on setting the B5dc frequency: {ex}")
+            self._report_task_failure(
+                f"An error occured on setting the B5dc frequency: {ex}", task_callback
+            )
+            return
+
+        if self._wait_for_pll_lock and not self._await_pll_lock(
+            frequency, task_callback, task_abort_event
+        ):
+            return
+
+        if task_callback:
+            task_callback(
+                status=TaskStatus.COMPLETED,
+                result=f"SetFrequency({frequency}) completed",
+            )
+
+    def _await_pll_lock(
+        self,
+        frequency: int,
+        task_callback: Optional[Callable] = None,
+        task_abort_event: Optional[Event] = None,
+    ) -> bool:
+        """
+        Wait for the PLL to lock following a frequency change and record the lock time.
+
+        :param frequency: the frequency which was set
+        :param task_callback: callback for long running command updates
+        :param task_abort_event: event set when the command is to be aborted
+        :return: whether the PLL locked; failures are reported through the callback
+        """
+        if task_callback:
+            task_callback(progress=f"Waiting up to {self._pll_lock_timeout}s for PLL lock")
+
+        try:
+            lock_time = self._run_command_coroutine(self._poll_pll_lock(), task_abort_event)
+        except concurrent.futures.CancelledError:
+            self._logger.warning("SetFrequency aborted while waiting for PLL lock")
             if task_callback:
-                task_callback(
-                    status=TaskStatus.FAILED,
-                    result=f"An error occured on setting the B5dc frequency: {ex}",
+                task_callback(status=TaskStatus.ABORTED)
+            return False
+
+        if lock_time is None:
+            self._report_task_failure(
+                f"PLL did not lock within {self._pll_lock_timeout}s of "
+                f"SetFrequency({frequency})",
+                task_callback,
+            )
+            return False
+
+        self.last_pll_lock_time = lock_time
+        self.pll_lock_time_histogram.observe(lock_time)
+        self._logger.info(f"PLL locked {lock_time:.3f}s after SetFrequency({frequency})")
+        return True
+
+    async def _poll_pll_lock(self) -> Optional[float]:
+        """
+        Wait for the PLL to lock on the command lane and publish the lock state.
+
+        :return: the time taken for the PLL to lock, or None if it did not lock
+        """
+        lock_time = await self.b5dc_client.wait_for_pll_lock(self._pll_lock_timeout)
+        if lock_time is not None:
+            self._publish_sensor(
+                "spi_rfcm_pll_lock",
+                self.b5dc_client.register_value("spi_rfcm_pll_lock", command_lane=True),
+                time.time(),
+                SampleQuality.VALID,
+            )
+        return lock_time
+
+    def configure_band5(
+        self,
+        frequency: int,
+        h_attenuation_db: int,
+        v_attenuation_db: int,
+        task_callback: Optional[Callable] = None,
+    ) -> Tuple[TaskStatus, str]:
+        """Set the frequency and both attenuations on the band 5 down converter."""
+        try:
+            freq_enum = B5dcFrequency(frequency)
+        except ValueError as ex:
+            self._logger.error(f"Invalid frequency value supplied: {ex}")
+            return (
+                TaskStatus.REJECTED,
+                f"Invalid frequency value supplied: {frequency}. Expected "
+                f"B5dcFrequency enum value (ie: B5dcFrequency.F_11_1_GHZ(1), "
+                f"B5dcFrequency.F_13_2_GHZ(2) or B5dcFrequency.F_13_86_GHZ(3))",
+            )
+
+        for attn_reg_name, attenuation_db in (
+            ("spi_rfcm_h_attenuation", h_attenuation_db),
+            ("spi_rfcm_v_attenuation", v_attenuation_db),
+        ):
+            if not B5DC_MIN_ATTENUATION_DB <= attenuation_db <= B5DC_MAX_ATTENUATION_DB:
+                self._logger.error(
+                    f"Invalid attenuation value supplied for {attn_reg_name}: {attenuation_db}"
+                )
+                return (
+                    TaskStatus.REJECTED,
+                    f"Invalid attenuation value supplied for {attn_reg_name}: "
+                    f"{attenuation_db}. Expected a value in the range "
+                    f"[{B5DC_MIN_ATTENUATION_DB}-{B5DC_MAX_ATTENUATION_DB}dB]",
                 )
+
+        status, response = self.submit_task(
+            self._configure_band5,
+            args=[freq_enum, h_attenuation_db, v_attenuation_db],
+            task_callback=task_callback,
+            is_cmd_allowed=self.is_connection_established,
+        )
+        return status, response
+
+    def _configure_band5(
+        self,
+        frequency: B5dcFrequency,
+        h_attenuation_db: int,
+        v_attenuation_db: int,
+        task_callback: Optional[Callable] = None,
+        task_abort_event: Optional[Event] = None,
+    ) -> None:
+        """Set the frequency and both attenuations on the band 5 down converter."""
+        cmd_args = (
+            f"(frequency={frequency}, h_attenuation_db={h_attenuation_db}, "
+            f"v_attenuation_db={v_attenuation_db})"
+        )
+        self._logger.debug(f"Called ConfigureBand5 with args {cmd_args}")
+
+        if task_abort_event and task_abort_event.is_set():
+            task_callback(  # type: ignore
+                status=TaskStatus.ABORTED,
+            )
+            return
+
+        if task_callback:
+            task_callback(
+                status=TaskStatus.IN_PROGRESS,
+                progress=f"Called ConfigureBand5 with args {cmd_args}",
+            )
+
+        try:
+            mismatches = self._run_command_coroutine(
+                self._apply_band5_configuration(frequency, h_attenuation_db, v_attenuation_db),
+                task_abort_event,
+            )
+        except concurrent.futures.CancelledError:
+            self._logger.warning("ConfigureBand5 aborted while in progress")
+            if task_callback:
+                task_callback(status=TaskStatus.ABORTED)
+            return
+        except (
+            B5dcDeviceFrequencyException,
+            B5dcDeviceAttenuationException,
+            B5dcProtocolTimeout,
+        ) as ex:
+            self._report_task_failure(
+                f"An error occured on configuring the B5dc: {ex}", task_callback
+            )
+            return
+
+        if mismatches:
+            self._report_task_failure(
+                f"B5dc configuration readback mismatch: {mismatches}", task_callback
+            )
             return
 
         if task_callback:
             task_callback(
                 status=TaskStatus.COMPLETED,
-                result=f"SetFrequency({frequency}) completed",
+                result=f"ConfigureBand5{cmd_args} completed",
             )
 
+    async def _apply_band5_configuration(
+        self,
+        frequency: B5dcFrequency,
+        h_attenuation_db: int,
+        v_attenuation_db: int,
+    ) -> List[str]:
+        """
+        Apply the band 5 configuration and publish the readback to the sensor store.
+
+        :return: a description of each register that did not read back as written
+        """
+        readback, mismatches = await self.b5dc_client.configure_band5(
+            frequency, h_attenuation_db, v_attenuation_db
+        )
+        timestamp = time.time()
+        for register_name, value in readback.items():
+            self._publish_sensor(register_name, value, timestamp, SampleQuality.VALID)
+        return mismatches
+
     def _update_component_state(self, **kwargs: Any) -> None:
         """Log and update new component state."""
         self._logger.debug("Updating B5dc component state with [%s]", kwargs)
-        super()._update_component_state(**kwargs)
+        with self.tracer.span("state_push"):
+            super()._update_component_state(**kwargs)
 
     def start_communicating(self) -> None:
         """Start the communication with the B5DC device."""
+        if self.loop is not None:
+            self._logger.debug("Communication with B5DC device already started")
+            return
+        self._log_queue.start()
         self._logger.debug("Starting communication with B5DC device")
+        self._link_state.reset()
         self._update_communication_state(CommunicationStatus.NOT_ESTABLISHED)
-        # Start the server connection event loop in a separate thread
-        self.loop_thread = Thread(
-            target=self._start_connection_event_loop, daemon=True, name="Asyncio loop thread"
+        if self._sample_journal is not None:
+            try:
+                self._sample_journal.start()
+            except OSError as ex:
+                self._logger.error(f"Failed to start the sample journal, disabling it: {ex}")
+                self._sample_journal = None
+        if self._trace_file:
+            try:
+                self.tracer.open(self._trace_file, TRACE_FILE_MAX_BYTES, TRACE_FILE_BACKUP_COUNT)
+            except OSError as ex:
+                self._logger.error(f"Failed to open the trace file, disabling it: {ex}")
+                self._trace_file = ""
+        self._start_event_loop()
+        self._start_connection()
+
+        self._restart_backoff.reset()
+        self._restart_due = 0.0
+        self._stop_supervisor.clear()
+        self._supervisor_thread = Thread(
+            target=self._supervise_event_loop, daemon=True, name="B5dc loop supervisor thread"
         )
-        self.loop_thread.start()
+        self._supervisor_thread.start()
+        self._register_metrics()
 
-    async def _update_build_state(self) -> None:
-        if self._b5dc_pca is not None and self._b5dc_fw is not None:
-            await self._b5dc_pca.update_pca_info()
-            await self._b5dc_fw.update_model_filename()
-            await self._b5dc_fw.update_firmware_build_timestamp()
+    def _start_event_loop(self, failed_loop: Optional[AbstractEventLoop] = None) -> None:
+        """
+        Start the connection event loop thread, or join the shared one.
 
-            firmware_file = (
-                f"{self._b5dc_fw.b5dc_file_model_name}_{self._b5dc_fw.b5dc_build_time}.fpg"
+        :param failed_loop: a dead or stuck loop being replaced
+        """
+        if self._shared_event_loop:
+            (
+                self.loop,
+                self.loop_thread,
+                self.b5dc_client.transport_pool,
+            ) = (
+                SHARED_EVENT_LOOP.restart(failed_loop)
+                if failed_loop is not None
+                else SHARED_EVENT_LOOP.acquire(self._event_loop, self._logger)
             )
+        else:
+            # Start the server connection event loop in a separate thread
+            self.loop = new_event_loop(self._event_loop, self._logger)
+            self.loop_thread = Thread(
+                target=self.loop.run_forever, daemon=True, name="Asyncio loop thread"
+            )
+            self.loop_thread.start()
+        self._lag_probe = LoopLagProbe(self.loop)
 
-            b5dc_build_state = B5dcBuildStateDataclass(
-                device=B5DC_BUILD_STATE_DEVICE_NAME,
-                device_ip=self._server_addr[0],
-                device_version=self._b5dc_pca.b5dc_version,
-                comms_engine_version=self._b5dc_pca.b5dc_comms_engine_version,
-                rfcm_psu_version=self._b5dc_pca.b5dc_rfcm_psu_version,
-                rfcm_pcb_version=self._b5dc_pca.b5dc_rfcm_pcb_version,
-                backplane_version=self._b5dc_pca.b5dc_backplane_version,
-                psu_version=self._b5dc_pca.b5dc_psu_version,
-                icd_version=self._b5dc_pca.b5dc_icd_version,
-                fpga_firmware_file=firmware_file,
+    def _start_connection(self) -> None:
+        """Start the task establishing and maintaining the connection on the loop."""
+        self._connection_future = asyncio.run_coroutine_threadsafe(
+            self._establish_server_connection(), self.loop  # type: ignore[arg-type]
+        )
+
+    def _supervise_event_loop(self) -> None:
+        """Check the loop and connection task every supervisor period until stopped."""
+        while not self._stop_supervisor.wait(LOOP_SUPERVISOR_PERIOD_SEC):
+            self._check_event_loop()
+
+    def _check_event_loop(self) -> None:
+        """
+        Measure the loop lag and restart a dead or stuck loop or a dead connection task.
+
+        Consecutive restarts are spaced by an exponential backoff, which is reset
+        once the connection is established again.
+        """
+        self._close_abandoned_loops()
+        self.loop_lag = self._lag_probe.probe()  # type: ignore[union-attr]
+        loop_dead = not self.loop_thread.is_alive()  # type: ignore[union-attr]
+        loop_stuck = self.loop_lag > LOOP_STUCK_TIMEOUT_SEC
+        connection_future = self._connection_future
+        if not (loop_dead or loop_stuck or connection_future.done()):  # type: ignore[union-attr]
+            if self.is_connection_established():
+                self._restart_backoff.reset()
+            return
+        now = time.monotonic()
+        if now < self._restart_due:
+            return
+        self._restart_due = now + self._restart_backoff.next_delay()
+        # Nothing is polled until the restarted connection is reading again
+        self._link_state.reset()
+        self._apply_link_state()
+
+        if loop_dead or loop_stuck:
+            problem = "thread died" if loop_dead else f"is stuck for {self.loop_lag:.1f}s"
+            self._logger.error(f"B5DC event loop {problem}, restarting it")
+            self._restart_event_loop()
+        else:
+            reason = (
+                "cancelled"
+                if connection_future.cancelled()  # type: ignore[union-attr]
+                else repr(connection_future.exception())  # type: ignore[union-attr]
+            )
+            self._logger.error(f"B5DC connection task stopped ({reason}), restarting it")
+        self._start_connection()
+
+    def _restart_event_loop(self) -> None:
+        """
+        Abandon a dead or stuck loop, with its connection and commands, for a new one.
+
+        The abandoned loop is asked to stop, and closed with its tasks and transports
+        by the supervisor once its thread has exited.
+        """
+        failed_loop, failed_thread = self.loop, self.loop_thread
+        failed_client = self.b5dc_client
+        self._con_established.clear()
+        for future in list(self._command_futures):
+            future.cancel()
+        if self._connection_future is not None:
+            self._connection_future.cancel()
+        self.b5dc_client = B5dcClient(*failed_client.server_addr, self._logger)
+        if not self._shared_event_loop:
+            if failed_thread.is_alive():  # type: ignore[union-attr]
+                failed_loop.call_soon_threadsafe(failed_loop.stop)  # type: ignore[union-attr]
+            self._abandoned_loops.append(
+                (failed_loop, failed_thread, failed_client)  # type: ignore[arg-type]
             )
+        self._start_event_loop(failed_loop)
+        self._close_abandoned_loops()
+
+    def _close_abandoned_loops(self) -> None:
+        """Close the loops abandoned by a restart whose thread has exited."""
+        if self._shared_event_loop:
+            SHARED_EVENT_LOOP.close_abandoned_loops()
+            return
+        stopped = [abandoned for abandoned in self._abandoned_loops if not abandoned[1].is_alive()]
+        for abandoned in stopped:
+            self._abandoned_loops.remove(abandoned)
+            loop, _, client = abandoned
+            try:
+                close_abandoned_loop(loop, client.close)
+            except RuntimeError as ex:
+                self._logger.warning(f"Failed to close an abandoned B5DC event loop: {ex}")
+
+    def stop_communicating(self, timeout: float = STOP_COMMUNICATING_TIMEOUT_SEC) -> None:
+        """
+        Stop the communication with the B5DC device and release its resources.
+
+        Cancels the in-flight commands and the connection and poll tasks, which close
+        the transports, then stops the event loop, or releases the shared one, and
+        closes the sample journal. The device can start communicating again.
+
+        :param timeout: deadline in seconds for the tasks, loop thread and journal
+            to stop, after which they are abandoned with a warning
+        """
+        if self.loop is None:
+            self._update_communication_state(CommunicationStatus.DISABLED)
+            return
+        self._logger.debug("Stopping communication with B5DC device")
+        deadline = time.monotonic() + timeout
+        self._stop_supervisor.set()
+        if self._supervisor_thread is not None:
+            self._supervisor_thread.join(timeout)
+            self._supervisor_thread = None
+        loop, loop_thread = self.loop, self.loop_thread
+        self.loop = self.loop_thread = None
+
+        for future in list(self._command_futures):
+            future.cancel()
+        if self._connection_future is not None:
+            self._connection_future.cancel()
+            self._connection_future = None
+        try:
+            asyncio.run_coroutine_threadsafe(self._stop_connection_tasks(), loop).result(
+                max(deadline - time.monotonic(), 0.0)
+            )
+        except concurrent.futures.TimeoutError:
+            self._logger.warning("B5DC connection tasks did not stop within the deadline")
+
+        self._stop_event_loop(loop, loop_thread, deadline)  # type: ignore[arg-type]
+        self._close_abandoned_loops()
+        if self._sample_journal is not None:
+            self._sample_journal.close(max(deadline - time.monotonic(), 0.0))
+        self.profiler.stop()
+        self.memory_tracer.stop()
+        self.tracer.close()
+        if self._metrics_port:
+            METRICS_EXPORTER.unregister(self._device_name)
+        self._update_communication_state(CommunicationStatus.DISABLED)
+        self._flush_aggregated_logs()
+        self._log_queue.stop()
+
+    def _stop_event_loop(
+        self, loop: AbstractEventLoop, loop_thread: Thread, deadline: float
+    ) -> None:
+        """
+        Stop the dedicated event loop and join its thread, or release the shared loop.
+
+        :param loop: the connection event loop
+        :param loop_thread: the thread running the loop
+        :param deadline: monotonic time by which the loop thread should have stopped
+        """
+        if self._shared_event_loop:
+            SHARED_EVENT_LOOP.release(max(deadline - time.monotonic(), 0.0))
+            self.b5dc_client.transport_pool = None
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(loop.shutdown_default_executor(), loop).result(
+                max(deadline - time.monotonic(), 0.0)
+            )
+        except concurrent.futures.TimeoutError:
+            self._logger.warning("B5DC event loop executor did not stop within the deadline")
+        loop.call_soon_threadsafe(loop.stop)
+        loop_thread.join(max(deadline - time.monotonic(), 0.0))
+        if loop_thread.is_alive():
+            self._logger.warning("B5DC event loop thread did not stop within the deadline")
         else:
+            loop.close()
+
+    async def _update_build_state(self) -> None:
+        b5dc_build_state = await self.b5dc_client.read_build_state()
+        if b5dc_build_state is None:
             b5dc_build_state = B5dcBuildStateDataclass(
                 device=B5DC_BUILD_STATE_DEVICE_NAME,
                 device_ip="Failed to retrieve build state data for band 5 down converter.",
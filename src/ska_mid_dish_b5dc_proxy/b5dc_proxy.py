@@ -1,20 +1,82 @@
 """Tango device for monitoring B5DC register values and executing device commands."""
 
-# pylint: disable=protected-access,invalid-name
+# pylint: disable=protected-access,invalid-name,attribute-defined-outside-init
+# pylint: disable=too-many-public-methods
 
-from typing import Any, List, Optional, Tuple
+import enum
+import json
+import math
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
-from ska_control_model import CommunicationStatus, ResultCode
-from ska_mid_dish_dcp_lib.device.b5dc_device_mappings import B5dcFrequency, B5dcPllState
+import numpy as np
+from ska_control_model import CommunicationStatus, HealthState, ResultCode
+from ska_mid_dish_dcp_lib.device.b5dc_device_mappings import B5dcFrequency
 from ska_tango_base import SKABaseDevice
 from ska_tango_base.commands import SubmittedSlowCommand
-from tango import AttrWriteType, is_omni_thread
+from tango import (
+    Attr,
+    AttrQuality,
+    AttrWriteType,
+    CmdArgType,
+    DispLevel,
+    EventType,
+    UserDefaultAttrProp,
+    is_omni_thread,
+)
 from tango.server import attribute, command, device_property, run
 
-from ska_mid_dish_b5dc_proxy.b5dc_cm import B5dcDeviceComponentManager
+from ska_mid_dish_b5dc_proxy.b5dc_cm import (
+    COMMAND_TRACE_STAGES,
+    DEFAULT_ALARM_RULES,
+    DEFAULT_CORE_REGISTERS,
+    JOURNAL_MAX_SIZE_MB,
+    KEEP_ALIVE_PERIOD_SEC,
+    PLL_LOCK_TIME_BUCKETS_SEC,
+    PLL_LOCK_TIMEOUT_SEC,
+    SENSOR_HISTORY_DEPTH,
+    STATISTICS_WINDOWS_SEC,
+    B5dcDeviceComponentManager,
+)
+from ska_mid_dish_b5dc_proxy.models.data_classes import B5dcRegisterDefinition
+from ska_mid_dish_b5dc_proxy.models.registers import (
+    B5DC_REGISTERS,
+    B5DC_REGISTERS_BY_NAME,
+    B5DC_SNAPSHOT_FIELDS,
+)
+from ska_mid_dish_b5dc_proxy.telemetry.alarm_engine import parse_alarm_rules
+from ska_mid_dish_b5dc_proxy.telemetry.sensor_history import SampleQuality
+from ska_mid_dish_b5dc_proxy.transport.event_loops import DEFAULT_EVENT_LOOP
+
+MAX_ACTIVE_ALARMS = 64
 
 DevVarLongStringArrayType = Tuple[List[ResultCode], List[Optional[str]]]
 
+ATTR_QUALITY = {
+    SampleQuality.VALID: AttrQuality.ATTR_VALID,
+    SampleQuality.INVALID: AttrQuality.ATTR_INVALID,
+}
+
+STATISTIC_DESCRIPTIONS = {
+    "mean": "Mean",
+    "min": "Minimum",
+    "max": "Maximum",
+    "std": "Population standard deviation",
+}
+
+
+def _attribute_value_converter(register: B5dcRegisterDefinition) -> Callable[[float], Any]:
+    """
+    Return the conversion of a sensor store value to the attribute value of a register.
+
+    :param register: the register definition
+    :return: the value conversion
+    """
+    if issubclass(register.dtype, enum.Enum):
+        # The store holds enum registers as numbers, NaN only if unreadable
+        dtype, default_value = register.dtype, register.default_value
+        return lambda value: dtype(int(value)) if math.isfinite(value) else default_value
+    return float
+
 
 class B5dcProxy(SKABaseDevice):
     """Implementation of the B5dcProxy Tango device."""
@@ -24,6 +86,55 @@ class B5dcProxy(SKABaseDevice):
     # -----------------
     B5dc_endpoint = device_property(dtype=str, default_value="127.0.0.1:10001")
     B5dc_sensor_update_period = device_property(dtype=str, default_value="10")
+    B5dc_coalesce_set_commands = device_property(dtype=bool, default_value=False)
+    B5dc_wait_for_pll_lock = device_property(dtype=bool, default_value=False)
+    B5dc_pll_lock_timeout = device_property(dtype=float, default_value=PLL_LOCK_TIMEOUT_SEC)
+    B5dc_sensor_history_depth = device_property(dtype=int, default_value=SENSOR_HISTORY_DEPTH)
+    B5dc_statistics_windows = device_property(
+        dtype=(int,), default_value=list(STATISTICS_WINDOWS_SEC)
+    )
+    # An empty journal directory disables the on-disk sample journal
+    B5dc_journal_directory = device_property(dtype=str, default_value="")
+    B5dc_journal_max_size_mb = device_property(dtype=int, default_value=JOURNAL_MAX_SIZE_MB)
+    B5dc_alarm_rules = device_property(
+        dtype=str,
+        default_value="",
+        doc="JSON list of alarm rules, each an object with the keys: register, the B5DC "
+        "register name (required); name, the alarm name (default the register name); low "
+        "and high, thresholds in the register unit below or above which the alarm is "
+        "raised; alarm_values, register values raising the alarm, e.g. B5dcPllState "
+        "values; hysteresis, how far back within the thresholds the value must be to "
+        "clear the alarm (default 0); severity, DEGRADED (default) or FAILED. For "
+        'example [{"register": "spi_rfcm_rf_temp_ain5", "high": 60, "hysteresis": 2, '
+        '"severity": "FAILED"}]. Empty applies the default rule, a FAILED '
+        "spi_rfcm_pll_lock alarm while the PLL is NOT_LOCKED or "
+        "NOT_LOCKED_WITH_LOSS_DETECTED.",
+    )
+    # Share one event loop thread and UDP socket pool between the devices in the process
+    B5dc_shared_event_loop = device_property(dtype=bool, default_value=False)
+    B5dc_event_loop = device_property(
+        dtype=str,
+        default_value=DEFAULT_EVENT_LOOP,
+        doc="Implementation of the connection event loop, asyncio (default) or uvloop. "
+        "uvloop requires the uvloop package, which is not a dependency of the device and "
+        "has to be installed in the image, e.g. pip install uvloop. Without it the device "
+        "logs a warning and uses asyncio.",
+    )
+    # Poll only the core registers and the registers being subscribed to or read on
+    # the fast schedule, the others every keep-alive period
+    B5dc_demand_driven_polling = device_property(dtype=bool, default_value=False)
+    B5dc_core_registers = device_property(dtype=(str,), default_value=list(DEFAULT_CORE_REGISTERS))
+    B5dc_keep_alive_period = device_property(dtype=float, default_value=KEEP_ALIVE_PERIOD_SEC)
+    # Directory of the profiles written by StopProfile, empty for the temporary directory
+    B5dc_profile_directory = device_property(dtype=str, default_value="")
+    # Port of the OpenMetrics endpoint shared by the devices in the process, 0 disables it
+    B5dc_metrics_port = device_property(dtype=int, default_value=0)
+    # File the spans of the traced commands are written to, empty disables the file
+    B5dc_trace_file = device_property(dtype=str, default_value="")
+    # Reject commands while this many are queued or when their estimated queue wait in
+    # seconds exceeds the deadline, instead of completing them late. 0 disables each
+    B5dc_max_queued_commands = device_property(dtype=int, default_value=0)
+    B5dc_max_queue_wait = device_property(dtype=float, default_value=0.0)
 
     class InitCommand(SKABaseDevice.InitCommand):
         """Initializes the attributes of the B5dc Tango device."""
@@ -43,22 +154,21 @@ class B5dcProxy(SKABaseDevice):
             """
             self._device._component_state_attr_map = {
                 "buildstate": "buildState",
-                "spi_rfcm_frequency": "rfcmFrequency",
-                "spi_rfcm_pll_lock": "rfcmPllLock",
-                "spi_rfcm_h_attenuation": "rfcmHAttenuation",
-                "spi_rfcm_v_attenuation": "rfcmVAttenuation",
-                "spi_rfcm_photo_diode_ain0": "clkPhotodiodeCurrent",
-                "spi_rfcm_rf_in_h_ain1": "hPolRfPowerIn",
-                "spi_rfcm_rf_in_v_ain2": "vPolRfPowerIn",
-                "spi_rfcm_if_out_h_ain3": "hPolRfPowerOut",
-                "spi_rfcm_if_out_v_ain4": "vPolRfPowerOut",
-                "spi_rfcm_rf_temp_ain5": "rfTemperature",
-                "spi_rfcm_psu_pcb_temp_ain7": "rfcmPsuPcbTemperature",
+                "b5dchealth": "b5dcHealth",
+                "activealarms": "activeAlarms",
+                "sensorsnapshot": "sensorSnapshot",
             }
+            self._device._create_register_attributes()
+            self._device._create_statistics_attributes()
             # Configure change and archive events for all attribute in the map
             for attr in self._device._component_state_attr_map.values():
                 self._device.set_change_event(attr, True, False)
                 self._device.set_archive_event(attr, True, False)
+            # Registers with an event threshold have Tango check it on each push
+            for register in B5DC_REGISTERS:
+                detect = register.event_abs_change is not None
+                self._device.set_change_event(register.attribute_name, True, detect)
+                self._device.set_archive_event(register.attribute_name, True, detect)
 
             self._device.set_change_event("connectionState", True, False)
             self._device.set_archive_event("connectionState", True, False)
@@ -67,6 +177,12 @@ class B5dcProxy(SKABaseDevice):
             self._device.component_manager.start_communicating()
             return ResultCode(result_code), message
 
+    def delete_device(self: "B5dcProxy") -> None:
+        """Stop communicating before the device is deleted, e.g. by the Init command."""
+        if getattr(self, "component_manager", None) is not None:
+            self.component_manager.stop_communicating()
+        super().delete_device()
+
     def create_component_manager(self: "B5dcProxy") -> B5dcDeviceComponentManager:
         """
         Create B5dc component manager.
@@ -80,6 +196,31 @@ class B5dcProxy(SKABaseDevice):
             B5dc_server_port,
             int(self.B5dc_sensor_update_period),
             logger=self.logger,
+            coalesce_set_commands=self.B5dc_coalesce_set_commands,
+            wait_for_pll_lock=self.B5dc_wait_for_pll_lock,
+            pll_lock_timeout=self.B5dc_pll_lock_timeout,
+            sensor_history_depth=self.B5dc_sensor_history_depth,
+            statistics_windows=self.B5dc_statistics_windows,
+            journal_directory=self.B5dc_journal_directory,
+            journal_max_size_mb=self.B5dc_journal_max_size_mb,
+            alarm_rules=(
+                parse_alarm_rules(self.B5dc_alarm_rules)
+                if self.B5dc_alarm_rules
+                else DEFAULT_ALARM_RULES
+            ),
+            sensor_update_callback=self._sensor_updated,
+            shared_event_loop=self.B5dc_shared_event_loop,
+            event_loop=self.B5dc_event_loop,
+            demand_driven_polling=self.B5dc_demand_driven_polling,
+            core_registers=self.B5dc_core_registers,
+            keep_alive_period=self.B5dc_keep_alive_period,
+            subscribed_registers_callback=self._subscribed_registers,
+            profile_directory=self.B5dc_profile_directory,
+            metrics_port=self.B5dc_metrics_port,
+            device_name=self.get_name(),
+            trace_file=self.B5dc_trace_file,
+            max_queued_commands=self.B5dc_max_queued_commands,
+            max_queue_wait=self.B5dc_max_queue_wait,
             communication_state_callback=self._communication_state_changed,
             component_state_callback=self._component_state_changed,
         )
@@ -92,6 +233,7 @@ class B5dcProxy(SKABaseDevice):
             ("SetHPolAttenuation", "set_attenuation"),
             ("SetVPolAttenuation", "set_attenuation"),
             ("SetFrequency", "set_frequency"),
+            ("ConfigureBand5", "configure_band5"),
         ]:
             self.register_command_object(
                 command_name,
@@ -104,6 +246,127 @@ class B5dcProxy(SKABaseDevice):
                 ),
             )
 
+    def _attribute_names(self) -> Set[str]:
+        """Return the names of the attributes of the device."""
+        return {attr.get_name() for attr in self.get_device_attr().get_attribute_list()}
+
+    def _create_register_attributes(self) -> None:
+        """
+        Create an attribute for each register in the register registry.
+
+        The value accessor of each register is resolved once here, so that reads
+        and events do not look up the register or its conversion.
+        """
+        existing_attributes = self._attribute_names()
+        self._register_read_accessors: Dict[str, Tuple[str, Callable[[float], Any]]] = {}
+        self._register_event_accessors: Dict[str, Tuple[str, Callable[[float], Any]]] = {}
+        # Register behind each register and statistics attribute, for demand-driven polling
+        self._attribute_registers: Dict[str, str] = {}
+        for register in B5DC_REGISTERS:
+            convert = _attribute_value_converter(register)
+            self._attribute_registers[register.attribute_name] = register.name
+            self._register_read_accessors[register.attribute_name] = (register.name, convert)
+            self._register_event_accessors[register.name] = (register.attribute_name, convert)
+            if register.attribute_name in existing_attributes:
+                continue
+
+            properties = UserDefaultAttrProp()
+            properties.set_description(register.doc)
+            if register.unit:
+                properties.set_unit(register.unit)
+            if register.event_abs_change is not None:
+                properties.set_event_abs_change(str(register.event_abs_change))
+                properties.set_archive_event_abs_change(str(register.event_abs_change))
+            if issubclass(register.dtype, enum.Enum):
+                attr = Attr(register.attribute_name, CmdArgType.DevEnum, AttrWriteType.READ)
+                properties.set_enum_labels(
+                    [state.name for state in register.dtype]  # pylint: disable=not-an-iterable
+                )
+            else:
+                attr = Attr(register.attribute_name, CmdArgType.DevDouble, AttrWriteType.READ)
+            attr.set_default_properties(properties)
+            self.add_attribute(attr, r_meth=self._read_register_attribute)
+
+    def _read_register_attribute(self, attr: Any) -> None:
+        """Read a register and set the attribute from the sensor store."""
+        register_name, convert = self._register_read_accessors[attr.get_name()]
+        self.component_manager.sync_register_outside_event_loop(register_name)
+        value, timestamp, quality = self.component_manager.sensor_store.read(register_name)
+        attr.set_value_date_quality(convert(value), timestamp, ATTR_QUALITY[quality])
+
+    def _create_statistics_attributes(self) -> None:
+        """
+        Create the rolling-window statistics attributes of the B5DC registers.
+
+        Attributes are named after the register attribute, statistic and window,
+        e.g. hPolRfPowerInMean1m, and are mapped to their component state key.
+        """
+        existing_attributes = self._attribute_names()
+        self._statistics_attr_state_keys = {}
+        for (
+            state_key,
+            register_name,
+            statistic,
+            suffix,
+        ) in self.component_manager.sensor_statistics.state_keys():
+            register = B5DC_REGISTERS_BY_NAME[register_name]
+            attribute_name = f"{register.attribute_name}{statistic.capitalize()}{suffix}"
+            self._component_state_attr_map[state_key] = attribute_name
+            self._statistics_attr_state_keys[attribute_name] = state_key
+            self._attribute_registers[attribute_name] = register_name
+            if attribute_name in existing_attributes:
+                continue
+
+            unit = f" in {register.unit}" if register.unit else ""
+            properties = UserDefaultAttrProp()
+            properties.set_description(
+                f"{STATISTIC_DESCRIPTIONS[statistic]} of {register.attribute_name} over "
+                f"the last {suffix}{unit}, updated once per poll cycle."
+            )
+            if register.unit:
+                properties.set_unit(register.unit)
+            attr = Attr(attribute_name, CmdArgType.DevDouble, AttrWriteType.READ)
+            attr.set_default_properties(properties)
+            self.add_attribute(attr, r_meth=self._read_statistics_attribute)
+
+    def _read_statistics_attribute(self, attr: Any) -> None:
+        """Read a rolling-window statistics attribute from the component state."""
+        state_key = self._statistics_attr_state_keys[attr.get_name()]
+        attr.set_value(self.component_manager.component_state[state_key])
+
+    def _subscribed_registers(self) -> Set[str]:
+        """
+        Return the registers whose attributes have change or archive event subscribers.
+
+        A subscriber to sensorSnapshot, e.g. the B5dcAggregator, consumes every register.
+        """
+
+        def has_subscriber(attribute_name: str) -> bool:
+            return any(
+                self.is_there_subscriber(attribute_name, event_type)
+                for event_type in (EventType.CHANGE_EVENT, EventType.ARCHIVE_EVENT)
+            )
+
+        if has_subscriber("sensorSnapshot"):
+            return set(self._attribute_registers.values())
+        return {
+            register_name
+            for attribute_name, register_name in self._attribute_registers.items()
+            if has_subscriber(attribute_name)
+        }
+
+    def _sensor_updated(
+        self, register_name: str, value: float, timestamp: float, quality: SampleQuality
+    ) -> None:
+        """Push and archive events on a register value or quality change."""
+        attribute_name, convert = self._register_event_accessors[register_name]
+        # See the is_omni_thread() note in _component_state_changed
+        if not is_omni_thread():
+            event_value = convert(value)
+            attr_quality = ATTR_QUALITY[quality]
+            self.push_change_event(attribute_name, event_value, timestamp, attr_quality)
+            self.push_archive_event(attribute_name, event_value, timestamp, attr_quality)
+
     def _communication_state_changed(self, communication_state: CommunicationStatus) -> None:
         """Push and archive events on communication state change."""
         self.push_change_event("connectionState", communication_state)
@@ -143,114 +406,122 @@ class B5dcProxy(SKABaseDevice):
     @attribute(
         dtype=float,
         access=AttrWriteType.READ,
-        doc="Indicates the PLL Output Frequency. The default value is 11.1 GHz",
+        unit="s",
+        doc="Scheduling lag of the B5DC connection event loop in s, measured every second. "
+        "A loop stuck for longer than 10 s, like a dead loop thread or connection "
+        "task, is restarted with backoff.",
     )
-    def rfcmFrequency(self: "B5dcProxy") -> float:
-        """Reflect the PLL output frequency in GHz."""
-        self.component_manager.sync_register_outside_event_loop("spi_rfcm_frequency")
-        return self.component_manager.component_state.get("spi_rfcm_frequency", 0.0)
+    def loopLag(self: "B5dcProxy") -> float:
+        """Return the last measured event loop scheduling lag."""
+        return self.component_manager.loop_lag
 
     @attribute(
-        dtype=B5dcPllState,
+        dtype=(str,),
+        max_dim_x=len(COMMAND_TRACE_STAGES),
         access=AttrWriteType.READ,
-        doc="Status flags for RFCM PLL lock and lock loss detection.",
+        doc="Stages of the traced commands, from the Tango call through the executor "
+        "queue and the connection loop to the B5DC and the result and state pushes: "
+        f"{', '.join(COMMAND_TRACE_STAGES)}.",
     )
-    def rfcmPllLock(self: "B5dcProxy") -> B5dcPllState:
-        """Return the Phase lock loop state."""
-        self.component_manager.sync_register_outside_event_loop("spi_rfcm_pll_lock")
-        return self.component_manager.component_state.get(
-            "spi_rfcm_pll_lock", B5dcPllState.NOT_LOCKED
-        )
+    def commandStages(self: "B5dcProxy") -> List[str]:
+        """Return the names of the command stages."""
+        return list(COMMAND_TRACE_STAGES)
 
     @attribute(
-        dtype=float,
+        dtype=(float,),
+        max_dim_x=len(COMMAND_TRACE_STAGES),
         access=AttrWriteType.READ,
-        doc="Reflects the RFCM H-polarization attenuation value in dB.",
+        unit="s",
+        doc="Mean latency of each of the commandStages in s over the last 100 commands, "
+        "0 for a stage without any.",
     )
-    def rfcmHAttenuation(self: "B5dcProxy") -> float:
-        """Return the rfcmHAttenuation."""
-        self.component_manager.sync_register_outside_event_loop("spi_rfcm_h_attenuation")
-        return self.component_manager.component_state.get("spi_rfcm_h_attenuation", 0.0)
+    def commandStageLatencyMean(self: "B5dcProxy") -> List[float]:
+        """Return the mean latency of each command stage."""
+        means, _ = self.component_manager.tracer.stage_latencies()
+        return means
 
     @attribute(
-        dtype=float,
+        dtype=(float,),
+        max_dim_x=len(COMMAND_TRACE_STAGES),
         access=AttrWriteType.READ,
-        doc="Reflects the RFCM V-polarization attenuation value in dB.",
+        unit="s",
+        doc="Maximum latency of each of the commandStages in s over the last 100 "
+        "commands, 0 for a stage without any.",
     )
-    def rfcmVAttenuation(self: "B5dcProxy") -> float:
-        """Return the rfcmVAttenuation."""
-        self.component_manager.sync_register_outside_event_loop("spi_rfcm_v_attenuation")
-        return self.component_manager.component_state.get("spi_rfcm_v_attenuation", 0.0)
+    def commandStageLatencyMax(self: "B5dcProxy") -> List[float]:
+        """Return the maximum latency of each command stage."""
+        _, maxima = self.component_manager.tracer.stage_latencies()
+        return maxima
 
     @attribute(
         dtype=float,
         access=AttrWriteType.READ,
-        doc="Reflects the photodiode current in mA.",
+        unit="s",
+        doc="Time taken for the RFCM PLL to lock following the last SetFrequency in s. "
+        "Only measured when B5dc_wait_for_pll_lock is enabled.",
     )
-    def clkPhotodiodeCurrent(self: "B5dcProxy") -> float:
-        """Return the photo diode current."""
-        self.component_manager.sync_register_outside_event_loop("spi_rfcm_photo_diode_ain0")
-        return self.component_manager.component_state.get("spi_rfcm_photo_diode_ain0", 0.0)
+    def rfcmPllLockTime(self: "B5dcProxy") -> float:
+        """Return the last PLL lock acquisition time."""
+        return self.component_manager.last_pll_lock_time
 
     @attribute(
-        dtype=float,
+        dtype=(int,),
+        max_dim_x=len(PLL_LOCK_TIME_BUCKETS_SEC) + 1,
         access=AttrWriteType.READ,
-        doc="Reflects the RFCM RF power input for horizonal polarization in dBm.",
+        doc="Histogram of PLL lock acquisition times following SetFrequency. Each "
+        "count is for the bucket bounded above by the matching rfcmPllLockTimeBuckets "
+        "entry, with a final overflow bucket.",
     )
-    def hPolRfPowerIn(self: "B5dcProxy") -> float:
-        """Return the hPolRfPowerIn."""
-        self.component_manager.sync_register_outside_event_loop("spi_rfcm_rf_in_h_ain1")
-        return self.component_manager.component_state.get("spi_rfcm_rf_in_h_ain1", 0.0)
+    def rfcmPllLockTimeHistogram(self: "B5dcProxy") -> List[int]:
+        """Return the PLL lock acquisition time histogram counts."""
+        counts, _ = self.component_manager.pll_lock_time_histogram.snapshot()
+        return counts.tolist()
 
     @attribute(
-        dtype=float,
+        dtype=(float,),
+        max_dim_x=len(PLL_LOCK_TIME_BUCKETS_SEC),
         access=AttrWriteType.READ,
-        doc="Reflects the RFCM RF power input for vertical polarization in dBm.",
+        unit="s",
+        doc="Upper bounds of the rfcmPllLockTimeHistogram buckets in s.",
     )
-    def vPolRfPowerIn(self: "B5dcProxy") -> float:
-        """Return the vPolRfPowerIn."""
-        self.component_manager.sync_register_outside_event_loop("spi_rfcm_rf_in_v_ain2")
-        return self.component_manager.component_state.get("spi_rfcm_rf_in_v_ain2", 0.0)
+    def rfcmPllLockTimeBuckets(self: "B5dcProxy") -> List[float]:
+        """Return the PLL lock acquisition time histogram bucket bounds."""
+        return list(PLL_LOCK_TIME_BUCKETS_SEC)
 
     @attribute(
-        dtype=float,
+        dtype=HealthState,
         access=AttrWriteType.READ,
-        doc="Reflects the RFCM RF power output for horizonal polarization in dBm.",
+        doc="Summarised health of the B5DC from the B5dc_alarm_rules, the highest severity "
+        "of the active alarms: OK without active alarms, DEGRADED or FAILED, and UNKNOWN "
+        "before the first poll cycle. Changes only when an alarm is raised or cleared.",
     )
-    def hPolRfPowerOut(self: "B5dcProxy") -> float:
-        """Return the hPolRfPowerOut."""
-        self.component_manager.sync_register_outside_event_loop("spi_rfcm_if_out_h_ain3")
-        return self.component_manager.component_state.get("spi_rfcm_if_out_h_ain3", 0.0)
+    def b5dcHealth(self: "B5dcProxy") -> HealthState:
+        """Return the summarised B5DC health."""
+        return self.component_manager.component_state["b5dchealth"]
 
     @attribute(
-        dtype=float,
+        dtype=(str,),
+        max_dim_x=MAX_ACTIVE_ALARMS,
         access=AttrWriteType.READ,
-        doc="Reflects the RFCM RF power output for vertical polarization in dBm.",
+        doc="Names of the active B5DC alarms, as named by the B5dc_alarm_rules.",
     )
-    def vPolRfPowerOut(self: "B5dcProxy") -> float:
-        """Return the vPolRfPowerOut sensor value."""
-        self.component_manager.sync_register_outside_event_loop("spi_rfcm_if_out_v_ain4")
-        return self.component_manager.component_state.get("spi_rfcm_if_out_v_ain4", 0.0)
+    def activeAlarms(self: "B5dcProxy") -> List[str]:
+        """Return the names of the active alarms."""
+        return self.component_manager.component_state["activealarms"]
 
     @attribute(
-        dtype=float,
+        dtype=(float,),
+        max_dim_x=len(B5DC_SNAPSHOT_FIELDS),
         access=AttrWriteType.READ,
-        doc="Reflects the RFCM RF PCB temperature in deg C.",
+        doc="Compact aggregate of the register values, NaN where the last read failed "
+        "and the state value for an enumerated register, followed by the connection state "
+        "as its CommunicationStatus value, in the order "
+        f"{', '.join(B5DC_SNAPSHOT_FIELDS)}. Empty until the first poll cycle, then "
+        "pushed at most once per poll cycle and on connection state changes.",
     )
-    def rfTemperature(self: "B5dcProxy") -> float:
-        """Return the of the RFCM RF PCB in deg."""
-        self.component_manager.sync_register_outside_event_loop("spi_rfcm_rf_temp_ain5")
-        return self.component_manager.component_state.get("spi_rfcm_rf_temp_ain5", 0.0)
-
-    @attribute(
-        dtype=float,
-        access=AttrWriteType.READ,
-        doc="Reflects RFCM PSU PCB temperature in deg C.",
-    )
-    def rfcmPsuPcbTemperature(self: "B5dcProxy") -> float:
-        """Return the temperature of the RFCM PSU PCB in deg."""
-        self.component_manager.sync_register_outside_event_loop("spi_rfcm_psu_pcb_temp_ain7")
-        return self.component_manager.component_state.get("spi_rfcm_psu_pcb_temp_ain7", 0.0)
+    def sensorSnapshot(self: "B5dcProxy") -> List[float]:
+        """Return the compact snapshot of all registers."""
+        return list(self.component_manager.component_state["sensorsnapshot"])
 
     # =========
     # Commands
@@ -265,8 +536,10 @@ class B5dcProxy(SKABaseDevice):
     )
     def SetHPolAttenuation(self: "B5dcProxy", attenuation_db: int) -> DevVarLongStringArrayType:
         """Set the horizontal polarization attenuation on the band 5 down converter."""
-        handler = self.get_command_object("SetHPolAttenuation")
-        result_code, unique_id = handler(attenuation_db, "spi_rfcm_h_attenuation")
+        with self.component_manager.tracer.trace("SetHPolAttenuation") as trace:
+            handler = self.get_command_object("SetHPolAttenuation")
+            result_code, unique_id = handler(attenuation_db, "spi_rfcm_h_attenuation")
+            trace.args["command_id"] = unique_id
         return [result_code], [unique_id]
 
     @command(
@@ -279,8 +552,10 @@ class B5dcProxy(SKABaseDevice):
     )
     def SetVPolAttenuation(self: "B5dcProxy", attenuation_db: int) -> DevVarLongStringArrayType:
         """Set the vertical polarization attenuation on the band 5 down converter."""
-        handler = self.get_command_object("SetVPolAttenuation")
-        result_code, unique_id = handler(attenuation_db, "spi_rfcm_v_attenuation")
+        with self.component_manager.tracer.trace("SetVPolAttenuation") as trace:
+            handler = self.get_command_object("SetVPolAttenuation")
+            result_code, unique_id = handler(attenuation_db, "spi_rfcm_v_attenuation")
+            trace.args["command_id"] = unique_id
         return [result_code], [unique_id]
 
     @command(
@@ -294,10 +569,128 @@ class B5dcProxy(SKABaseDevice):
     )
     def SetFrequency(self: "B5dcProxy", frequency: B5dcFrequency) -> DevVarLongStringArrayType:
         """Set the frequency on the band 5 down converter."""
-        handler = self.get_command_object("SetFrequency")
-        result_code, unique_id = handler(frequency)
+        with self.component_manager.tracer.trace("SetFrequency") as trace:
+            handler = self.get_command_object("SetFrequency")
+            result_code, unique_id = handler(frequency)
+            trace.args["command_id"] = unique_id
+        return [result_code], [unique_id]
+
+    @command(
+        dtype_in="DevVarLongArray",
+        dtype_out="DevVarLongStringArray",
+        doc_in="""Set the frequency and both attenuations on the band 5 down converter.
+
+        The register writes are issued in one task and verified with a single
+        readback, reporting one long running command result.
+
+        :param band5_configuration: [frequency, h_attenuation_db, v_attenuation_db]
+            where frequency is one of [B5dcFrequency.F_11_1_GHZ(1),
+            B5dcFrequency.F_13_2_GHZ(2) or B5dcFrequency.F_13_86_GHZ(3)] and the
+            attenuations are in dB [0-31dB]
+        """,
+    )
+    def ConfigureBand5(
+        self: "B5dcProxy", band5_configuration: List[int]
+    ) -> DevVarLongStringArrayType:
+        """Set the frequency and both attenuations on the band 5 down converter."""
+        if len(band5_configuration) != 3:
+            return [ResultCode.REJECTED], [
+                f"Expected [frequency, h_attenuation_db, v_attenuation_db], "
+                f"got {list(band5_configuration)}"
+            ]
+        with self.component_manager.tracer.trace("ConfigureBand5") as trace:
+            handler = self.get_command_object("ConfigureBand5")
+            result_code, unique_id = handler(*[int(value) for value in band5_configuration])
+            trace.args["command_id"] = unique_id
         return [result_code], [unique_id]
 
+    @command(
+        dtype_in="DevVarLongStringArray",
+        dtype_out=str,
+        doc_in="""Return the most recent polled samples of a B5DC register.
+
+        :param history_request: ([num_samples], [register_name]) where register_name
+            is the B5DC register, e.g. spi_rfcm_pll_lock
+        """,
+        doc_out="JSON object with the register name and the values, timestamps and "
+        "qualities of the samples, oldest first, with a null value for an invalid sample",
+    )
+    def GetSensorHistory(self: "B5dcProxy", history_request: Tuple[List[int], List[str]]) -> str:
+        """Return the most recent polled samples of a B5DC register."""
+        [num_samples], [register_name] = history_request
+        values, timestamps, quality = self.component_manager.get_sensor_history(
+            register_name, num_samples
+        )
+        return json.dumps(
+            {
+                "register": register_name,
+                "values": np.where(np.isnan(values), None, values).tolist(),
+                "timestamps": timestamps.tolist(),
+                "quality": quality.tolist(),
+            },
+            allow_nan=False,
+        )
+
+    @command(
+        dtype_in=float,
+        dtype_out=str,
+        display_level=DispLevel.EXPERT,
+        doc_in="""Start sampling the stacks of the device server threads.
+
+        The event loop, executor and other threads are sampled every 10 ms from a
+        separate thread until StopProfile, or the duration, bounded to 300 s, ends.
+
+        :param duration: profile duration in seconds
+        """,
+        doc_out="Profile duration in seconds once bounded, e.g. 'Profiling for 60 s'",
+    )
+    def StartProfile(self: "B5dcProxy", duration: float) -> str:
+        """Start sampling the stacks of the device server threads."""
+        return self.component_manager.start_profile(duration)
+
+    @command(
+        dtype_out=str,
+        display_level=DispLevel.EXPERT,
+        doc_out="'Collapsed stacks written to <path>', then the number of samples, the time "
+        "sampled and the interval, and per thread its samples and the 20 functions most "
+        "often on its stack, each with the percentage of samples in which it was running "
+        "(self) and on the stack (total)",
+    )
+    def StopProfile(self: "B5dcProxy") -> str:
+        """Stop the profile and return its report."""
+        return self.component_manager.stop_profile()
+
+    @command(
+        dtype_in=float,
+        dtype_out=str,
+        display_level=DispLevel.EXPERT,
+        doc_in="""Start tracing the memory allocations of the device server.
+
+        Tracing stops by itself after the duration, bounded to 300 s.
+
+        :param duration: trace duration in seconds
+        """,
+        doc_out="Trace duration in seconds once bounded, "
+        "e.g. 'Tracing memory allocations for 60 s'",
+    )
+    def StartMemoryTrace(self: "B5dcProxy", duration: float) -> str:
+        """Start tracing the memory allocations of the device server."""
+        return self.component_manager.start_memory_trace(duration)
+
+    @command(
+        dtype_in=int,
+        dtype_out=str,
+        display_level=DispLevel.EXPERT,
+        doc_in="Number N of allocation sites to return, the top N by memory growth",
+        doc_out="Whether the trace is running, the KiB traced and their growth since the "
+        "trace started, then a line per allocation site, largest growth first, with its "
+        "file and line, size, growth, allocation count and average allocation size. Of the "
+        "running trace, or else of the last one",
+    )
+    def GetMemorySnapshot(self: "B5dcProxy", top: int) -> str:
+        """Return the allocation sites holding the most memory."""
+        return self.component_manager.memory_snapshot(top)
+
 
 def main(args: Any = None, **kwargs: Any) -> None:
     """Launch an instance of the B5dcProxy Tango device."""
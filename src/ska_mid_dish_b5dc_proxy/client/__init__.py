@@ -0,0 +1 @@
+"""Package that contains the Tango-free asyncio client of the B5DC."""
@@ -0,0 +1,388 @@
+"""
+Module containing the Tango-free asyncio client of a B5DC server.
+
+The client owns the connection to one B5DC: a monitoring socket (lane) for
+register reads and a separate command lane for writes and their readback. It
+runs on whichever event loop awaits it, so engineering scripts can drive a B5DC
+directly, e.g.::
+
+    async with B5dcClient("10.0.0.1", 10001, logger) as client:
+        await client.set_frequency(B5dcFrequency.F_13_2_GHZ)
+        async for snapshot in client.snapshots(period=1.0):
+            print(snapshot["spi_rfcm_pll_lock"])
+"""
+
+# pylint: disable=too-many-instance-attributes
+
+import asyncio
+import logging
+import math
+import operator
+import time
+from asyncio import BaseProtocol, DatagramTransport
+from threading import Lock
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from ska_mid_dish_dcp_lib.device.b5dc_device import (
+    B5dcDeviceConfigureAttenuation,
+    B5dcDeviceConfigureFrequency,
+    B5dcDeviceSensors,
+)
+from ska_mid_dish_dcp_lib.device.b5dc_device_mappings import B5dcFrequency, B5dcPllState
+from ska_mid_dish_dcp_lib.device.b5dc_pca import (
+    B5dcFpgaFirmware,
+    B5dcIicDevice,
+    B5dcPhysicalConfiguration,
+)
+from ska_mid_dish_dcp_lib.interface.b5dc_interface import B5dcInterface, B5dcPropertyParser
+from ska_mid_dish_dcp_lib.protocol.b5dc_protocol import B5dcProtocol, B5dcProtocolTimeout
+
+from ska_mid_dish_b5dc_proxy.models.constants import (
+    B5DC_BUILD_STATE_DEVICE_NAME,
+    B5DC_FREQUENCY_GHZ,
+)
+from ska_mid_dish_b5dc_proxy.models.data_classes import B5dcBuildStateDataclass
+from ska_mid_dish_b5dc_proxy.models.registers import B5DC_REGISTERS
+from ska_mid_dish_b5dc_proxy.transport.udp_pool import UdpTransportPool
+
+# Tolerances used when verifying configuration readback values
+FREQUENCY_READBACK_TOLERANCE_GHZ = 0.01
+ATTENUATION_READBACK_TOLERANCE_DB = 0.5
+# Period at which coroutines retry acquiring the sensor update lock
+SENSOR_LOCK_RETRY_PERIOD_SEC = 0.005
+# Cadence of the PLL lock wait following a frequency change
+PLL_LOCK_POLL_PERIOD_SEC = 0.05
+BAND5_CONFIGURATION_REGISTERS = (
+    "spi_rfcm_frequency",
+    "spi_rfcm_h_attenuation",
+    "spi_rfcm_v_attenuation",
+)
+
+
+class B5dcClient:
+    """Asyncio client monitoring and configuring one B5DC over UDP."""
+
+    def __init__(
+        self,
+        server_ip: str,
+        server_port: int,
+        logger: logging.Logger,
+        transport_pool: Optional[UdpTransportPool] = None,
+    ) -> None:
+        """
+        Initialise the client; no connection is made until connect() is awaited.
+
+        :param server_ip: IP address of the B5DC server
+        :param server_port: port of the B5DC server
+        :param logger: logger
+        :param transport_pool: shared UDP socket pool to create the lanes on, by
+            default each lane has its own socket
+        """
+        self._logger = logger
+        self.server_addr = (server_ip, server_port)
+        self.transport_pool = transport_pool
+
+        self._transport: Optional[DatagramTransport] = None
+        self._protocol: Optional[BaseProtocol] = None
+        self._cmd_transport: Optional[DatagramTransport] = None
+        self._cmd_protocol: Optional[BaseProtocol] = None
+        self._connection_lost: List[asyncio.Future] = []
+
+        self._b5dc_iic: B5dcIicDevice = None
+        self._b5dc_pca: B5dcPhysicalConfiguration = None
+        self._b5dc_fw: B5dcFpgaFirmware = None
+        # Sensors read on the monitoring lane and, for command readback, the command lane
+        self.sensors: B5dcDeviceSensors = None
+        self.command_sensors: B5dcDeviceSensors = None
+        self._device_attn_conf: B5dcDeviceConfigureAttenuation = None
+        self._device_freq_conf: B5dcDeviceConfigureFrequency = None
+
+        # The monitoring sensors may be updated from more than one event loop
+        # (thread), e.g. client reads outside the connection loop
+        self._sensor_update_lock = Lock()
+        self._sensor_readers = {
+            register.name: operator.attrgetter(register.sensor_field)
+            for register in B5DC_REGISTERS
+        }
+
+    async def __aenter__(self) -> "B5dcClient":
+        """Connect to the B5DC."""
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        """Close the connection to the B5DC."""
+        self.close()
+
+    # ============
+    #  Connection
+    # ============
+
+    async def connect(self) -> None:
+        """Create the monitoring and command lanes and the B5DC interface objects."""
+        loop = asyncio.get_running_loop()
+        self._connection_lost = [loop.create_future(), loop.create_future()]
+        self._transport, self._protocol = await self._create_endpoint(self._connection_lost[0])
+        self._cmd_transport, self._cmd_protocol = await self._create_endpoint(
+            self._connection_lost[1]
+        )
+        self._update_b5dc_interface()
+        self._b5dc_iic = B5dcIicDevice(self._protocol)
+        self._b5dc_fw = B5dcFpgaFirmware(self._logger, self._protocol)
+        self._b5dc_pca = B5dcPhysicalConfiguration(self._logger, self._b5dc_iic)
+
+    async def wait_connection_lost(self) -> None:
+        """Wait until either lane reports its connection lost."""
+        await asyncio.wait(self._connection_lost, return_when=asyncio.FIRST_COMPLETED)
+
+    def close(self) -> None:
+        """Close both lanes."""
+        for transport in (self._transport, self._cmd_transport):
+            if transport:
+                transport.close()
+
+    async def _create_endpoint(
+        self, connection_lost: asyncio.Future
+    ) -> Tuple[DatagramTransport, BaseProtocol]:
+        """Create a datagram endpoint to the B5DC server, over the shared pool if set."""
+
+        def protocol_factory() -> B5dcProtocol:
+            return B5dcProtocol(connection_lost, self._logger, self.server_addr)
+
+        if self.transport_pool is not None:
+            return await self.transport_pool.create_endpoint(protocol_factory, self.server_addr)
+        return await asyncio.get_running_loop().create_datagram_endpoint(
+            protocol_factory, local_addr=("0.0.0.0", 0), remote_addr=self.server_addr
+        )
+
+    def _update_b5dc_interface(self) -> None:
+        """
+        Create instances of B5dc freq and atten config and device sensor classes.
+
+        Monitoring reads use the polling protocol while the configuration classes,
+        and the sensors used for command readback, use the command protocol.
+        """
+        if self._protocol is None or self._cmd_protocol is None:
+            raise RuntimeError("Protocol is not initialized")
+        property_parser = B5dcPropertyParser(self._logger)
+        interface = B5dcInterface(
+            self._logger,
+            property_parser,
+            get_method=self._protocol.sync_read_register,  # type: ignore
+            set_method=self._protocol.sync_write_register,  # type: ignore
+        )
+        command_interface = B5dcInterface(
+            self._logger,
+            property_parser,
+            get_method=self._cmd_protocol.sync_read_register,  # type: ignore
+            set_method=self._cmd_protocol.sync_write_register,  # type: ignore
+        )
+        self.sensors = B5dcDeviceSensors(self._logger, interface)
+        self.command_sensors = B5dcDeviceSensors(self._logger, command_interface)
+        self._device_attn_conf = B5dcDeviceConfigureAttenuation(self._logger, command_interface)
+        self._device_freq_conf = B5dcDeviceConfigureFrequency(self._logger, command_interface)
+
+    # ============
+    #  Monitoring
+    # ============
+
+    async def update_register(
+        self, register_name: str, max_lock_wait: Optional[float] = None
+    ) -> bool:
+        """
+        Read a register on the monitoring lane.
+
+        Waiting on the sensor lock yields to the event loop, so that a read
+        holding it from another loop can complete and release it.
+
+        :param register_name: the register to read, e.g. spi_rfcm_pll_lock
+        :param max_lock_wait: give up the read if the sensor lock is not acquired
+            within this many seconds, by default wait indefinitely
+        :return: whether the register was read
+        :raises KeyError: if the register is unknown
+        :raises B5dcProtocolTimeout: if the B5DC did not respond
+        """
+        deadline = None if max_lock_wait is None else time.monotonic() + max_lock_wait
+        while not self._sensor_update_lock.acquire(blocking=False):  # pylint: disable=R1732
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(SENSOR_LOCK_RETRY_PERIOD_SEC)
+        try:
+            await self.sensors.update_sensor(register_name)
+        finally:
+            self._sensor_update_lock.release()
+        return True
+
+    def register_value(self, register_name: str, command_lane: bool = False) -> Any:
+        """
+        Return the value of a register as of its last read.
+
+        :param register_name: the register
+        :param command_lane: return the value last read back on the command lane
+        :return: the register value
+        """
+        return self._sensor_readers[register_name](
+            self.command_sensors if command_lane else self.sensors
+        )
+
+    async def read_registers(
+        self, register_names: Sequence[str], command_lane: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Read registers and return their values.
+
+        Registers are read one after the other, on either lane, as the protocol
+        matches a reply to the oldest outstanding request rather than by register.
+
+        :param register_names: the registers to read
+        :param command_lane: read on the command lane, e.g. to read back a write
+        :return: the register values by name
+        :raises B5dcProtocolTimeout: if the B5DC did not respond
+        """
+        if command_lane:
+            for register_name in register_names:
+                await self.command_sensors.update_sensor(register_name)
+        else:
+            for register_name in register_names:
+                await self.update_register(register_name)
+        return {name: self.register_value(name, command_lane) for name in register_names}
+
+    async def snapshots(
+        self, period: float, register_names: Optional[Sequence[str]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Read registers every period and yield their values.
+
+        A register which times out is reported as None in that snapshot.
+
+        :param period: seconds between the start of consecutive snapshots
+        :param register_names: the registers to read, by default all registers
+        :return: async iterator over the register values by name
+        """
+        register_names = register_names or list(self._sensor_readers)
+        loop = asyncio.get_running_loop()
+        next_snapshot = loop.time()
+        while True:
+            snapshot: Dict[str, Any] = {}
+            for register_name in register_names:
+                try:
+                    await self.update_register(register_name)
+                    snapshot[register_name] = self.register_value(register_name)
+                except B5dcProtocolTimeout:
+                    snapshot[register_name] = None
+            yield snapshot
+            next_snapshot += period
+            await asyncio.sleep(max(0.0, next_snapshot - loop.time()))
+
+    async def read_build_state(self) -> Optional[B5dcBuildStateDataclass]:
+        """
+        Read the version information of the B5DC.
+
+        :return: the build state, or None if the B5DC was not connected
+        """
+        if self._b5dc_pca is None or self._b5dc_fw is None:
+            return None
+        await self._b5dc_pca.update_pca_info()
+        await self._b5dc_fw.update_model_filename()
+        await self._b5dc_fw.update_firmware_build_timestamp()
+
+        firmware_file = f"{self._b5dc_fw.b5dc_file_model_name}_{self._b5dc_fw.b5dc_build_time}.fpg"
+        return B5dcBuildStateDataclass(
+            device=B5DC_BUILD_STATE_DEVICE_NAME,
+            device_ip=self.server_addr[0],
+            device_version=self._b5dc_pca.b5dc_version,
+            comms_engine_version=self._b5dc_pca.b5dc_comms_engine_version,
+            rfcm_psu_version=self._b5dc_pca.b5dc_rfcm_psu_version,
+            rfcm_pcb_version=self._b5dc_pca.b5dc_rfcm_pcb_version,
+            backplane_version=self._b5dc_pca.b5dc_backplane_version,
+            psu_version=self._b5dc_pca.b5dc_psu_version,
+            icd_version=self._b5dc_pca.b5dc_icd_version,
+            fpga_firmware_file=firmware_file,
+        )
+
+    # ==========
+    #  Commands
+    # ==========
+
+    async def set_attenuation(self, attenuation_db: int, attn_reg_name: str) -> None:
+        """
+        Set an attenuation on the command lane.
+
+        :param attenuation_db: the attenuation in dB
+        :param attn_reg_name: spi_rfcm_h_attenuation or spi_rfcm_v_attenuation
+        :raises B5dcDeviceAttenuationException: if the attenuation was not set
+        """
+        await self._device_attn_conf.set_attenuation(attenuation_db, attn_reg_name)
+
+    async def set_frequency(self, frequency: B5dcFrequency) -> None:
+        """
+        Set the frequency on the command lane.
+
+        :param frequency: the frequency
+        :raises B5dcDeviceFrequencyException: if the frequency was not set
+        """
+        await self._device_freq_conf.set_frequency(frequency)
+
+    async def wait_for_pll_lock(self, timeout: float) -> Optional[float]:
+        """
+        Poll the PLL lock register on the command lane until it locks or times out.
+
+        :param timeout: seconds to wait for the PLL to lock
+        :return: the time taken for the PLL to lock, or None if it did not lock
+        """
+        started = time.monotonic()
+        deadline = started + timeout
+        while True:
+            try:
+                await self.command_sensors.update_sensor("spi_rfcm_pll_lock")
+            except B5dcProtocolTimeout:
+                self._logger.warning("Timeout reading PLL lock state, retrying")
+            else:
+                if self.command_sensors.rfcm_pll_lock in (
+                    B5dcPllState.LOCKED,
+                    B5dcPllState.LOCKED_WITH_LOSS_DETECTED,
+                ):
+                    return time.monotonic() - started
+            if time.monotonic() >= deadline:
+                return None
+            await asyncio.sleep(PLL_LOCK_POLL_PERIOD_SEC)
+
+    async def configure_band5(
+        self,
+        frequency: B5dcFrequency,
+        h_attenuation_db: int,
+        v_attenuation_db: int,
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Write the band 5 configuration registers and verify them with one readback.
+
+        The writes are issued one after the other, as a single request is in flight
+        on a lane at a time, and then read back in a single batch.
+
+        :param frequency: the frequency
+        :param h_attenuation_db: the H polarization attenuation in dB
+        :param v_attenuation_db: the V polarization attenuation in dB
+        :return: the readback values by register and a description of each
+            register that did not read back as written
+        """
+        await self.set_frequency(frequency)
+        await self.set_attenuation(h_attenuation_db, "spi_rfcm_h_attenuation")
+        await self.set_attenuation(v_attenuation_db, "spi_rfcm_v_attenuation")
+        readback = await self.read_registers(BAND5_CONFIGURATION_REGISTERS, command_lane=True)
+
+        mismatches = []
+        expected_values = (
+            (
+                "spi_rfcm_frequency",
+                B5DC_FREQUENCY_GHZ[frequency],
+                FREQUENCY_READBACK_TOLERANCE_GHZ,
+            ),
+            ("spi_rfcm_h_attenuation", h_attenuation_db, ATTENUATION_READBACK_TOLERANCE_DB),
+            ("spi_rfcm_v_attenuation", v_attenuation_db, ATTENUATION_READBACK_TOLERANCE_DB),
+        )
+        for register_name, expected, tolerance in expected_values:
+            if not math.isclose(readback[register_name], expected, abs_tol=tolerance):
+                mismatches.append(
+                    f"{register_name} expected {expected}, read {readback[register_name]}"
+                )
+        return readback, mismatches
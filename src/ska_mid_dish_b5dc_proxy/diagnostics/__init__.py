@@ -0,0 +1 @@
+"""Package that contains the logging and diagnostics utilities of the B5DC devices."""
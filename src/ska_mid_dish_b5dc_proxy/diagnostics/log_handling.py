@@ -0,0 +1,153 @@
+"""
+Module containing the logging helpers used on the B5DC polling hot path.
+
+Records logged on the connection event loop are handed over to a listener
+thread, so that the I/O of the device logging targets never runs on the loop,
+and events which repeat on every poll cycle, such as read timeouts, are logged
+once and then as a count per window.
+"""
+
+# pylint: disable=too-many-arguments
+
+import logging
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener
+from threading import Lock
+from typing import Callable, Dict, List, Optional
+
+
+class _ParentHandler(logging.Handler):
+    """Pass records on to a logger, on the thread of the queue listener."""
+
+    def __init__(self, logger: logging.Logger) -> None:
+        """
+        Initialise the handler.
+
+        :param logger: the logger to pass the records on to
+        """
+        super().__init__()
+        self._logger = logger
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Handle the record with the handlers of the logger and its ancestors."""
+        self._logger.handle(record)
+
+
+class LogQueue:
+    """
+    Child logger whose records reach the parent logger through a listener thread.
+
+    The child logger inherits the level of its parent, so the device logging level
+    still applies, and is checked before a record is queued. While the queue is
+    stopped the child logger propagates its records synchronously.
+    """
+
+    def __init__(self, logger: logging.Logger, name: str = "queued") -> None:
+        """
+        Initialise the queue.
+
+        :param logger: the logger to pass the records on to
+        :param name: the name of the child logger
+        """
+        self._parent = logger
+        # Only a standard logger has a hierarchy to attach the child logger to
+        self.logger = logger.getChild(name) if isinstance(logger, logging.Logger) else logger
+        self._handler = QueueHandler(queue.SimpleQueue())
+        self._listener: Optional[QueueListener] = None
+
+    def start(self) -> None:
+        """Start the listener thread and queue the records of the child logger."""
+        if self._listener is not None or self.logger is self._parent:
+            return
+        self._listener = QueueListener(self._handler.queue, _ParentHandler(self._parent))
+        self._listener.start()
+        self.logger.addHandler(self._handler)
+        self.logger.propagate = False
+
+    def stop(self) -> None:
+        """Stop queueing records and wait for the listener to pass on the queued ones."""
+        if self._listener is None:
+            return
+        # Propagate before removing the handler so that no record is dropped
+        self.logger.propagate = True
+        self.logger.removeHandler(self._handler)
+        self._listener.stop()
+        self._listener = None
+
+
+class AggregatedLog:
+    """
+    Log the first of a run of repeated events, then their count once per window.
+
+    Each subject, for example a register, has its own window, which starts with
+    the first event logged for it. Events in the window are only counted and
+    logged as one record when the window ends.
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        level: int,
+        message: str,
+        window: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initialise the aggregated log.
+
+        :param logger: the logger to log the events to
+        :param level: the level of the logged records
+        :param message: the event message, with a %s placeholder for the subject
+        :param window: the length in seconds of the aggregation window
+        :param clock: monotonic clock returning the time in seconds
+        """
+        self._logger = logger
+        self._level = level
+        self._message = message
+        self._window = window
+        self._clock = clock
+        # Start time and count of further events of the open window of each subject
+        self._windows: Dict[str, List[float]] = {}
+        self._lock = Lock()
+
+    def record(self, subject: str) -> None:
+        """
+        Record an event, logging it if it is the first for its subject.
+
+        :param subject: what the event happened to
+        """
+        now = self._clock()
+        with self._lock:
+            window = self._windows.get(subject)
+            if window is not None and now - window[0] >= self._window:
+                self._close_window(subject, window, now)
+                window = self._windows.get(subject)
+            if window is None:
+                self._windows[subject] = [now, 0]
+                self._logger.log(self._level, self._message, subject)
+            else:
+                window[1] += 1
+
+    def flush(self) -> None:
+        """Log the counts of the windows which have ended."""
+        now = self._clock()
+        with self._lock:
+            for subject, window in list(self._windows.items()):
+                if now - window[0] >= self._window:
+                    self._close_window(subject, window, now)
+
+    def _close_window(self, subject: str, window: List[float], now: float) -> None:
+        """Log the count of an ended window, keeping the subject quiet while events recur."""
+        start, count = window
+        if count:
+            self._logger.log(
+                self._level,
+                f"{self._message}: %d more in the last %.0f s",
+                subject,
+                count,
+                now - start,
+            )
+            self._windows[subject] = [now, 0]
+        else:
+            del self._windows[subject]
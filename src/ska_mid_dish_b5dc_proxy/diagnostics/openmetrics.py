@@ -0,0 +1,200 @@
+"""
+Module containing the OpenMetrics HTTP endpoint of the B5DC devices of a process.
+
+Each device registers a collector returning its metric families; a scrape of the
+endpoint merges the families of all the devices of the process, so that a
+monitoring system reads the counters of a whole device server without any
+Tango call. The endpoint serves from its own thread and is started by the first
+device to register and stopped once the last one unregisters.
+"""
+
+import logging
+import math
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ska_mid_dish_b5dc_proxy.telemetry.histogram import Histogram
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+METRICS_PATH = "/metrics"
+
+
+def _format_value(value: float) -> str:
+    """Return a sample value in the OpenMetrics number format."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape(value: str) -> str:
+    """Return a label value with its backslashes, quotes and newlines escaped."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    """Return a label set, or nothing if it is empty."""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+@dataclass
+class MetricFamily:
+    """A metric with its metadata and samples, e.g. one counter across registers."""
+
+    name: str
+    type: str
+    help: str
+    unit: str = ""
+    # Sample name suffix, labels and value of each sample
+    samples: List[Tuple[str, Dict[str, str], float]] = field(default_factory=list)
+
+    def add(self, value: float, suffix: str = "", **labels: str) -> None:
+        """
+        Add a sample.
+
+        :param value: the sample value
+        :param suffix: the suffix of the sample name, e.g. _total for a counter
+        :param labels: the labels of the sample
+        """
+        self.samples.append((suffix, labels, value))
+
+    def add_histogram(self, histogram: Histogram, **labels: str) -> None:
+        """
+        Add the cumulative buckets, count and sum of a histogram.
+
+        :param histogram: the histogram
+        :param labels: the labels of the samples
+        """
+        counts, total = histogram.snapshot()
+        cumulative = 0
+        for bound, count in zip(list(histogram.bounds) + [math.inf], counts):
+            cumulative += int(count)
+            self.add(cumulative, "_bucket", **labels, le=_format_value(bound))
+        self.add(cumulative, "_count", **labels)
+        self.add(total, "_sum", **labels)
+
+    def render(self) -> List[str]:
+        """Return the lines of the metric family in the OpenMetrics text format."""
+        lines = [f"# TYPE {self.name} {self.type}", f"# HELP {self.name} {self.help}"]
+        if self.unit:
+            lines.append(f"# UNIT {self.name} {self.unit}")
+        lines.extend(
+            f"{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}"
+            for suffix, labels, value in self.samples
+        )
+        return lines
+
+
+Collector = Callable[[], List[MetricFamily]]
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Serve the exposition of the exporter of the server."""
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Return the metrics, or not found for any other path."""
+        if self.path.split("?")[0] != METRICS_PATH:
+            self.send_error(404)
+            return
+        body = self.server.exporter.render().encode()  # type: ignore[attr-defined]
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_: Any) -> None:
+        """Do not log each scrape."""
+
+
+class OpenMetricsExporter:
+    """
+    HTTP endpoint serving the metrics of its collectors while any is registered.
+
+    The endpoint is bound to the port of the first collector registered; later
+    collectors are served on the same endpoint whatever port they ask for.
+    """
+
+    def __init__(self, logger: Optional[logging.Logger] = None) -> None:
+        """
+        Initialise the exporter.
+
+        :param logger: logger for collectors which fail
+        """
+        self._logger = logger or logging.getLogger(__name__)
+        self._lock = Lock()
+        self._collectors: Dict[str, Collector] = {}
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[Thread] = None
+
+    @property
+    def port(self) -> Optional[int]:
+        """Return the port of the running endpoint, if any."""
+        return self._server.server_address[1] if self._server is not None else None
+
+    def register(self, name: str, port: int, collector: Collector) -> int:
+        """
+        Serve the metrics of a collector, starting the endpoint if needed.
+
+        :param name: unique name of the collector, e.g. the device name
+        :param port: port to serve on if the endpoint is not running, 0 for any
+        :param collector: returns the metric families of the collector
+        :return: the port the endpoint serves on
+        :raises OSError: if the endpoint cannot be bound to the port
+        """
+        with self._lock:
+            if self._server is None:
+                self._server = ThreadingHTTPServer(("", port), _MetricsRequestHandler)
+                self._server.daemon_threads = True
+                self._server.exporter = self  # type: ignore[attr-defined]
+                self._thread = Thread(
+                    target=self._server.serve_forever, daemon=True, name="OpenMetrics thread"
+                )
+                self._thread.start()
+            self._collectors[name] = collector
+            return self._server.server_address[1]
+
+    def unregister(self, name: str) -> None:
+        """
+        Stop serving the metrics of a collector, stopping the endpoint after the last.
+
+        :param name: the name the collector was registered with
+        """
+        with self._lock:
+            self._collectors.pop(name, None)
+            if self._collectors or self._server is None:
+                return
+            server, thread = self._server, self._thread
+            self._server = self._thread = None
+        server.shutdown()
+        server.server_close()
+        thread.join()  # type: ignore[union-attr]
+
+    def render(self) -> str:
+        """Return the metrics of all collectors, merging the families of the same name."""
+        with self._lock:
+            collectors = list(self._collectors.items())
+        families: Dict[str, MetricFamily] = {}
+        for name, collector in collectors:
+            try:
+                collected = collector()
+            except Exception:  # pylint: disable=broad-except
+                self._logger.exception("Failed to collect the metrics of %s", name)
+                continue
+            for family in collected:
+                merged = families.setdefault(
+                    family.name, MetricFamily(family.name, family.type, family.help, family.unit)
+                )
+                merged.samples.extend(family.samples)
+        lines = [line for family in families.values() for line in family.render()]
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+# Endpoint shared by the devices of the process
+METRICS_EXPORTER = OpenMetricsExporter()
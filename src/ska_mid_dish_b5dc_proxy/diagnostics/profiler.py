@@ -0,0 +1,233 @@
+"""
+Module containing the on-demand profilers used to diagnose a live device.
+
+The sampling profiler reads the stacks of the threads of the process from its
+own thread at a fixed interval, so the profiled code runs unchanged and the
+overhead is bounded by the interval. The memory tracer runs tracemalloc with a
+shallow traceback. Both end by themselves after a bounded duration, so a
+profile left running on a live device stops on its own.
+"""
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from types import CodeType
+from typing import Dict, Optional
+
+MIN_SAMPLE_INTERVAL_SEC = 0.001
+MAX_STACK_DEPTH = 64
+
+
+def _frame_label(code: CodeType) -> str:
+    """Return a function name with the file and line it is defined at."""
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Count the stacks of the threads of the process, sampled at a fixed interval."""
+
+    def __init__(self, interval: float = 0.01, max_duration: float = 300.0) -> None:
+        """
+        Initialise the profiler.
+
+        :param interval: time in seconds between samples, at least 1 ms
+        :param max_duration: upper bound in seconds of the duration of a profile
+        :raises ValueError: if the interval is shorter than 1 ms
+        """
+        if interval < MIN_SAMPLE_INTERVAL_SEC:
+            raise ValueError(f"Sample interval must be at least 1 ms, got {interval}")
+        self._interval = interval
+        self._max_duration = max_duration
+        # Number of samples of each stack, outermost frame first, keyed by thread name
+        self._stacks: Counter = Counter()
+        self._sampled = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        """Return whether a profile is being sampled."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration: float) -> float:
+        """
+        Start a new profile, discarding the previous one.
+
+        :param duration: time in seconds after which the profile stops by itself
+        :return: the duration, bounded by the maximum duration
+        :raises RuntimeError: if a profile is already running
+        """
+        if self.running:
+            raise RuntimeError("A profile is already running")
+        duration = min(max(duration, 0.0), self._max_duration)
+        self._stacks = Counter()
+        self._sampled = 0.0
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(duration,), daemon=True, name="Sampling profiler thread"
+        )
+        self._thread.start()
+        return duration
+
+    def stop(self) -> None:
+        """Stop the running profile, if any, and wait for the last sample."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self, duration: float) -> None:
+        """Sample the stacks until stopped or for the duration."""
+        started = time.monotonic()
+        deadline = started + duration
+        while not self._stop.wait(self._interval) and time.monotonic() < deadline:
+            self._sample()
+        self._sampled = time.monotonic() - started
+
+    def _sample(self) -> None:
+        """Add the current stack of each thread other than the profiler's own."""
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        own_ident = threading.get_ident()
+        for ident, frame in sys._current_frames().items():  # pylint: disable=protected-access
+            if ident == own_ident:
+                continue
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                # Labelled only when reported, to keep the sampling cheap
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            stack.reverse()
+            self._stacks[(names.get(ident, str(ident)), tuple(stack))] += 1
+
+    def report(self, top: int = 20) -> str:
+        """
+        Return the functions most often on the stack of each thread.
+
+        :param top: number of functions listed per thread
+        :return: per thread, the share of samples in which each function was
+            running (self) and on the stack (total)
+        """
+        thread_samples: Counter = Counter()
+        self_samples: Dict[str, Counter] = {}
+        total_samples: Dict[str, Counter] = {}
+        for (thread_name, stack), count in list(self._stacks.items()):
+            thread_samples[thread_name] += count
+            if stack:
+                self_samples.setdefault(thread_name, Counter())[stack[-1]] += count
+            for frame in set(stack):
+                total_samples.setdefault(thread_name, Counter())[frame] += count
+
+        lines = [
+            f"{sum(thread_samples.values())} samples over {self._sampled:.1f} s "
+            f"every {1000 * self._interval:.0f} ms"
+        ]
+        for thread_name, samples in thread_samples.most_common():
+            lines.append(f"Thread {thread_name}: {samples} samples")
+            lines.append("   self  total  function")
+            for frame, count in total_samples.get(thread_name, Counter()).most_common(top):
+                self_count = self_samples.get(thread_name, Counter())[frame]
+                lines.append(
+                    f"  {100 * self_count / samples:4.0f}%  {100 * count / samples:4.0f}%  "
+                    f"{_frame_label(frame)}"
+                )
+        return "\n".join(lines)
+
+    def write_collapsed_stacks(self, path: str) -> None:
+        """
+        Write the profile in the collapsed stack format of flame graph tools.
+
+        :param path: the file to write, one line per thread and stack
+        """
+        with open(path, "w", encoding="utf-8") as collapsed:
+            for (thread_name, stack), count in list(self._stacks.items()):
+                frames = ";".join(_frame_label(frame) for frame in stack)
+                collapsed.write(f"{thread_name};{frames} {count}\n")
+
+
+class MemoryTracer:
+    """Trace the memory allocations of the process with tracemalloc for a bounded time."""
+
+    def __init__(self, max_duration: float = 300.0, frames: int = 1) -> None:
+        """
+        Initialise the tracer.
+
+        :param max_duration: upper bound in seconds of the duration of a trace
+        :param frames: number of frames stored per allocation
+        """
+        self._max_duration = max_duration
+        self._frames = frames
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        # Whether this tracer started tracemalloc, and so should stop it
+        self._started_tracing = False
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._final: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def running(self) -> bool:
+        """Return whether allocations are being traced."""
+        return self._timer is not None
+
+    def start(self, duration: float) -> float:
+        """
+        Start tracing allocations, discarding the previous trace.
+
+        :param duration: time in seconds after which tracing stops by itself
+        :return: the duration, bounded by the maximum duration
+        :raises RuntimeError: if a trace is already running
+        """
+        with self._lock:
+            if self.running:
+                raise RuntimeError("A memory trace is already running")
+            duration = min(max(duration, 0.0), self._max_duration)
+            self._started_tracing = not tracemalloc.is_tracing()
+            if self._started_tracing:
+                tracemalloc.start(self._frames)
+            self._baseline = self._take_snapshot()
+            self._final = None
+            self._timer = threading.Timer(duration, self.stop)
+            self._timer.daemon = True
+            self._timer.start()
+        return duration
+
+    def stop(self) -> None:
+        """Stop the running trace, if any, keeping its last snapshot."""
+        with self._lock:
+            if self._timer is None:
+                return
+            self._timer.cancel()
+            self._timer = None
+            self._final = self._take_snapshot()
+            if self._started_tracing:
+                tracemalloc.stop()
+
+    @staticmethod
+    def _take_snapshot() -> tracemalloc.Snapshot:
+        """Take a snapshot of the traced allocations, leaving out tracemalloc's own."""
+        return tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),)
+        )
+
+    def report(self, top: int = 20) -> str:
+        """
+        Return the allocation sites holding the most memory.
+
+        :param top: number of allocation sites listed
+        :return: the size and growth since the trace started of the allocations of
+            each site, of the running trace or else of the last one
+        :raises RuntimeError: if no trace was started
+        """
+        with self._lock:
+            snapshot = self._take_snapshot() if self.running else self._final
+            if snapshot is None or self._baseline is None:
+                raise RuntimeError("No memory trace, start one first")
+            statistics = snapshot.compare_to(self._baseline, "lineno")
+        state = "running" if self.running else "stopped"
+        lines = [
+            f"Trace {state}, {sum(stat.size for stat in statistics) / 1024:.0f} KiB traced, "
+            f"{sum(stat.size_diff for stat in statistics) / 1024:+.0f} KiB since the start"
+        ]
+        lines.extend(str(stat) for stat in statistics[:top])
+        return "\n".join(lines)
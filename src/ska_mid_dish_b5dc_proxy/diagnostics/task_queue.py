@@ -0,0 +1,177 @@
+"""Module containing the tracking of the tasks waiting in a task executor queue."""
+
+import time
+from collections import deque
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Deque, Dict, Optional, Sequence, Tuple
+
+from ska_control_model import TaskStatus
+
+from ska_mid_dish_b5dc_proxy.telemetry.histogram import Histogram
+
+TASK_DURATION_BUCKETS_SEC = (0.01, 0.05, 0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+@dataclass
+class CommandQueueStatistics:
+    """Queue wait and execution times and rejections of one command."""
+
+    queue_wait: Histogram
+    execution: Histogram
+    rejections: int = 0
+
+
+@dataclass
+class _TrackedTask:
+    """State of a tracked task."""
+
+    submitted: float
+    # Whether the task was counted as queued, and whether it has left the queue,
+    # which it can do before the executor reports it QUEUED
+    queued: bool = False
+    dequeued: bool = False
+
+
+class TaskQueueTracker:
+    """
+    Count the tasks submitted to an executor which have not started yet.
+
+    A task leaves the queue when the executor calls it, or reports any status
+    other than QUEUED for it, e.g. when it is aborted or rejected while queued.
+    The queue wait and execution time of the tasks are recorded per command, and
+    the recent execution times give an estimate of the wait of a new task.
+    """
+
+    def __init__(
+        self, buckets: Sequence[float] = TASK_DURATION_BUCKETS_SEC, estimate_window: int = 20
+    ) -> None:
+        """
+        Initialise the tracker with an empty queue.
+
+        :param buckets: upper bounds of the queue wait and execution time buckets
+        :param estimate_window: number of most recent execution times the wait
+            estimate is based on
+        """
+        self._lock = Lock()
+        self._depth = 0
+        self._running = 0
+        self._buckets = buckets
+        self._statistics: Dict[str, CommandQueueStatistics] = {}
+        self._recent_executions: Deque[float] = deque(maxlen=estimate_window)
+
+    @property
+    def depth(self) -> int:
+        """Return the number of tasks waiting in the queue."""
+        return self._depth
+
+    @property
+    def running(self) -> int:
+        """Return the number of tasks executing."""
+        return self._running
+
+    def statistics(self) -> Dict[str, CommandQueueStatistics]:
+        """Return the statistics of each command submitted so far, by command name."""
+        with self._lock:
+            return dict(self._statistics)
+
+    def _command_statistics(self, command: str) -> CommandQueueStatistics:
+        """Return the statistics of a command, creating them on first use."""
+        with self._lock:
+            statistics = self._statistics.get(command)
+            if statistics is None:
+                statistics = self._statistics[command] = CommandQueueStatistics(
+                    Histogram(self._buckets), Histogram(self._buckets)
+                )
+            return statistics
+
+    def estimated_wait(self) -> float:
+        """
+        Return the estimated time a task submitted now waits before it starts.
+
+        :return: the number of queued and executing tasks times the mean of the
+            recent execution times, 0 before any task has completed
+        """
+        with self._lock:
+            if not self._recent_executions:
+                return 0.0
+            mean_execution = sum(self._recent_executions) / len(self._recent_executions)
+            return (self._depth + self._running) * mean_execution
+
+    def admission_refusal(self, max_depth: int, max_wait: float) -> Optional[str]:
+        """
+        Return why a new task should be rejected, if the queue is over a limit.
+
+        :param max_depth: maximum number of queued tasks, 0 for no limit
+        :param max_wait: maximum estimated queue wait in seconds, 0 for no limit
+        :return: the reason to reject the task, or None to admit it
+        """
+        if max_depth and self._depth >= max_depth:
+            return f"{self._depth} commands are already queued, the limit is {max_depth}"
+        if max_wait:
+            estimated_wait = self.estimated_wait()
+            if estimated_wait > max_wait:
+                return (
+                    f"the estimated queue wait of {estimated_wait:.1f} s exceeds "
+                    f"the limit of {max_wait:g} s"
+                )
+        return None
+
+    def record_rejection(self, command: str) -> None:
+        """
+        Count a rejected submission of a command.
+
+        :param command: the name of the command
+        """
+        statistics = self._command_statistics(command)
+        with self._lock:
+            statistics.rejections += 1
+
+    def track(
+        self, func: Callable, task_callback: Optional[Callable], command: str = "task"
+    ) -> Tuple[Callable, Callable]:
+        """
+        Wrap a task and its callback to track the task through the queue.
+
+        :param func: the task to submit
+        :param task_callback: the callback of the task, if any
+        :param command: the name of the command the statistics are recorded under
+        :return: the task and callback to submit in their place
+        """
+        task = _TrackedTask(time.monotonic())
+        statistics = self._command_statistics(command)
+
+        def dequeue() -> None:
+            with self._lock:
+                if task.queued:
+                    self._depth -= 1
+                task.queued, task.dequeued = False, True
+
+        def tracked_callback(**kwargs: Any) -> None:
+            status = kwargs.get("status")
+            if status == TaskStatus.QUEUED:
+                with self._lock:
+                    if not task.queued and not task.dequeued:
+                        task.queued = True
+                        self._depth += 1
+            elif status is not None:
+                dequeue()
+            if task_callback is not None:
+                task_callback(**kwargs)
+
+        def tracked_func(*args: Any, **kwargs: Any) -> Any:
+            dequeue()
+            started = time.monotonic()
+            statistics.queue_wait.observe(started - task.submitted)
+            with self._lock:
+                self._running += 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                execution = time.monotonic() - started
+                statistics.execution.observe(execution)
+                with self._lock:
+                    self._running -= 1
+                    self._recent_executions.append(execution)
+
+        return tracked_func, tracked_callback
@@ -0,0 +1,239 @@
+"""
+Module containing the span tracing of commands from the Tango call to the B5DC.
+
+A trace starts in the Tango command handler and is carried in a context variable,
+explicitly handed over to the executor thread and the event loop, so that each
+stage of the command records a span of the same trace. Spans are summarised as
+rolling latency statistics per stage and, if a trace file is configured, written
+by a listener thread in the Chrome trace event format, which Perfetto and
+chrome://tracing open, to a rotating set of files.
+"""
+
+import itertools
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ska_control_model import TaskStatus
+
+FINAL_TASK_STATUSES = (
+    TaskStatus.COMPLETED,
+    TaskStatus.FAILED,
+    TaskStatus.ABORTED,
+    TaskStatus.REJECTED,
+)
+
+
+@dataclass
+class Trace:
+    """A traced command, with the arguments recorded on each of its spans."""
+
+    trace_id: int
+    command: str
+    args: Dict[str, Any] = field(default_factory=dict)
+
+
+_CURRENT_TRACE: ContextVar[Optional[Trace]] = ContextVar("b5dc_current_trace", default=None)
+
+
+class _TraceFileHandler(RotatingFileHandler):
+    """Rotating file of trace events, each file a JSON array which may be left open."""
+
+    terminator = ",\n"
+
+    def _open(self) -> Any:
+        """Open the file, starting the array of a new file."""
+        stream = super()._open()
+        if stream.tell() == 0:
+            stream.write("[\n")
+        return stream
+
+
+class CommandTracer:
+    """Record the spans of traced commands and their latency statistics per stage."""
+
+    def __init__(self, stages: Sequence[str], window: int = 100) -> None:
+        """
+        Initialise the tracer.
+
+        :param stages: names of the stages whose latency statistics are kept
+        :param window: number of most recent spans per stage the statistics cover
+        """
+        self._stages = list(stages)
+        self._latencies: Dict[str, Deque[float]] = {
+            stage: deque(maxlen=window) for stage in self._stages
+        }
+        self._lock = threading.Lock()
+        self._trace_ids = itertools.count(1)
+        self._handler: Optional[QueueHandler] = None
+        self._listener: Optional[QueueListener] = None
+
+    @property
+    def stages(self) -> List[str]:
+        """Return the names of the stages."""
+        return self._stages
+
+    def open(self, path: str, max_bytes: int, backup_count: int) -> None:
+        """
+        Start writing the spans to a rotating trace file.
+
+        :param path: the trace file
+        :param max_bytes: size at which the file is rotated
+        :param backup_count: number of rotated files kept
+        """
+        if self._listener is not None:
+            return
+        file_handler = _TraceFileHandler(path, maxBytes=max_bytes, backupCount=backup_count)
+        self._handler = QueueHandler(queue.SimpleQueue())
+        self._listener = QueueListener(self._handler.queue, file_handler)
+        self._listener.start()
+
+    def close(self) -> None:
+        """Write the queued spans and close the trace file."""
+        if self._listener is None:
+            return
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+        self._listener = self._handler = None
+
+    @staticmethod
+    def current() -> Optional[Trace]:
+        """Return the trace of the calling context, if any."""
+        return _CURRENT_TRACE.get()
+
+    @contextmanager
+    def trace(self, command: str, stage: str = "command") -> Iterator[Trace]:
+        """
+        Start a trace for a command and record its outermost span.
+
+        :param command: the name of the command, e.g. SetFrequency
+        :param stage: the stage of the outermost span
+        :yield: the trace, whose arguments may be added to
+        """
+        new_trace = Trace(next(self._trace_ids), command)
+        token = _CURRENT_TRACE.set(new_trace)
+        try:
+            with self.span(stage):
+                yield new_trace
+        finally:
+            _CURRENT_TRACE.reset(token)
+
+    @contextmanager
+    def resume(self, trace: Optional[Trace]) -> Iterator[None]:
+        """
+        Continue a trace handed over from another thread or task.
+
+        :param trace: the trace to continue, or None for no trace
+        :yield: once the trace is current
+        """
+        token = _CURRENT_TRACE.set(trace)
+        try:
+            yield
+        finally:
+            _CURRENT_TRACE.reset(token)
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """
+        Record a span of the current trace, if any, around a block.
+
+        :param stage: the stage the block belongs to
+        :yield: once the span has started
+        """
+        trace = _CURRENT_TRACE.get()
+        if trace is None:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, started, time.perf_counter() - started, trace)
+
+    def record(
+        self, stage: str, started: float, duration: float, trace: Optional[Trace] = None
+    ) -> None:
+        """
+        Record a span which has ended.
+
+        :param stage: the stage of the span
+        :param started: the perf_counter time at which the span started
+        :param duration: the duration of the span in seconds
+        :param trace: the trace of the span, by default the current trace
+        """
+        trace = trace or _CURRENT_TRACE.get()
+        if trace is None:
+            return
+        latencies = self._latencies.get(stage)
+        if latencies is not None:
+            with self._lock:
+                latencies.append(duration)
+        handler = self._handler
+        if handler is not None:
+            event = {
+                "name": stage,
+                "cat": trace.command,
+                "ph": "X",
+                "ts": round(started * 1e6),
+                "dur": round(duration * 1e6),
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": {"trace": trace.trace_id, **trace.args},
+            }
+            handler.handle(logging.makeLogRecord({"msg": json.dumps(event)}))
+
+    def wrap_task(
+        self, func: Callable, task_callback: Optional[Callable]
+    ) -> Tuple[Callable, Optional[Callable]]:
+        """
+        Carry the current trace into an executor task and time its stages.
+
+        The task records the time it waited in the queue and its execution, and its
+        callback the push of its final status.
+
+        :param func: the task to submit
+        :param task_callback: the callback of the task, if any
+        :return: the task and callback to submit in their place
+        """
+        trace = _CURRENT_TRACE.get()
+        if trace is None:
+            return func, task_callback
+        submitted = time.perf_counter()
+
+        def traced_func(*args: Any, **kwargs: Any) -> Any:
+            with self.resume(trace):
+                self.record("queue", submitted, time.perf_counter() - submitted)
+                with self.span("execute"):
+                    return func(*args, **kwargs)
+
+        def traced_callback(**kwargs: Any) -> None:
+            if kwargs.get("status") not in FINAL_TASK_STATUSES:
+                task_callback(**kwargs)  # type: ignore[misc]
+                return
+            with self.resume(trace), self.span("result_push"):
+                task_callback(**kwargs)  # type: ignore[misc]
+
+        return traced_func, traced_callback if task_callback is not None else None
+
+    def stage_latencies(self) -> Tuple[List[float], List[float]]:
+        """
+        Return the mean and maximum latency of the recent spans of each stage.
+
+        :return: the mean and maximum latencies in seconds, in the order of the
+            stages, 0 for a stage without spans
+        """
+        with self._lock:
+            windows = [list(self._latencies[stage]) for stage in self._stages]
+        means = [sum(window) / len(window) if window else 0.0 for window in windows]
+        maxima = [max(window) if window else 0.0 for window in windows]
+        return means, maxima
@@ -0,0 +1 @@
+"""Package that contains utilities acting on a fleet of B5dcProxy devices."""
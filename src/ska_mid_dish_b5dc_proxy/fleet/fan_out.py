@@ -0,0 +1,273 @@
+"""
+Module containing the concurrent fan-out of commands to a fleet of B5dcProxy devices.
+
+Each B5dcProxy command is a long running command, so a client looping over the
+dishes waits for one round trip and one B5DC write after another. The fan-out
+submits the command to up to max_concurrency dishes at once and waits for their
+results concurrently, so reconfiguring the array takes about as long as its
+slowest dish.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, List, Optional, Sequence
+
+from ska_control_model import ResultCode, TaskStatus
+from tango import DevFailed
+from tango.asyncio import DeviceProxy as AsyncDeviceProxy
+
+DEFAULT_MAX_CONCURRENCY = 32
+DEFAULT_COMMAND_TIMEOUT_SEC = 30.0
+# A dish is a straggler if its latency exceeds this multiple of the median latency
+DEFAULT_STRAGGLER_FACTOR = 2.0
+# Period after which the status of a submitted command is first checked, grown by
+# the backoff factor after each check up to the maximum, so that the slow commands
+# of a large fleet are not polled in a storm of Tango calls
+COMMAND_STATUS_POLL_PERIOD_SEC = 0.05
+COMMAND_STATUS_POLL_MAX_PERIOD_SEC = 0.25
+COMMAND_STATUS_POLL_BACKOFF = 1.5
+# Statuses reported for a dish whose command did not reach a task status
+TIMED_OUT = "TIMED_OUT"
+NOT_SUBMITTED = "NOT_SUBMITTED"
+STATUS_CHECK_FAILED = "STATUS_CHECK_FAILED"
+ERROR = "ERROR"
+FINISHED_STATUSES = {
+    status.name
+    for status in (
+        TaskStatus.COMPLETED,
+        TaskStatus.FAILED,
+        TaskStatus.ABORTED,
+        TaskStatus.REJECTED,
+        TaskStatus.NOT_FOUND,
+    )
+}
+
+ProxyFactory = Callable[[str], Awaitable[Any]]
+
+
+@dataclass
+class DishCommandResult:
+    """Outcome of a fanned-out command on one dish."""
+
+    dish_device: str
+    status: str
+    latency: float
+    message: str = ""
+
+    @property
+    def succeeded(self) -> bool:
+        """Return whether the command completed on the dish."""
+        return self.status == TaskStatus.COMPLETED.name
+
+
+@dataclass
+class FanOutReport:
+    """Per-dish results of a fanned-out command."""
+
+    command_name: str
+    elapsed: float
+    results: List[DishCommandResult] = field(default_factory=list)
+    stragglers: List[str] = field(default_factory=list)
+
+    @property
+    def failed(self) -> List[str]:
+        """Return the dishes on which the command did not complete."""
+        return [result.dish_device for result in self.results if not result.succeeded]
+
+    def to_json(self) -> str:
+        """Return the report as JSON."""
+        return json.dumps({**asdict(self), "failed": self.failed})
+
+
+async def _run_dish_command(
+    proxy_factory: ProxyFactory,
+    dish_device: str,
+    command_name: str,
+    argument: Any,
+    timeout: float,
+) -> DishCommandResult:
+    """
+    Submit a long running command to one dish and wait for it to finish.
+
+    :param proxy_factory: creates the asyncio device proxy of a dish
+    :param dish_device: Tango device name of the B5dcProxy
+    :param command_name: name of the command, e.g. SetFrequency
+    :param argument: argument of the command
+    :param timeout: seconds to wait for the command to finish
+    :return: the result of the command on the dish
+    """
+    start_time = time.monotonic()
+    try:
+        proxy = await proxy_factory(dish_device)
+        [result_code], [command_id] = await proxy.command_inout(command_name, argument)
+    except DevFailed as ex:
+        return DishCommandResult(
+            dish_device, NOT_SUBMITTED, time.monotonic() - start_time, str(ex)
+        )
+    if ResultCode(int(result_code)) != ResultCode.QUEUED:
+        # The command was rejected or ran synchronously; the message is its result
+        status = (
+            TaskStatus.COMPLETED.name
+            if ResultCode(int(result_code)) == ResultCode.OK
+            else TaskStatus.REJECTED.name
+        )
+        return DishCommandResult(dish_device, status, time.monotonic() - start_time, command_id)
+
+    poll_period = COMMAND_STATUS_POLL_PERIOD_SEC
+    while True:
+        try:
+            status = await proxy.command_inout("CheckLongRunningCommandStatus", command_id)
+        except DevFailed as ex:
+            return DishCommandResult(
+                dish_device, STATUS_CHECK_FAILED, time.monotonic() - start_time, str(ex)
+            )
+        remaining = timeout - (time.monotonic() - start_time)
+        if status in FINISHED_STATUSES or remaining <= 0:
+            break
+        await asyncio.sleep(min(poll_period, remaining))
+        poll_period = min(
+            poll_period * COMMAND_STATUS_POLL_BACKOFF, COMMAND_STATUS_POLL_MAX_PERIOD_SEC
+        )
+    if status not in FINISHED_STATUSES:
+        status = TIMED_OUT
+    return DishCommandResult(dish_device, status, time.monotonic() - start_time, command_id)
+
+
+def find_stragglers(
+    results: Sequence[DishCommandResult], straggler_factor: float = DEFAULT_STRAGGLER_FACTOR
+) -> List[str]:
+    """
+    Return the dishes which timed out or were much slower than the completed ones.
+
+    :param results: the per-dish results
+    :param straggler_factor: multiple of the median latency of the completed
+        commands above which a dish is a straggler
+    :return: the straggling dishes, slowest first
+    """
+    completed = [result.latency for result in results if result.succeeded]
+    threshold = statistics.median(completed) * straggler_factor if completed else math.inf
+    stragglers = [
+        result for result in results if result.status == TIMED_OUT or result.latency > threshold
+    ]
+    return [result.dish_device for result in sorted(stragglers, key=lambda r: -r.latency)]
+
+
+async def fan_out_command(  # pylint: disable=too-many-arguments
+    dish_devices: Sequence[str],
+    command_name: str,
+    argument: Any,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    timeout: float = DEFAULT_COMMAND_TIMEOUT_SEC,
+    straggler_factor: float = DEFAULT_STRAGGLER_FACTOR,
+    proxy_factory: ProxyFactory = AsyncDeviceProxy,
+) -> FanOutReport:
+    """
+    Run a long running command on many B5dcProxy devices concurrently.
+
+    A dish whose command fails unexpectedly is reported with the ERROR status and
+    does not abort the commands on the other dishes.
+
+    :param dish_devices: Tango device names of the B5dcProxy devices
+    :param command_name: name of the command, e.g. SetFrequency
+    :param argument: argument of the command
+    :param max_concurrency: maximum number of dishes with the command in flight
+    :param timeout: seconds to wait for the command to finish on each dish
+    :param straggler_factor: multiple of the median latency above which a dish
+        is reported as a straggler
+    :param proxy_factory: creates the asyncio device proxy of a dish
+    :return: the per-dish results, in dish_devices order, and the stragglers
+    :raises ValueError: if max_concurrency is not positive
+    """
+    if max_concurrency < 1:
+        raise ValueError(f"max_concurrency must be positive, got {max_concurrency}")
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_bounded(dish_device: str) -> DishCommandResult:
+        async with semaphore:
+            dish_start_time = time.monotonic()
+            try:
+                return await _run_dish_command(
+                    proxy_factory, dish_device, command_name, argument, timeout
+                )
+            except Exception as ex:  # pylint: disable=broad-except
+                return DishCommandResult(
+                    dish_device, ERROR, time.monotonic() - dish_start_time, repr(ex)
+                )
+
+    start_time = time.monotonic()
+    results = await asyncio.gather(*(run_bounded(dish) for dish in dish_devices))
+    return FanOutReport(
+        command_name,
+        time.monotonic() - start_time,
+        list(results),
+        find_stragglers(results, straggler_factor),
+    )
+
+
+async def set_frequency(
+    dish_devices: Sequence[str], frequency: int, **kwargs: Any
+) -> FanOutReport:
+    """
+    Set the frequency of many B5dcProxy devices concurrently.
+
+    :param dish_devices: Tango device names of the B5dcProxy devices
+    :param frequency: the B5dcFrequency value
+    :param kwargs: fan_out_command keyword arguments
+    :return: the fan-out report
+    """
+    return await fan_out_command(dish_devices, "SetFrequency", frequency, **kwargs)
+
+
+async def set_attenuation(
+    dish_devices: Sequence[str], polarization: str, attenuation_db: int, **kwargs: Any
+) -> FanOutReport:
+    """
+    Set the attenuation of one polarization of many B5dcProxy devices concurrently.
+
+    :param dish_devices: Tango device names of the B5dcProxy devices
+    :param polarization: H or V
+    :param attenuation_db: the attenuation in dB
+    :param kwargs: fan_out_command keyword arguments
+    :return: the fan-out report
+    :raises ValueError: if the polarization is not H or V
+    """
+    if polarization.upper() not in ("H", "V"):
+        raise ValueError(f"Polarization must be H or V, got {polarization}")
+    command_name = f"Set{polarization.upper()}PolAttenuation"
+    return await fan_out_command(dish_devices, command_name, attenuation_db, **kwargs)
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    """Run a command on many B5dcProxy devices and print the JSON report."""
+    parser = argparse.ArgumentParser(
+        description="Run a B5dcProxy command on many dishes concurrently."
+    )
+    parser.add_argument("command", help="command name, e.g. SetFrequency")
+    parser.add_argument("argument", type=int, help="integer command argument")
+    parser.add_argument("dish_devices", nargs="+", help="B5dcProxy Tango device names")
+    parser.add_argument("--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_COMMAND_TIMEOUT_SEC)
+    parser.add_argument("--straggler-factor", type=float, default=DEFAULT_STRAGGLER_FACTOR)
+    parsed_args = parser.parse_args(args)
+
+    report = asyncio.run(
+        fan_out_command(
+            parsed_args.dish_devices,
+            parsed_args.command,
+            parsed_args.argument,
+            max_concurrency=parsed_args.max_concurrency,
+            timeout=parsed_args.timeout,
+            straggler_factor=parsed_args.straggler_factor,
+        )
+    )
+    sys.stdout.write(report.to_json() + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,16 @@
 """Module containing B5DC constants."""
 
+from ska_mid_dish_dcp_lib.device.b5dc_device_mappings import B5dcFrequency
+
 B5DC_BUILD_STATE_DEVICE_NAME = "Band-5 Down Converter"
+
+# Valid attenuation range accepted by the RFCM attenuators
+B5DC_MIN_ATTENUATION_DB = 0
+B5DC_MAX_ATTENUATION_DB = 31
+
+# PLL output frequency (GHz) reported by the B5DC for each frequency setting
+B5DC_FREQUENCY_GHZ = {
+    B5dcFrequency.F_11_1_GHZ: 11.1,
+    B5dcFrequency.F_13_2_GHZ: 13.2,
+    B5dcFrequency.F_13_86_GHZ: 13.86,
+}
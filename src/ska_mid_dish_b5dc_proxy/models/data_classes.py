@@ -1,5 +1,6 @@
 """Module containing B5DC buildState data classes."""
 import dataclasses
+from typing import Any, Callable, Optional
 
 # pylint: disable=too-many-instance-attributes
 
@@ -18,3 +19,36 @@ class B5dcBuildStateDataclass:
     psu_version: str = ""
     icd_version: str = ""
     fpga_firmware_file: str = ""
+
+
+@dataclasses.dataclass
+class PendingSetCommand:
+    """Book-keeping for a queued set command that may be superseded before it starts."""
+
+    register_name: str
+    task_callback: Optional[Callable] = None
+    started: bool = False
+    superseded: bool = False
+
+
+@dataclasses.dataclass(frozen=True)
+class B5dcRegisterDefinition:
+    """Description of a B5DC register and the Tango attribute exposing it."""
+
+    # ICD register name
+    name: str
+    # B5dcDeviceSensors field holding the register value
+    sensor_field: str
+    attribute_name: str
+    doc: str
+    # float or an IntEnum of the register states
+    dtype: type = float
+    # Value reported before the register is first read
+    default_value: Any = 0.0
+    unit: str = ""
+    # Minimum time between polls of the register, None to poll it every poll cycle
+    poll_period: Optional[float] = None
+    # Absolute change which triggers change and archive events, None to push every change
+    event_abs_change: Optional[float] = None
+    # Whether rolling-window statistics are kept for the register
+    statistics: bool = True
@@ -0,0 +1,99 @@
+"""Module containing the registry of the B5DC registers exposed by the proxy."""
+
+from typing import Dict, Tuple
+
+from ska_mid_dish_dcp_lib.device.b5dc_device_mappings import B5dcPllState
+
+from ska_mid_dish_b5dc_proxy.models.data_classes import B5dcRegisterDefinition
+
+B5DC_REGISTERS: Tuple[B5dcRegisterDefinition, ...] = (
+    B5dcRegisterDefinition(
+        name="spi_rfcm_frequency",
+        sensor_field="rfcm_frequency",
+        attribute_name="rfcmFrequency",
+        doc="Indicates the PLL Output Frequency. The default value is 11.1 GHz",
+        unit="GHz",
+    ),
+    B5dcRegisterDefinition(
+        name="spi_rfcm_pll_lock",
+        sensor_field="rfcm_pll_lock",
+        attribute_name="rfcmPllLock",
+        doc="Status flags for RFCM PLL lock and lock loss detection.",
+        dtype=B5dcPllState,
+        default_value=B5dcPllState.NOT_LOCKED,
+        statistics=False,
+    ),
+    B5dcRegisterDefinition(
+        name="spi_rfcm_h_attenuation",
+        sensor_field="rfcm_h_attenuation_db",
+        attribute_name="rfcmHAttenuation",
+        doc="Reflects the RFCM H-polarization attenuation value in dB.",
+        unit="dB",
+    ),
+    B5dcRegisterDefinition(
+        name="spi_rfcm_v_attenuation",
+        sensor_field="rfcm_v_attenuation_db",
+        attribute_name="rfcmVAttenuation",
+        doc="Reflects the RFCM V-polarization attenuation value in dB.",
+        unit="dB",
+    ),
+    B5dcRegisterDefinition(
+        name="spi_rfcm_photo_diode_ain0",
+        sensor_field="clk_photodiode_current_ma",
+        attribute_name="clkPhotodiodeCurrent",
+        doc="Reflects the photodiode current in mA.",
+        unit="mA",
+    ),
+    B5dcRegisterDefinition(
+        name="spi_rfcm_rf_in_h_ain1",
+        sensor_field="h_pol_rf_power_in_dbm",
+        attribute_name="hPolRfPowerIn",
+        doc="Reflects the RFCM RF power input for horizonal polarization in dBm.",
+        unit="dBm",
+    ),
+    B5dcRegisterDefinition(
+        name="spi_rfcm_rf_in_v_ain2",
+        sensor_field="v_pol_rf_power_in_dbm",
+        attribute_name="vPolRfPowerIn",
+        doc="Reflects the RFCM RF power input for vertical polarization in dBm.",
+        unit="dBm",
+    ),
+    B5dcRegisterDefinition(
+        name="spi_rfcm_if_out_h_ain3",
+        sensor_field="h_pol_if_power_out_dbm",
+        attribute_name="hPolRfPowerOut",
+        doc="Reflects the RFCM RF power output for horizonal polarization in dBm.",
+        unit="dBm",
+    ),
+    B5dcRegisterDefinition(
+        name="spi_rfcm_if_out_v_ain4",
+        sensor_field="v_pol_if_power_out_dbm",
+        attribute_name="vPolRfPowerOut",
+        doc="Reflects the RFCM RF power output for vertical polarization in dBm.",
+        unit="dBm",
+    ),
+    B5dcRegisterDefinition(
+        name="spi_rfcm_rf_temp_ain5",
+        sensor_field="rf_temperature_degc",
+        attribute_name="rfTemperature",
+        doc="Reflects the RFCM RF PCB temperature in deg C.",
+        unit="degC",
+    ),
+    B5dcRegisterDefinition(
+        name="spi_rfcm_psu_pcb_temp_ain7",
+        sensor_field="rfcm_psu_pcb_temperature_degc",
+        attribute_name="rfcmPsuPcbTemperature",
+        doc="Reflects RFCM PSU PCB temperature in deg C.",
+        unit="degC",
+    ),
+)
+
+B5DC_REGISTERS_BY_NAME: Dict[str, B5dcRegisterDefinition] = {
+    register.name: register for register in B5DC_REGISTERS
+}
+
+# Fields of the compact sensorSnapshot aggregate: the register values in registry
+# order, NaN where the last read failed, followed by the communication state
+B5DC_SNAPSHOT_FIELDS: Tuple[str, ...] = tuple(register.name for register in B5DC_REGISTERS) + (
+    "connection_state",
+)
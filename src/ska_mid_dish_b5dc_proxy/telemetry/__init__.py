@@ -0,0 +1 @@
+"""Package that contains B5DC telemetry processing utilities."""
@@ -0,0 +1,149 @@
+"""
+Module containing the threshold alarm engine for the B5DC registers.
+
+Rules are loaded into flat NumPy arrays, one entry per rule, so that all rules are
+evaluated against a snapshot of the register values in a single vectorised pass.
+"""
+
+# pylint: disable=too-many-instance-attributes
+
+import json
+import math
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Severity levels of alarms, matching the DEGRADED and FAILED health states
+ALARM_SEVERITIES = {"DEGRADED": 1, "FAILED": 2}
+
+
+@dataclass(frozen=True)
+class AlarmRule:
+    """
+    Threshold alarm on a single register.
+
+    The alarm is raised when the value is below ``low``, above ``high`` or one of
+    ``alarm_values``, and cleared once it is back within the thresholds by at
+    least ``hysteresis``.
+    """
+
+    name: str
+    register_name: str
+    low: Optional[float] = None
+    high: Optional[float] = None
+    hysteresis: float = 0.0
+    alarm_values: Tuple[float, ...] = ()
+    severity: str = "DEGRADED"
+
+
+def parse_alarm_rules(config: str) -> List[AlarmRule]:
+    """
+    Parse alarm rules from their JSON configuration.
+
+    The configuration is a list of objects with the :py:class:`AlarmRule` fields,
+    ``register`` naming the register. The name defaults to the register name.
+
+    :param config: the JSON configuration of the rules
+    :return: the alarm rules
+    :raises ValueError: if the configuration is not valid
+    """
+    rules = []
+    try:
+        for rule in json.loads(config):
+            register_name = rule["register"]
+            rules.append(
+                AlarmRule(
+                    name=rule.get("name", register_name),
+                    register_name=register_name,
+                    low=rule.get("low"),
+                    high=rule.get("high"),
+                    hysteresis=float(rule.get("hysteresis", 0.0)),
+                    alarm_values=tuple(float(value) for value in rule.get("alarm_values", ())),
+                    severity=rule.get("severity", "DEGRADED"),
+                )
+            )
+    except (TypeError, KeyError, AttributeError, json.JSONDecodeError) as ex:
+        raise ValueError(f"Invalid alarm rule configuration: {ex}") from ex
+    return rules
+
+
+class AlarmEngine:
+    """Evaluate threshold alarms with hysteresis over a snapshot of register values."""
+
+    def __init__(self, register_names: Sequence[str], rules: Sequence[AlarmRule]) -> None:
+        """
+        Initialise the alarm engine.
+
+        :param register_names: names of the registers in the snapshot
+        :param rules: the alarm rules
+        :raises ValueError: if a rule refers to an unknown register or severity
+        """
+        register_index = {name: index for index, name in enumerate(register_names)}
+
+        for rule in rules:
+            if rule.register_name not in register_index:
+                raise ValueError(f"Alarm rule {rule.name} refers to unknown register")
+            if rule.severity not in ALARM_SEVERITIES:
+                raise ValueError(
+                    f"Alarm rule {rule.name} has invalid severity {rule.severity}, "
+                    f"expected one of {list(ALARM_SEVERITIES)}"
+                )
+        self._names = np.array([rule.name for rule in rules], dtype=object)
+        self._rule_registers = np.array(
+            [register_index[rule.register_name] for rule in rules], dtype=np.intp
+        )
+        self._low = np.array([_threshold(rule.low) for rule in rules])
+        self._high = np.array([_threshold(rule.high) for rule in rules])
+        self._hysteresis = np.array([rule.hysteresis for rule in rules])
+        self._severity = np.array([ALARM_SEVERITIES[rule.severity] for rule in rules], dtype=int)
+        # Alarm values padded with NaN, which never compares equal, to a rectangular array
+        max_alarm_values = max((len(rule.alarm_values) for rule in rules), default=0)
+        self._alarm_values = np.full((len(rules), max_alarm_values), np.nan)
+        for index, rule in enumerate(rules):
+            self._alarm_values[index, : len(rule.alarm_values)] = rule.alarm_values
+
+        self._active = np.zeros(len(rules), dtype=bool)
+        self._evaluated = False
+
+    def evaluate(self, snapshot: np.ndarray) -> bool:
+        """
+        Evaluate all rules against a snapshot of the register values.
+
+        A value which is not a number, e.g. from a failed read, holds the alarm state
+        of the rules on the register.
+
+        :param snapshot: the register values, in the order of the register names
+        :return: whether the set of active alarms changed, always True on the first
+            evaluation
+        """
+        values = snapshot[self._rule_registers]
+        with np.errstate(invalid="ignore"):
+            raised = (values < self._low) | (values > self._high)
+            raised |= (values[:, np.newaxis] == self._alarm_values).any(axis=1)
+            # NaN thresholds compare False, so treat missing thresholds as clear
+            below_high = np.isnan(self._high) | (values <= self._high - self._hysteresis)
+            above_low = np.isnan(self._low) | (values >= self._low + self._hysteresis)
+        # A value which is not a number neither raises nor clears an alarm
+        cleared = below_high & above_low & ~raised & ~np.isnan(values)
+        active = np.where(self._active, ~cleared, raised)
+
+        changed = not self._evaluated or bool((active != self._active).any())
+        self._active = active
+        self._evaluated = True
+        return changed
+
+    @property
+    def active_alarms(self) -> List[str]:
+        """Return the names of the active alarms."""
+        return self._names[self._active].tolist()
+
+    @property
+    def severity(self) -> int:
+        """Return the highest severity of the active alarms, 0 if there are none."""
+        return int(self._severity[self._active].max(initial=0))
+
+
+def _threshold(value: Optional[float]) -> float:
+    """Return a threshold as a float, NaN if not set."""
+    return math.nan if value is None else float(value)
@@ -0,0 +1,93 @@
+"""
+Module containing the dish by field matrix of the latest B5DC snapshots of a fleet.
+
+Each dish has a fixed row and each snapshot field a fixed column, so a fleet-wide
+view of one field, e.g. the RF temperature of every dish, is a column slice rather
+than a walk over per-dish state.
+"""
+
+from threading import Lock
+from typing import Sequence, Tuple
+
+import numpy as np
+
+CONNECTION_STATE_FIELD = "connection_state"
+
+
+class FleetSensorMatrix:
+    """Latest snapshot of each dish in a NumPy matrix with one row per dish."""
+
+    def __init__(self, dish_names: Sequence[str], fields: Sequence[str]) -> None:
+        """
+        Initialise the matrix with every value unknown (NaN).
+
+        :param dish_names: names of the dishes, in row order
+        :param fields: names of the snapshot fields, in column order, which
+            include the connection_state field
+        """
+        self._rows = {name: row for row, name in enumerate(dish_names)}
+        self._columns = {name: column for column, name in enumerate(fields)}
+        self._connection_column = self._columns[CONNECTION_STATE_FIELD]
+        self._values = np.full((len(dish_names), len(fields)), np.nan)
+        self._generation = 0
+        self._lock = Lock()
+
+    @property
+    def dish_names(self) -> Sequence[str]:
+        """Return the names of the dishes in row order."""
+        return list(self._rows)
+
+    @property
+    def generation(self) -> int:
+        """Return the number of updates applied to the matrix."""
+        return self._generation
+
+    def update(self, dish_name: str, snapshot: Sequence[float]) -> None:
+        """
+        Replace the row of a dish with its latest snapshot.
+
+        A snapshot shorter than the row, e.g. from a proxy with fewer registers,
+        leaves the missing fields unknown and a longer one is truncated.
+
+        :param dish_name: name of the dish
+        :param snapshot: the snapshot values in field order
+        """
+        values = np.asarray(snapshot, dtype=float)[: self._values.shape[1]]
+        row = self._rows[dish_name]
+        with self._lock:
+            self._values[row, : len(values)] = values
+            self._values[row, len(values) :] = np.nan
+            self._generation += 1
+
+    def invalidate(self, dish_name: str, connection_state: float) -> None:
+        """
+        Mark the values of a dish unknown, e.g. when its proxy is unreachable.
+
+        :param dish_name: name of the dish
+        :param connection_state: the connection state to report for the dish
+        """
+        row = self._rows[dish_name]
+        with self._lock:
+            self._values[row] = np.nan
+            self._values[row, self._connection_column] = connection_state
+            self._generation += 1
+
+    def column(self, field: str) -> np.ndarray:
+        """
+        Return a copy of the values of a field for every dish.
+
+        :param field: name of the snapshot field
+        :return: the values in dish row order
+        """
+        column = self._columns[field]
+        with self._lock:
+            return self._values[:, column].copy()
+
+    def snapshot(self) -> Tuple[int, np.ndarray]:
+        """
+        Return a consistent copy of the matrix.
+
+        :return: the generation and the dish by field values
+        """
+        with self._lock:
+            return self._generation, self._values.copy()
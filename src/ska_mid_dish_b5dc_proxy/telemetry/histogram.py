@@ -0,0 +1,55 @@
+"""Module containing a fixed bucket histogram for latency measurements."""
+
+from threading import Lock
+from typing import Sequence, Tuple
+
+import numpy as np
+
+
+class Histogram:
+    """
+    Histogram with fixed, preallocated buckets.
+
+    Bucket ``i`` counts observations greater than ``bounds[i - 1]`` and less than or
+    equal to ``bounds[i]``. A final overflow bucket counts observations greater
+    than the last bound.
+    """
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        """
+        Initialise the histogram.
+
+        :param bounds: strictly increasing upper bounds of the buckets
+        :raises ValueError: if the bounds are empty or not strictly increasing
+        """
+        self._bounds = np.asarray(bounds, dtype=np.float64)
+        if self._bounds.size == 0 or np.any(np.diff(self._bounds) <= 0):
+            raise ValueError(f"Histogram bounds must be strictly increasing: {bounds}")
+        self._counts = np.zeros(self._bounds.size + 1, dtype=np.int64)
+        self._sum = 0.0
+        self._lock = Lock()
+
+    @property
+    def bounds(self) -> np.ndarray:
+        """Return the upper bounds of the buckets."""
+        return self._bounds
+
+    def observe(self, value: float) -> None:
+        """
+        Record an observation.
+
+        :param value: the value to record
+        """
+        bucket = int(np.searchsorted(self._bounds, value, side="left"))
+        with self._lock:
+            self._counts[bucket] += 1
+            self._sum += value
+
+    def snapshot(self) -> Tuple[np.ndarray, float]:
+        """
+        Return a consistent copy of the bucket counts and the sum of observations.
+
+        :return: the bucket counts, including the overflow bucket, and the sum
+        """
+        with self._lock:
+            return self._counts.copy(), self._sum
@@ -0,0 +1,54 @@
+"""
+Module containing the debounced connection state of the link to the B5DC.
+
+Each read only bumps a counter; the link is reported up after a run of
+consecutive successful reads and down after a run of consecutive failures, so a
+short burst of lost packets does not toggle the connection state.
+"""
+
+
+class LinkStateDebouncer:
+    """Connection state with hysteresis over consecutive read outcomes."""
+
+    def __init__(self, success_threshold: int, failure_threshold: int) -> None:
+        """
+        Initialise the debouncer with the link down.
+
+        :param success_threshold: consecutive successful reads which bring the link up
+        :param failure_threshold: consecutive failed reads which bring the link down
+        :raises ValueError: if a threshold is not positive
+        """
+        if success_threshold < 1 or failure_threshold < 1:
+            raise ValueError(
+                f"Thresholds must be positive, got {success_threshold} and {failure_threshold}"
+            )
+        self._success_threshold = success_threshold
+        self._failure_threshold = failure_threshold
+        self._successes = 0
+        self._failures = 0
+        self._connected = False
+
+    @property
+    def connected(self) -> bool:
+        """Return whether the link is up."""
+        return self._connected
+
+    def record_success(self) -> None:
+        """Record a successful read, bringing the link up after enough in a row."""
+        self._failures = 0
+        self._successes += 1
+        if self._successes >= self._success_threshold:
+            self._connected = True
+
+    def record_failure(self) -> None:
+        """Record a failed read, bringing the link down after enough in a row."""
+        self._successes = 0
+        self._failures += 1
+        if self._failures >= self._failure_threshold:
+            self._connected = False
+
+    def reset(self) -> None:
+        """Forget the recorded reads and report the link down."""
+        self._successes = 0
+        self._failures = 0
+        self._connected = False
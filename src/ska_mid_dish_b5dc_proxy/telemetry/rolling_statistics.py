@@ -0,0 +1,182 @@
+"""Module containing incremental rolling-window statistics for B5DC registers."""
+
+import math
+from collections import deque
+from typing import Any, Deque, Dict, List, Sequence, Tuple
+
+STATISTICS = ("mean", "min", "max", "std")
+
+
+def window_suffix(window_sec: int) -> str:
+    """
+    Return a short label for a window length, e.g. 30s, 1m or 2h.
+
+    :param window_sec: the window length in seconds
+    :return: the window label
+    """
+    if window_sec % 3600 == 0:
+        return f"{window_sec // 3600}h"
+    if window_sec % 60 == 0:
+        return f"{window_sec // 60}m"
+    return f"{window_sec}s"
+
+
+class RollingWindowStatistics:
+    """
+    Mean, minimum, maximum and standard deviation over a sliding time window.
+
+    Each sample is processed in amortised O(1): the mean and variance are kept with
+    Welford's method (with removal as samples leave the window) and the extrema
+    with monotonic deques.
+    """
+
+    def __init__(self, window_sec: float) -> None:
+        """
+        Initialise the statistics.
+
+        :param window_sec: length of the window in seconds
+        """
+        self._window_sec = window_sec
+        self._samples: Deque[Tuple[float, float]] = deque()
+        self._min_candidates: Deque[Tuple[float, float]] = deque()
+        self._max_candidates: Deque[Tuple[float, float]] = deque()
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, timestamp: float, value: float) -> None:
+        """
+        Add a sample and drop the samples which have left the window.
+
+        :param timestamp: the sample time in seconds
+        :param value: the sample value
+        """
+        self._samples.append((timestamp, value))
+        delta = value - self._mean
+        self._mean += delta / len(self._samples)
+        self._m2 += delta * (value - self._mean)
+
+        while self._min_candidates and self._min_candidates[-1][1] >= value:
+            self._min_candidates.pop()
+        self._min_candidates.append((timestamp, value))
+        while self._max_candidates and self._max_candidates[-1][1] <= value:
+            self._max_candidates.pop()
+        self._max_candidates.append((timestamp, value))
+
+        self._evict(timestamp - self._window_sec)
+
+    def _evict(self, oldest_timestamp: float) -> None:
+        """Remove the samples older than the start of the window."""
+        while self._samples and self._samples[0][0] < oldest_timestamp:
+            _, value = self._samples.popleft()
+            count = len(self._samples)
+            if count == 0:
+                self._mean = 0.0
+                self._m2 = 0.0
+            else:
+                delta = value - self._mean
+                self._mean -= delta / count
+                self._m2 = max(self._m2 - delta * (value - self._mean), 0.0)
+        while self._min_candidates and self._min_candidates[0][0] < oldest_timestamp:
+            self._min_candidates.popleft()
+        while self._max_candidates and self._max_candidates[0][0] < oldest_timestamp:
+            self._max_candidates.popleft()
+
+    @property
+    def count(self) -> int:
+        """Return the number of samples in the window."""
+        return len(self._samples)
+
+    @property
+    def mean(self) -> float:
+        """Return the mean of the samples in the window."""
+        return self._mean if self._samples else math.nan
+
+    @property
+    def min(self) -> float:
+        """Return the minimum of the samples in the window."""
+        return self._min_candidates[0][1] if self._min_candidates else math.nan
+
+    @property
+    def max(self) -> float:
+        """Return the maximum of the samples in the window."""
+        return self._max_candidates[0][1] if self._max_candidates else math.nan
+
+    @property
+    def std(self) -> float:
+        """Return the population standard deviation of the samples in the window."""
+        return math.sqrt(self._m2 / len(self._samples)) if self._samples else math.nan
+
+
+class SensorStatistics:
+    """Rolling-window statistics over several windows for each of a set of registers."""
+
+    def __init__(self, register_names: Sequence[str], windows_sec: Sequence[int]) -> None:
+        """
+        Initialise the statistics.
+
+        :param register_names: names of the registers to keep statistics for
+        :param windows_sec: lengths of the windows in seconds
+        """
+        self._windows: Dict[str, List[Tuple[str, RollingWindowStatistics]]] = {
+            register_name: [
+                (window_suffix(window_sec), RollingWindowStatistics(window_sec))
+                for window_sec in windows_sec
+            ]
+            for register_name in register_names
+        }
+
+    @staticmethod
+    def state_key(register_name: str, statistic: str, suffix: str) -> str:
+        """
+        Return the component state key of a register statistic.
+
+        :param register_name: the register name
+        :param statistic: one of mean, min, max or std
+        :param suffix: the window label
+        :return: the component state key, e.g. spi_rfcm_rf_temp_ain5_mean_1m
+        """
+        return f"{register_name}_{statistic}_{suffix}"
+
+    def state_keys(self) -> List[Tuple[str, str, str, str]]:
+        """
+        Return the component state keys with their register, statistic and window.
+
+        :return: tuples of (state key, register name, statistic, window label)
+        """
+        return [
+            (self.state_key(register_name, statistic, suffix), register_name, statistic, suffix)
+            for register_name, windows in self._windows.items()
+            for suffix, _ in windows
+            for statistic in STATISTICS
+        ]
+
+    def add(self, register_name: str, value: Any, timestamp: float) -> Dict[str, float]:
+        """
+        Add a register sample to each of its windows.
+
+        Registers without statistics and values which are not finite numbers are
+        ignored.
+
+        :param register_name: the register the sample was read from
+        :param value: the sample value
+        :param timestamp: the sample time in seconds
+        :return: the updated statistics keyed by component state key
+        """
+        windows = self._windows.get(register_name)
+        if windows is None:
+            return {}
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return {}
+        if not math.isfinite(value):
+            return {}
+
+        updates = {}
+        for suffix, window in windows:
+            window.add(timestamp, value)
+            for statistic in STATISTICS:
+                updates[self.state_key(register_name, statistic, suffix)] = getattr(
+                    window, statistic
+                )
+        return updates
@@ -0,0 +1,278 @@
+"""
+Module containing a bounded, memory-mapped on-disk journal of polled samples.
+
+The journal is a directory of fixed size segment files, each holding a header
+followed by fixed size records of register id, timestamp, value and quality.
+Records are written through a memory map, so samples already journaled survive
+a crash or restart of the proxy process. Segments are rotated when full and the
+oldest segments are removed to keep the journal under a hard size cap.
+
+Read a journal back as CSV with::
+
+    python -m ska_mid_dish_b5dc_proxy.telemetry.sample_journal <journal directory>
+"""
+
+# pylint: disable=too-many-instance-attributes,too-many-arguments
+
+import argparse
+import json
+import logging
+import math
+import mmap
+import os
+import queue
+import struct
+import sys
+import time
+from threading import Thread
+from typing import Any, Iterator, List, NamedTuple, Optional, Sequence
+
+SEGMENT_MAGIC = b"B5DCJRN1"
+# magic, record size, reserved
+SEGMENT_HEADER = struct.Struct("<8sI4x")
+# valid marker, quality, register id, padding, timestamp, value
+RECORD = struct.Struct("<BBH4xdd")
+RECORD_VALID_MARKER = 1
+SEGMENT_SUFFIX = ".b5j"
+REGISTERS_FILE_NAME = "registers.json"
+
+DEFAULT_SEGMENT_SIZE_BYTES = 4 * 1024 * 1024
+DEFAULT_MAX_SIZE_BYTES = 64 * 1024 * 1024
+# Samples queued beyond this are dropped rather than blocking the poll loop
+MAX_QUEUED_SAMPLES = 10000
+# Records written between explicit flushes of the memory map
+RECORDS_PER_FLUSH = 1024
+
+
+class JournalSample(NamedTuple):
+    """A sample read back from the journal."""
+
+    register_name: str
+    timestamp: float
+    value: float
+    quality: int
+
+
+def _segment_paths(directory: str) -> List[str]:
+    """Return the segment files of a journal, oldest first."""
+    return sorted(
+        os.path.join(directory, file_name)
+        for file_name in os.listdir(directory)
+        if file_name.endswith(SEGMENT_SUFFIX)
+    )
+
+
+class SampleJournal:
+    """
+    Append-only memory-mapped journal of polled samples.
+
+    :py:meth:`record` only queues the sample, the memory map is written from a
+    background thread so the poll loop never blocks on disk I/O.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        register_names: Sequence[str],
+        logger: logging.Logger,
+        segment_size_bytes: int = DEFAULT_SEGMENT_SIZE_BYTES,
+        max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES,
+    ) -> None:
+        """
+        Initialise the journal.
+
+        :param directory: directory holding the journal segments
+        :param register_names: names of the registers which may be journaled
+        :param logger: logger for journal errors
+        :param segment_size_bytes: size of each segment file
+        :param max_size_bytes: hard cap on the total size of the segment files
+        :raises ValueError: if the size cap does not allow for at least one segment
+        """
+        self._records_per_segment = (segment_size_bytes - SEGMENT_HEADER.size) // RECORD.size
+        if self._records_per_segment <= 0 or max_size_bytes < segment_size_bytes:
+            raise ValueError(
+                f"Journal segment size ({segment_size_bytes}) must hold at least one record "
+                f"and not exceed the journal size cap ({max_size_bytes})"
+            )
+        self._directory = directory
+        self._logger = logger
+        self._register_ids = {name: index for index, name in enumerate(register_names)}
+        self._segment_size_bytes = segment_size_bytes
+        self._max_segments = max_size_bytes // segment_size_bytes
+
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(MAX_QUEUED_SAMPLES)
+        self._writer_thread: Optional[Thread] = None
+        self._segment_file: Any = None
+        self._segment_map: Optional[mmap.mmap] = None
+        self._next_record = 0
+        self.dropped_samples = 0
+
+    def start(self) -> None:
+        """Create the journal directory and start the writer thread."""
+        os.makedirs(self._directory, exist_ok=True)
+        with open(
+            os.path.join(self._directory, REGISTERS_FILE_NAME), "w", encoding="utf-8"
+        ) as registers_file:
+            json.dump(list(self._register_ids), registers_file)
+        self._writer_thread = Thread(
+            target=self._write_samples, daemon=True, name="Sample journal writer"
+        )
+        self._writer_thread.start()
+
+    def record(self, register_name: str, value: Any, timestamp: float, quality: int) -> None:
+        """
+        Queue a sample to be journaled without blocking.
+
+        Samples are dropped, and counted, if the writer falls behind.
+
+        :param register_name: the register the sample was read from
+        :param value: the sample value, recorded as NaN if not a number
+        :param timestamp: the sample time in seconds since the epoch
+        :param quality: the sample quality
+        """
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            value = math.nan
+        try:
+            self._queue.put_nowait(
+                (self._register_ids[register_name], timestamp, value, int(quality))
+            )
+        except queue.Full:
+            self.dropped_samples += 1
+
+    def close(self, timeout: float = 5.0) -> None:
+        """
+        Write out the queued samples and stop the writer thread.
+
+        A writer which has stopped on an error is not waited for, and a writer
+        which does not drain the queue within the timeout is abandoned.
+
+        :param timeout: maximum time in seconds to wait for the writer
+        """
+        if self._writer_thread is None:
+            return
+        deadline = time.monotonic() + timeout
+        if self._writer_thread.is_alive():
+            try:
+                self._queue.put(None, timeout=timeout)
+            except queue.Full:
+                self._logger.warning("Sample journal writer did not drain its queue in time")
+            self._writer_thread.join(max(deadline - time.monotonic(), 0.0))
+        self._writer_thread = None
+
+    def _write_samples(self) -> None:
+        """Write queued samples to the memory-mapped segments until closed."""
+        try:
+            self._open_segment()
+            unflushed = 0
+            while True:
+                sample = self._queue.get()
+                if sample is None:
+                    break
+                self._write_record(*sample)
+                unflushed += 1
+                if unflushed >= RECORDS_PER_FLUSH or self._queue.empty():
+                    self._segment_map.flush()  # type: ignore[union-attr]
+                    unflushed = 0
+        except OSError as ex:
+            self._logger.error(f"Sample journal writer stopped: {ex}")
+        finally:
+            self._close_segment()
+
+    def _write_record(
+        self, register_id: int, timestamp: float, value: float, quality: int
+    ) -> None:
+        """Write a record, setting its valid marker only once the fields are written."""
+        if self._next_record >= self._records_per_segment:
+            self._close_segment()
+            self._open_segment()
+        offset = SEGMENT_HEADER.size + self._next_record * RECORD.size
+        RECORD.pack_into(self._segment_map, offset, 0, quality, register_id, timestamp, value)
+        self._segment_map[offset] = RECORD_VALID_MARKER  # type: ignore[index]
+        self._next_record += 1
+
+    def _open_segment(self) -> None:
+        """
+        Remove the oldest segments beyond the size cap and open a new segment.
+
+        The blocks of the segment are allocated before it is mapped, so that a full
+        disk stops the writer with an OSError rather than a SIGBUS on a write to
+        the memory map.
+
+        :raises OSError: if the segment can not be created or allocated
+        """
+        segments = _segment_paths(self._directory)
+        for old_segment in segments[: max(len(segments) - self._max_segments + 1, 0)]:
+            os.remove(old_segment)
+        sequence = (
+            int(os.path.basename(segments[-1])[: -len(SEGMENT_SUFFIX)]) + 1 if segments else 0
+        )
+        path = os.path.join(self._directory, f"{sequence:010d}{SEGMENT_SUFFIX}")
+
+        # pylint: disable=consider-using-with
+        self._segment_file = open(path, "w+b")
+        try:
+            os.posix_fallocate(self._segment_file.fileno(), 0, self._segment_size_bytes)
+        except OSError:
+            self._segment_file.close()
+            self._segment_file = None
+            os.remove(path)
+            raise
+        self._segment_map = mmap.mmap(self._segment_file.fileno(), self._segment_size_bytes)
+        SEGMENT_HEADER.pack_into(self._segment_map, 0, SEGMENT_MAGIC, RECORD.size)
+        self._next_record = 0
+
+    def _close_segment(self) -> None:
+        """Flush and close the current segment."""
+        if self._segment_map is not None:
+            self._segment_map.flush()
+            self._segment_map.close()
+            self._segment_map = None
+        if self._segment_file is not None:
+            self._segment_file.close()
+            self._segment_file = None
+
+
+def read_journal(directory: str) -> Iterator[JournalSample]:
+    """
+    Read back the samples of a journal, oldest first.
+
+    Reading a segment stops at the first record without a valid marker, which is
+    either unwritten space or a record torn by a crash.
+
+    :param directory: directory holding the journal segments
+    :return: iterator over the journaled samples
+    :raises ValueError: if a segment file is not a sample journal segment
+    """
+    with open(os.path.join(directory, REGISTERS_FILE_NAME), encoding="utf-8") as registers_file:
+        register_names = json.load(registers_file)
+
+    for path in _segment_paths(directory):
+        with open(path, "rb") as segment_file:
+            data = segment_file.read()
+        magic, record_size = SEGMENT_HEADER.unpack_from(data)
+        if magic != SEGMENT_MAGIC or record_size != RECORD.size:
+            raise ValueError(f"{path} is not a sample journal segment")
+        for offset in range(SEGMENT_HEADER.size, len(data) - RECORD.size + 1, RECORD.size):
+            marker, quality, register_id, timestamp, value = RECORD.unpack_from(data, offset)
+            if marker != RECORD_VALID_MARKER:
+                break
+            yield JournalSample(register_names[register_id], timestamp, value, quality)
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    """Print the samples of a journal as CSV."""
+    parser = argparse.ArgumentParser(description="Print a B5DC sample journal as CSV.")
+    parser.add_argument("directory", help="directory holding the journal segments")
+    parsed_args = parser.parse_args(args)
+
+    sys.stdout.write("timestamp,register,value,quality\n")
+    for sample in read_journal(parsed_args.directory):
+        sys.stdout.write(
+            f"{sample.timestamp:.6f},{sample.register_name},{sample.value!r},{sample.quality}\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
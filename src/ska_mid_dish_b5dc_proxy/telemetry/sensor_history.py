@@ -0,0 +1,120 @@
+"""Module containing fixed size in-memory sample history for B5DC registers."""
+
+# pylint: disable=too-many-instance-attributes
+
+import enum
+from threading import Lock
+from typing import Any, Sequence, Tuple
+
+import numpy as np
+
+
+class SampleQuality(enum.IntEnum):
+    """Quality of a sample, matching the values of the Tango AttrQuality enum."""
+
+    VALID = 0
+    INVALID = 1
+
+
+class SensorHistory:
+    """
+    Preallocated ring buffers holding the most recent samples of each register.
+
+    Memory use is fixed at construction: ``depth`` samples of value, timestamp and
+    quality per register.
+    """
+
+    def __init__(self, register_names: Sequence[str], depth: int) -> None:
+        """
+        Initialise the history buffers.
+
+        :param register_names: names of the registers to keep history for
+        :param depth: number of samples kept per register
+        :raises ValueError: if the depth is not positive
+        """
+        if depth <= 0:
+            raise ValueError(f"Sensor history depth must be positive, got {depth}")
+        self._depth = depth
+        self._register_index = {name: index for index, name in enumerate(register_names)}
+        num_registers = len(self._register_index)
+        self._values = np.full((num_registers, depth), np.nan, dtype=np.float64)
+        self._timestamps = np.zeros((num_registers, depth), dtype=np.float64)
+        self._quality = np.zeros((num_registers, depth), dtype=np.uint8)
+        # Position of the next write and number of valid samples per register
+        self._head = np.zeros(num_registers, dtype=np.int64)
+        self._count = np.zeros(num_registers, dtype=np.int64)
+        self._lock = Lock()
+
+    @property
+    def depth(self) -> int:
+        """Return the number of samples kept per register."""
+        return self._depth
+
+    def _index_of(self, register_name: str) -> int:
+        """Return the buffer row of a register."""
+        try:
+            return self._register_index[register_name]
+        except KeyError:
+            raise ValueError(f"No sensor history for unknown register: {register_name}") from None
+
+    def append(
+        self,
+        register_name: str,
+        value: Any,
+        timestamp: float,
+        quality: SampleQuality = SampleQuality.VALID,
+    ) -> None:
+        """
+        Record a sample, overwriting the oldest once the buffer is full.
+
+        Values which can not be represented as a float are recorded as NaN.
+
+        :param register_name: the register the sample was read from
+        :param value: the sample value
+        :param timestamp: the sample time in seconds since the epoch
+        :param quality: the sample quality
+        """
+        index = self._index_of(register_name)
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            value = np.nan
+        with self._lock:
+            head = self._head[index]
+            self._values[index, head] = value
+            self._timestamps[index, head] = timestamp
+            self._quality[index, head] = quality
+            self._head[index] = (head + 1) % self._depth
+            if self._count[index] < self._depth:
+                self._count[index] += 1
+
+    def latest(
+        self, register_name: str, num_samples: int
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return the most recent samples of a register, oldest first.
+
+        Only the requested samples are copied out of the ring buffer.
+
+        :param register_name: the register to return samples for
+        :param num_samples: the maximum number of samples to return
+        :return: arrays of the sample values, timestamps and qualities
+        """
+        index = self._index_of(register_name)
+        with self._lock:
+            count = int(min(max(num_samples, 0), self._count[index]))
+            end = int(self._head[index])
+            start = end - count
+            if start >= 0:
+                window = slice(start, end)
+                return (
+                    self._values[index, window].copy(),
+                    self._timestamps[index, window].copy(),
+                    self._quality[index, window].copy(),
+                )
+            # The requested samples wrap around the end of the buffer
+            return (
+                np.concatenate((self._values[index, start:], self._values[index, :end])),
+                np.concatenate((self._timestamps[index, start:], self._timestamps[index, :end])),
+                np.concatenate((self._quality[index, start:], self._quality[index, :end])),
+            )
@@ -0,0 +1,149 @@
+"""
+Module containing the versioned, array-backed store of the latest register values.
+
+Each register has a fixed slot in preallocated NumPy arrays holding its value,
+timestamp, quality and the generation at which it last changed. Writers are
+serialised by a lock and bump a sequence number around each write, so readers
+never take a lock: they retry the (rare) read which overlaps a write.
+"""
+
+# pylint: disable=too-many-instance-attributes
+
+import math
+import time
+from threading import Lock
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ska_mid_dish_b5dc_proxy.telemetry.sensor_history import SampleQuality
+
+
+class SensorStore:
+    """Latest value, timestamp and quality of each register in fixed array slots."""
+
+    def __init__(
+        self, register_names: Sequence[str], initial_values: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Initialise the store.
+
+        :param register_names: names of the registers, in slot order
+        :param initial_values: values of the registers before the first write,
+            which default to 0.0
+        """
+        self._slots = {name: slot for slot, name in enumerate(register_names)}
+        self._names = list(register_names)
+        self._values = np.zeros(len(register_names))
+        self._timestamps = np.full(len(register_names), time.time())
+        self._quality = np.full(len(register_names), SampleQuality.VALID, dtype=np.uint8)
+        self._generations = np.zeros(len(register_names), dtype=np.uint64)
+        for name, value in (initial_values or {}).items():
+            self._values[self._slots[name]] = float(value)
+
+        self._generation = 0
+        # Odd while a write is in progress
+        self._sequence = 0
+        self._write_lock = Lock()
+
+    @property
+    def generation(self) -> int:
+        """Return the generation of the most recent change."""
+        return self._generation
+
+    def slot(self, register_name: str) -> int:
+        """
+        Return the slot index of a register.
+
+        :param register_name: the register name
+        :return: the slot index
+        :raises ValueError: if the register is not in the store
+        """
+        try:
+            return self._slots[register_name]
+        except KeyError as ex:
+            raise ValueError(f"Unknown register {register_name}") from ex
+
+    def write(
+        self,
+        register_name: str,
+        value: Any,
+        timestamp: float,
+        quality: SampleQuality = SampleQuality.VALID,
+    ) -> bool:
+        """
+        Write a register sample into its slot.
+
+        A value of None, e.g. from a failed read, keeps the previous value and only
+        updates the timestamp and quality. Values which are not numbers are stored
+        as NaN.
+
+        :param register_name: the register name
+        :param value: the register value
+        :param timestamp: the sample time in seconds since the epoch
+        :param quality: the sample quality
+        :return: whether the value or quality changed
+        """
+        slot = self._slots[register_name]
+        with self._write_lock:
+            previous = self._values[slot]
+            if value is not None:
+                try:
+                    value = float(value)
+                except (TypeError, ValueError):
+                    value = math.nan
+            else:
+                value = previous
+            changed = self._quality[slot] != quality or not (
+                value == previous or (math.isnan(value) and math.isnan(previous))
+            )
+
+            self._sequence += 1
+            self._values[slot] = value
+            self._timestamps[slot] = timestamp
+            self._quality[slot] = quality
+            if changed:
+                self._generation += 1
+                self._generations[slot] = self._generation
+            self._sequence += 1
+        return changed
+
+    def read(self, register_name: str) -> Tuple[float, float, SampleQuality]:
+        """
+        Read a register slot without taking a lock.
+
+        :param register_name: the register name
+        :return: the value, timestamp and quality of the register
+        """
+        slot = self._slots[register_name]
+        while True:
+            sequence = self._sequence
+            if not sequence & 1:
+                value = float(self._values[slot])
+                timestamp = float(self._timestamps[slot])
+                quality = SampleQuality(self._quality[slot])
+                if self._sequence == sequence:
+                    return value, timestamp, quality
+            time.sleep(0)
+
+    def value(self, register_name: str) -> float:
+        """
+        Return the latest value of a register.
+
+        :param register_name: the register name
+        :return: the register value
+        """
+        return float(self._values[self._slots[register_name]])
+
+    def changed_since(self, generation: int) -> List[str]:
+        """
+        Return the registers whose value or quality changed after a generation.
+
+        :param generation: a generation previously returned by :py:attr:`generation`
+        :return: names of the changed registers, in slot order
+        """
+        return [self._names[slot] for slot in np.flatnonzero(self._generations > generation)]
+
+    def valid_values(self) -> np.ndarray:
+        """Return a copy of the values in slot order, NaN where the quality is not valid."""
+        return np.where(self._quality == SampleQuality.VALID, self._values, np.nan)
@@ -0,0 +1 @@
+"""Package that contains the event loop and UDP transports shared by B5DC connections."""
@@ -0,0 +1,82 @@
+"""
+Module containing the creation of the event loops running the B5DC connections.
+
+The connections run on the default asyncio event loop, or on uvloop, an optional
+libuv based loop with a lower cost per datagram and per callback, if it is
+installed. A loop implementation which is not available falls back to the
+default loop with a warning rather than failing the device.
+
+A loop abandoned by the supervisor as dead or stuck is closed, with its tasks
+and transports, once its thread has exited.
+"""
+
+import asyncio
+import logging
+from asyncio import AbstractEventLoop
+from typing import Callable, Optional
+
+DEFAULT_EVENT_LOOP = "asyncio"
+UVLOOP_EVENT_LOOP = "uvloop"
+EVENT_LOOPS = (DEFAULT_EVENT_LOOP, UVLOOP_EVENT_LOOP)
+
+
+def new_event_loop(
+    implementation: str = DEFAULT_EVENT_LOOP, logger: Optional[logging.Logger] = None
+) -> AbstractEventLoop:
+    """
+    Create an event loop of an implementation, or the default loop if unavailable.
+
+    :param implementation: one of EVENT_LOOPS
+    :param logger: logger for the fallback to the default loop
+    :return: the new event loop
+    """
+    logger = logger or logging.getLogger(__name__)
+    if implementation == UVLOOP_EVENT_LOOP:
+        try:
+            import uvloop  # pylint: disable=import-outside-toplevel
+        except ImportError:
+            logger.warning("uvloop is not installed, using the asyncio event loop")
+        else:
+            return uvloop.new_event_loop()
+    elif implementation != DEFAULT_EVENT_LOOP:
+        logger.warning("Unknown event loop %s, using the asyncio event loop", implementation)
+    return asyncio.new_event_loop()
+
+
+def close_abandoned_loop(
+    loop: AbstractEventLoop,
+    close_transports: Optional[Callable[[], None]] = None,
+    timeout: float = 5.0,
+) -> None:
+    """
+    Close a loop whose thread has exited, with its remaining tasks and transports.
+
+    The loop is run from the calling thread until its tasks are cancelled, the
+    transports closed and its default executor shut down, and then closed, which
+    releases its selector.
+
+    :param loop: the loop, no longer running
+    :param close_transports: closes the transports of the loop, if given
+    :param timeout: maximum time in seconds to wait for the default executor
+    """
+    try:
+        loop.run_until_complete(_shut_down(close_transports, timeout))
+    finally:
+        loop.close()
+
+
+async def _shut_down(close_transports: Optional[Callable[[], None]], timeout: float) -> None:
+    """Cancel the other tasks of the running loop and close its transports."""
+    current_task = asyncio.current_task()
+    tasks = [task for task in asyncio.all_tasks() if task is not current_task]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if close_transports is not None:
+        close_transports()
+    # The sockets are closed by callbacks scheduled by the transport close
+    await asyncio.sleep(0)
+    try:
+        await asyncio.wait_for(asyncio.get_running_loop().shutdown_default_executor(), timeout)
+    except asyncio.TimeoutError:
+        pass
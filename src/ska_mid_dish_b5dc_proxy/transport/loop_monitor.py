@@ -0,0 +1,75 @@
+"""
+Module containing the health checks used to supervise a connection event loop.
+
+The scheduling lag of a loop is measured from another thread, so that a stuck
+loop, which cannot measure itself, shows an ever growing lag.
+"""
+
+import time
+from asyncio import AbstractEventLoop
+from typing import Optional
+
+
+class LoopLagProbe:  # pylint: disable=too-few-public-methods
+    """Measure how long a loop takes to run a callback scheduled from another thread."""
+
+    def __init__(self, loop: AbstractEventLoop) -> None:
+        """
+        Initialise the probe.
+
+        :param loop: the event loop to probe
+        """
+        self._loop = loop
+        # Monotonic time at which the pending probe callback was scheduled
+        self._sent: Optional[float] = None
+        self._lag = 0.0
+
+    def probe(self) -> float:
+        """
+        Schedule a probe callback on the loop unless one is pending.
+
+        :return: the lag of the last probe, or the time the pending probe has
+            waited so far if that is longer
+        """
+        now = time.monotonic()
+        sent = self._sent
+        if sent is not None:
+            return max(self._lag, now - sent)
+        self._sent = now
+        try:
+            self._loop.call_soon_threadsafe(self._received, now)
+        except RuntimeError:
+            # The loop is closed; report the probe as pending from now on
+            pass
+        return self._lag
+
+    def _received(self, sent: float) -> None:
+        """Record the lag of a probe callback run by the loop."""
+        self._lag = time.monotonic() - sent
+        self._sent = None
+
+
+class RestartBackoff:
+    """Exponential delay between consecutive restarts of a failing component."""
+
+    def __init__(self, min_delay: float, max_delay: float) -> None:
+        """
+        Initialise the backoff.
+
+        :param min_delay: delay in seconds after the first restart
+        :param max_delay: upper bound of the delay in seconds
+        """
+        self._min_delay = min_delay
+        self._max_delay = max_delay
+        self._delay = 0.0
+        self.restarts = 0
+
+    def next_delay(self) -> float:
+        """Record a restart and return the delay before the next one is allowed."""
+        self.restarts += 1
+        self._delay = min(max(2 * self._delay, self._min_delay), self._max_delay)
+        return self._delay
+
+    def reset(self) -> None:
+        """Restart the backoff from the minimum delay once healthy again."""
+        self._delay = 0.0
@@ -0,0 +1,147 @@
+"""Module containing the asyncio event loop thread shared by the B5DC connections."""
+
+# pylint: disable=too-many-instance-attributes
+
+import asyncio
+import concurrent.futures
+import logging
+import time
+from asyncio import AbstractEventLoop
+from threading import Lock, Thread
+from typing import List, Optional, Tuple
+
+from ska_mid_dish_b5dc_proxy.transport.event_loops import (
+    DEFAULT_EVENT_LOOP,
+    close_abandoned_loop,
+    new_event_loop,
+)
+from ska_mid_dish_b5dc_proxy.transport.udp_pool import UdpTransportPool
+
+SHARED_LOOP_THREAD_NAME = "Shared asyncio loop thread"
+
+
+class SharedEventLoop:
+    """
+    Reference counted event loop running on a thread shared by many connections.
+
+    The loop and its UDP transport pool are created by the first user, whose loop
+    implementation is used until the last user releases them.
+    """
+
+    def __init__(self) -> None:
+        """Initialise the shared event loop."""
+        self._lock = Lock()
+        self._users = 0
+        self._loop: Optional[AbstractEventLoop] = None
+        self._thread: Optional[Thread] = None
+        self._transport_pool: Optional[UdpTransportPool] = None
+        self._implementation = DEFAULT_EVENT_LOOP
+        self._logger: Optional[logging.Logger] = None
+        # Loops replaced by restart, closed with their pools once their thread exits
+        self._abandoned: List[Tuple[AbstractEventLoop, Thread, UdpTransportPool]] = []
+
+    @property
+    def users(self) -> int:
+        """Return the number of users of the loop."""
+        return self._users
+
+    def _start(self) -> None:
+        """Start a new loop, thread and pool."""
+        self._loop = new_event_loop(self._implementation, self._logger)
+        self._transport_pool = UdpTransportPool(self._loop)
+        self._thread = Thread(
+            target=self._loop.run_forever, daemon=True, name=SHARED_LOOP_THREAD_NAME
+        )
+        self._thread.start()
+
+    def acquire(
+        self,
+        implementation: str = DEFAULT_EVENT_LOOP,
+        logger: Optional[logging.Logger] = None,
+    ) -> Tuple[AbstractEventLoop, Thread, UdpTransportPool]:
+        """
+        Start using the shared loop, starting it if needed.
+
+        :param implementation: the event loop implementation if the loop is started
+        :param logger: logger for the fallback to the default loop if it is started
+        :return: the loop, the thread running it and its UDP transport pool
+        """
+        with self._lock:
+            if self._loop is None:
+                self._implementation, self._logger = implementation, logger
+                self._start()
+            self._users += 1
+            return self._loop, self._thread, self._transport_pool  # type: ignore[return-value]
+
+    def restart(
+        self, failed_loop: AbstractEventLoop
+    ) -> Tuple[AbstractEventLoop, Thread, UdpTransportPool]:
+        """
+        Replace a dead or stuck shared loop, keeping its users.
+
+        The first user to report the failed loop starts a new loop, thread and pool;
+        the other users get the replacement. The failed loop is asked to stop, which
+        it does if it ever becomes unstuck, and is closed with its pool by
+        :py:meth:`close_abandoned_loops` once its thread has exited.
+
+        :param failed_loop: the loop found dead or stuck by the caller
+        :return: the loop, the thread running it and its UDP transport pool
+        """
+        with self._lock:
+            if self._loop is failed_loop:
+                if self._thread.is_alive():  # type: ignore[union-attr]
+                    failed_loop.call_soon_threadsafe(failed_loop.stop)
+                self._abandoned.append(
+                    (failed_loop, self._thread, self._transport_pool)  # type: ignore[arg-type]
+                )
+                self._start()
+            return self._loop, self._thread, self._transport_pool  # type: ignore[return-value]
+
+    def close_abandoned_loops(self) -> None:
+        """Close the loops replaced by restart whose thread has exited, and their pools."""
+        with self._lock:
+            stopped = [abandoned for abandoned in self._abandoned if not abandoned[1].is_alive()]
+            self._abandoned = [
+                abandoned for abandoned in self._abandoned if abandoned not in stopped
+            ]
+        for loop, _, transport_pool in stopped:
+            close_abandoned_loop(loop, transport_pool.close)
+
+    def release(self, timeout: float = 5.0) -> None:
+        """
+        Stop using the shared loop, stopping it once it has no users.
+
+        :param timeout: maximum time in seconds to wait for the loop thread to stop
+        """
+        with self._lock:
+            if self._users == 0:
+                return
+            self._users -= 1
+            if self._users > 0:
+                return
+            loop, thread, transport_pool = self._loop, self._thread, self._transport_pool
+            self._loop = self._thread = self._transport_pool = None
+
+        deadline = time.monotonic() + timeout
+        try:
+            asyncio.run_coroutine_threadsafe(
+                _close_pool(transport_pool), loop  # type: ignore[arg-type]
+            ).result(timeout)
+        except concurrent.futures.TimeoutError:
+            pass
+        loop.call_soon_threadsafe(loop.stop)  # type: ignore[union-attr]
+        thread.join(max(deadline - time.monotonic(), 0.0))  # type: ignore[union-attr]
+        if not thread.is_alive():  # type: ignore[union-attr]
+            loop.close()  # type: ignore[union-attr]
+
+
+async def _close_pool(transport_pool: UdpTransportPool) -> None:
+    """Close the pooled sockets and the resolver threads before the loop stops."""
+    transport_pool.close()
+    # The sockets are closed by callbacks scheduled by close
+    await asyncio.sleep(0)
+    await asyncio.get_running_loop().shutdown_default_executor()
+
+
+# The event loop shared by the component managers of the devices in this process
+SHARED_EVENT_LOOP = SharedEventLoop()
@@ -0,0 +1,171 @@
+"""
+Module containing a pool of UDP sockets shared by many B5DC connections.
+
+Each B5DC connection gets a lightweight datagram transport bound to its server
+address. The datagrams of all connections are sent from, and received on, a small
+pool of unconnected sockets and routed to the connection protocol by source
+address. A socket carries at most one connection per server address, so the
+pool grows to the largest number of connections to any one server (e.g. the
+monitoring and command lanes of a dish) rather than the number of dishes.
+
+An error on a pooled socket is passed only to the connection whose send failed.
+Other errors, e.g. of a buffered send, cannot be attributed to a connection on an
+unconnected socket and are logged, so a dead server is noticed by read timeouts.
+"""
+
+import logging
+import socket
+from asyncio import AbstractEventLoop, BaseTransport, DatagramProtocol, DatagramTransport
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Address = Tuple[str, int]
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledSocket(DatagramProtocol):
+    """Protocol of a pooled socket, routing received datagrams by source address."""
+
+    def __init__(self) -> None:
+        self.transport: Optional[DatagramTransport] = None
+        self.endpoints: Dict[Address, DatagramProtocol] = {}
+        # Protocol of the endpoint whose send is in progress, to which the loop
+        # reports a failure of the send before the send returns
+        self.sending: Optional[DatagramProtocol] = None
+
+    def connection_made(self, transport: BaseTransport) -> None:
+        self.transport = transport  # type: ignore[assignment]
+
+    def datagram_received(self, data: bytes, addr: Any) -> None:
+        protocol = self.endpoints.get(addr[:2])
+        if protocol is not None:
+            protocol.datagram_received(data, addr)
+
+    def error_received(self, exc: Exception) -> None:
+        if self.sending is not None:
+            self.sending.error_received(exc)
+        else:
+            logger.warning("Error on a pooled B5DC socket: %s", exc)
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        for protocol in list(self.endpoints.values()):
+            protocol.connection_lost(exc)
+        self.endpoints.clear()
+
+
+class _EndpointTransport(DatagramTransport):
+    """Datagram transport of a single connection over a pooled socket."""
+
+    def __init__(
+        self,
+        loop: AbstractEventLoop,
+        pooled_socket: _PooledSocket,
+        remote_addr: Address,
+        protocol: DatagramProtocol,
+    ) -> None:
+        super().__init__()
+        self._loop = loop
+        self._pooled_socket = pooled_socket
+        self._remote_addr = remote_addr
+        self._protocol = protocol
+        self._closing = False
+
+    def sendto(self, data: Any, addr: Any = None) -> None:
+        if self._closing:
+            return
+        self._pooled_socket.sending = self._protocol
+        try:
+            self._pooled_socket.transport.sendto(  # type: ignore[union-attr]
+                data, addr or self._remote_addr
+            )
+        finally:
+            self._pooled_socket.sending = None
+
+    def get_extra_info(self, name: str, default: Any = None) -> Any:
+        if name == "peername":
+            return self._remote_addr
+        return self._pooled_socket.transport.get_extra_info(  # type: ignore[union-attr]
+            name, default
+        )
+
+    def get_protocol(self) -> DatagramProtocol:
+        return self._protocol
+
+    def set_protocol(self, protocol: Any) -> None:
+        self._protocol = protocol
+
+    def is_closing(self) -> bool:
+        return self._closing
+
+    def close(self) -> None:
+        if self._closing:
+            return
+        self._closing = True
+        if self._pooled_socket.endpoints.get(self._remote_addr) is self._protocol:
+            del self._pooled_socket.endpoints[self._remote_addr]
+        self._loop.call_soon(self._protocol.connection_lost, None)
+
+    def abort(self) -> None:
+        self.close()
+
+
+class UdpTransportPool:
+    """Pool of UDP sockets shared by the B5DC connections running on one event loop."""
+
+    def __init__(self, loop: AbstractEventLoop) -> None:
+        """
+        Initialise the pool.
+
+        :param loop: the event loop the pooled sockets run on
+        """
+        self._loop = loop
+        self._sockets: List[_PooledSocket] = []
+
+    @property
+    def socket_count(self) -> int:
+        """Return the number of sockets in the pool."""
+        return len(self._sockets)
+
+    async def create_endpoint(
+        self, protocol_factory: Callable[[], DatagramProtocol], remote_addr: Address
+    ) -> Tuple[DatagramTransport, DatagramProtocol]:
+        """
+        Create a connection to a server over the pooled sockets.
+
+        Mirrors :py:meth:`asyncio.loop.create_datagram_endpoint` with a remote address.
+
+        :param protocol_factory: factory of the connection protocol
+        :param remote_addr: host and port of the server
+        :return: the connection transport and protocol
+        """
+        address_info = await self._loop.getaddrinfo(
+            *remote_addr, family=socket.AF_INET, type=socket.SOCK_DGRAM
+        )
+        resolved_addr: Address = address_info[0][4][:2]
+
+        pooled_socket = next(
+            (
+                pooled_socket
+                for pooled_socket in self._sockets
+                if resolved_addr not in pooled_socket.endpoints
+            ),
+            None,
+        )
+        if pooled_socket is None:
+            _, pooled_socket = await self._loop.create_datagram_endpoint(
+                _PooledSocket, local_addr=("0.0.0.0", 0), family=socket.AF_INET
+            )
+            self._sockets.append(pooled_socket)
+
+        protocol = protocol_factory()
+        transport = _EndpointTransport(self._loop, pooled_socket, resolved_addr, protocol)
+        pooled_socket.endpoints[resolved_addr] = protocol
+        protocol.connection_made(transport)
+        return transport, protocol
+
+    def close(self) -> None:
+        """Close the pooled sockets, which closes every connection over them."""
+        for pooled_socket in self._sockets:
+            if pooled_socket.transport is not None:
+                pooled_socket.transport.close()
+        self._sockets.clear()
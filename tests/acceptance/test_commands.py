@@ -171,3 +171,33 @@ def test_SetAttenuation_with_invalid_input(
             + 'spi_rfcm_v_attenuation: Attenuation must be >= 0 and less than (32.0)"'
         )
         result_event_store.wait_for_command_result(command_id, expected_result, timeout=5)
+
+
+@pytest.mark.acceptance
+@pytest.mark.forked
+def test_ConfigureBand5_with_valid_input(
+    b5dc_manager_proxy: DeviceProxy,
+    event_store_class: Any,
+) -> None:
+    """Test ConfigureBand5 applies the frequency and both attenuations in one command."""
+    h_attenuation = int((b5dc_manager_proxy.read_attribute("rfcmHAttenuation").value + 1) % 32)
+    v_attenuation = int((b5dc_manager_proxy.read_attribute("rfcmVAttenuation").value + 1) % 32)
+
+    result_event_store = event_store_class()
+    b5dc_manager_proxy.subscribe_event(
+        "longrunningcommandresult", tango.EventType.CHANGE_EVENT, result_event_store
+    )
+
+    [[_], [command_id]] = b5dc_manager_proxy.ConfigureBand5(
+        [B5dcFrequency.F_13_2_GHZ, h_attenuation, v_attenuation]
+    )
+    result_event_store.wait_for_command_result(
+        command_id,
+        f'"ConfigureBand5(frequency={B5dcFrequency.F_13_2_GHZ}, '
+        f"h_attenuation_db={h_attenuation}, v_attenuation_db={v_attenuation}) "
+        'completed"',
+        timeout=5,
+    )
+    assert b5dc_manager_proxy.read_attribute("rfcmFrequency").value == 13.2
+    assert b5dc_manager_proxy.read_attribute("rfcmHAttenuation").value == h_attenuation
+    assert b5dc_manager_proxy.read_attribute("rfcmVAttenuation").value == v_attenuation
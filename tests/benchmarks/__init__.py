@@ -0,0 +1 @@
+"""Benchmarks for ska_mid_dish_b5dc_proxy, run as scripts rather than collected tests."""
@@ -0,0 +1,161 @@
+"""
+Benchmark command latency under heavy concurrent polling and client read load.
+
+The B5DC is simulated with fixed round trip times and occasional monitoring
+timeouts (which trigger the poll cycle retries). Polling runs back to back and a
+number of client threads read attributes synchronously while SetFrequency
+commands are submitted. The latency from submission to the COMPLETED task update
+and the duration of the client reads are reported. A long --command-rtt simulates
+a slow or hung B5DC write.
+
+Run with::
+
+    PYTHONPATH=.:./src python tests/benchmarks/bench_command_latency.py
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import threading
+import time
+from typing import Any, List, Tuple
+from unittest.mock import AsyncMock, Mock, patch
+
+from ska_control_model import TaskStatus
+from ska_mid_dish_dcp_lib.device.b5dc_device_mappings import B5dcFrequency
+from ska_mid_dish_dcp_lib.protocol.b5dc_protocol import B5dcProtocolTimeout
+
+from ska_mid_dish_b5dc_proxy.b5dc_cm import B5dcDeviceComponentManager
+from ska_mid_dish_b5dc_proxy.models.registers import B5DC_REGISTERS_BY_NAME
+
+MONITOR_RTT_SEC = 0.005
+MONITOR_TIMEOUT_SEC = 0.1
+MONITOR_TIMEOUT_PROBABILITY = 0.1
+COMMAND_RTT_SEC = 0.005
+CLIENT_READ_PERIOD_SEC = 0.01
+
+
+class SimulatedSensors:
+    """B5dc device sensors stand-in with simulated round trips and timeouts."""
+
+    def __init__(self, *_: Any) -> None:
+        """Init simulated sensors."""
+
+    async def update_sensor(self, _: str) -> None:
+        """Simulate a register read, occasionally timing out."""
+        if random.random() < MONITOR_TIMEOUT_PROBABILITY:
+            await asyncio.sleep(MONITOR_TIMEOUT_SEC)
+            raise B5dcProtocolTimeout("simulated timeout")
+        await asyncio.sleep(MONITOR_RTT_SEC)
+
+    def __getattr__(self, _: str) -> float:
+        """Return a fixed sensor value."""
+        return 0.0
+
+
+class SimulatedFrequencyConfig:  # pylint: disable=too-few-public-methods
+    """B5dc frequency configuration stand-in with a simulated round trip."""
+
+    rtt = COMMAND_RTT_SEC
+
+    def __init__(self, *_: Any) -> None:
+        """Init simulated frequency configuration."""
+
+    async def set_frequency(self, _: B5dcFrequency) -> None:
+        """Simulate a register write."""
+        await asyncio.sleep(self.rtt)
+
+
+def client_reads(
+    b5dc_cm: B5dcDeviceComponentManager, stop: threading.Event, durations: List[float]
+) -> None:
+    """Read registers synchronously, as Tango attribute reads do, until stopped."""
+    registers = list(B5DC_REGISTERS_BY_NAME)
+    while not stop.is_set():
+        started = time.perf_counter()
+        b5dc_cm.sync_register_outside_event_loop(random.choice(registers))
+        durations.append(time.perf_counter() - started)
+        stop.wait(CLIENT_READ_PERIOD_SEC)
+
+
+def run_benchmark(num_commands: int, num_client_threads: int) -> Tuple[List[float], List[float]]:
+    """Return the latency of each submitted command and each client read in seconds."""
+    with patch("ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcInterface", Mock()), patch(
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcPropertyParser", Mock()
+    ), patch("ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcProtocol", Mock()), patch(
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcDeviceSensors", SimulatedSensors
+    ), patch(
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcDeviceConfigureFrequency",
+        SimulatedFrequencyConfig,
+    ), patch.object(
+        B5dcDeviceComponentManager, "_update_build_state", AsyncMock()
+    ):
+        b5dc_cm = B5dcDeviceComponentManager("127.0.0.1", 10001, 0, Mock())
+        b5dc_cm.start_communicating()
+        while not b5dc_cm.is_connection_established():
+            time.sleep(0.1)
+
+        stop = threading.Event()
+        read_durations: List[float] = []
+        readers = [
+            threading.Thread(
+                target=client_reads, args=(b5dc_cm, stop, read_durations), daemon=True
+            )
+            for _ in range(num_client_threads)
+        ]
+        for reader in readers:
+            reader.start()
+
+        latencies = []
+        for _ in range(num_commands):
+            completed = threading.Event()
+
+            def task_callback(status: TaskStatus = None, **_: Any) -> None:
+                if status == TaskStatus.COMPLETED:
+                    completed.set()  # pylint: disable=cell-var-from-loop
+
+            submitted = time.perf_counter()
+            b5dc_cm.set_frequency(B5dcFrequency.F_11_1_GHZ, task_callback=task_callback)
+            completed.wait()
+            latencies.append(time.perf_counter() - submitted)
+            # space the commands out so that each lands at a random point of a poll cycle
+            time.sleep(random.uniform(0.0, 0.2))
+
+        stop.set()
+        return latencies, read_durations
+
+
+def summary(latencies: List[float]) -> str:
+    """Return the min, median, p95, p99 and max of latencies in seconds, in ms."""
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+
+    def percentile(fraction: float) -> float:
+        return latencies_ms[max(int(len(latencies_ms) * fraction) - 1, 0)]
+
+    return (
+        f"min {latencies_ms[0]:.1f}, median {statistics.median(latencies_ms):.1f}, "
+        f"p95 {percentile(0.95):.1f}, p99 {percentile(0.99):.1f}, max {latencies_ms[-1]:.1f}"
+    )
+
+
+def main() -> None:
+    """Run the benchmark and print a latency summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--commands", type=int, default=100)
+    parser.add_argument("--client-threads", type=int, default=4)
+    parser.add_argument("--command-rtt", type=float, default=COMMAND_RTT_SEC)
+    args = parser.parse_args()
+    SimulatedFrequencyConfig.rtt = args.command_rtt
+
+    latencies, read_durations = run_benchmark(args.commands, args.client_threads)
+    print(
+        f"commands: {len(latencies)}, command round trip: {args.command_rtt}s, "
+        f"client read threads: {args.client_threads}"
+    )
+    print(f"command latency ms: {summary(latencies)}")
+    print(f"client read latency ms ({len(read_durations)} reads): {summary(read_durations)}")
+
+
+if __name__ == "__main__":
+    main()
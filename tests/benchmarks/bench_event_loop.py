@@ -0,0 +1,285 @@
+"""
+Benchmark the asyncio and uvloop event loops on the B5DC connection workload.
+
+Each loop implementation is measured in a fresh process against a UDP echo server
+running in a separate process, so that the CPU time measured is that of the loop
+thread alone:
+
+- datagram throughput: request and reply round trips over one datagram endpoint
+  with a number of requests in flight, reported as round trips per second and
+  loop thread CPU time per round trip;
+- poll cycles: component managers on the shared event loop, each reading every
+  register once per poll period with a datagram round trip per read, reported as
+  loop thread CPU and the mean poll cycle duration.
+
+Run with::
+
+    PYTHONPATH=.:./src python tests/benchmarks/bench_event_loop.py
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Tuple
+from unittest.mock import AsyncMock, Mock, patch
+
+POLL_PERIOD_SEC = 1
+
+Address = Tuple[str, int]
+
+
+def echo_server(port_queue: Any) -> None:
+    """Reply to each datagram with the datagram until killed."""
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(("127.0.0.1", 0))
+    port_queue.put(server.getsockname()[1])
+    while True:
+        data, addr = server.recvfrom(2048)
+        server.sendto(data, addr)
+
+
+def thread_cpu_sec(thread: threading.Thread) -> float:
+    """Return the user and system CPU time of a thread of this process in seconds."""
+    with open(f"/proc/self/task/{thread.native_id}/stat", encoding="utf-8") as stat:
+        fields = stat.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+class PingClient(asyncio.DatagramProtocol):
+    """Client sending the next request as each reply arrives, until all are answered."""
+
+    def __init__(self, round_trips: int, done: asyncio.Future) -> None:
+        """Initialise the client."""
+        self.transport: Any = None
+        self.round_trips = round_trips
+        self.sent = self.received = 0
+        self.done = done
+
+    def connection_made(self, transport: Any) -> None:
+        """Keep the transport."""
+        self.transport = transport
+
+    def send(self) -> None:
+        """Send a request."""
+        self.sent += 1
+        self.transport.sendto(b"spi_rfcm_pll_lock")
+
+    def datagram_received(self, data: bytes, addr: Any) -> None:
+        """Send the next request, or complete once all the replies are in."""
+        self.received += 1
+        if self.sent < self.round_trips:
+            self.send()
+        elif self.received == self.round_trips and not self.done.done():
+            self.done.set_result(None)
+
+
+def measure_datagrams(
+    implementation: str, server_addr: Address, round_trips: int, window: int
+) -> Dict[str, float]:
+    """Measure the round trips per second and the loop CPU time per round trip."""
+    # pylint: disable=import-outside-toplevel
+    from ska_mid_dish_b5dc_proxy.transport.event_loops import new_event_loop
+
+    loop = new_event_loop(implementation)
+
+    async def ping() -> Tuple[float, float]:
+        done = loop.create_future()
+        transport, client = await loop.create_datagram_endpoint(
+            lambda: PingClient(round_trips, done), remote_addr=server_addr
+        )
+        started, cpu_started = time.perf_counter(), time.thread_time()
+        for _ in range(window):
+            client.send()
+        await asyncio.wait_for(done, 60)
+        elapsed, cpu_sec = time.perf_counter() - started, time.thread_time() - cpu_started
+        transport.close()
+        return elapsed, cpu_sec
+
+    try:
+        elapsed, cpu_sec = loop.run_until_complete(ping())
+    finally:
+        loop.close()
+    return {
+        "round_trips_per_sec": round_trips / elapsed,
+        "cpu_us_per_round_trip": 1e6 * cpu_sec / round_trips,
+    }
+
+
+class EchoProtocol(asyncio.DatagramProtocol):
+    """B5DC protocol stand-in whose register reads are a round trip to the echo server."""
+
+    def __init__(self, *_: Any) -> None:
+        """Initialise the protocol."""
+        self.transport: Any = None
+        self.pending: Deque[asyncio.Future] = deque()
+
+    def connection_made(self, transport: Any) -> None:
+        """Keep the transport."""
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr: Any) -> None:
+        """Complete the oldest pending read."""
+        if self.pending:
+            self.pending.popleft().set_result(data)
+
+    async def sync_read_register(self, register_name: str, *_: Any) -> bytes:
+        """Read a register with a datagram round trip."""
+        reply = asyncio.get_running_loop().create_future()
+        self.pending.append(reply)
+        self.transport.sendto(register_name.encode())
+        return await reply
+
+    sync_write_register = sync_read_register
+
+
+class EchoSensors:
+    """B5dc device sensors stand-in reading through its interface, the read method."""
+
+    def __init__(self, _: Any, read_register: Any) -> None:
+        """Init the sensors with the read method of their protocol."""
+        self._read_register = read_register
+
+    async def update_sensor(self, register_name: str) -> None:
+        """Read a register."""
+        await self._read_register(register_name)
+
+    def __getattr__(self, _: str) -> float:
+        """Return a fixed sensor value."""
+        return 0.0
+
+
+def poll_cycle_totals(component_managers: List[Any]) -> Tuple[int, float]:
+    """Return the number and total duration of the poll cycles of the devices."""
+    count, total = 0, 0.0
+    for component_manager in component_managers:
+        counts, duration = component_manager.poll_cycle_histogram.snapshot()
+        count += int(counts.sum())
+        total += duration
+    return count, total
+
+
+def measure_poll_cycles(  # pylint: disable=too-many-locals
+    implementation: str, server_addr: Address, num_devices: int, duration: float
+) -> Dict[str, float]:
+    """Measure the loop CPU and poll cycle duration of devices on the shared loop."""
+    # pylint: disable=import-outside-toplevel
+    from ska_mid_dish_b5dc_proxy.b5dc_cm import B5dcDeviceComponentManager
+    from ska_mid_dish_b5dc_proxy.models.registers import B5DC_REGISTERS
+
+    def interface(*_: Any, get_method: Any, **__: Any) -> Any:
+        return get_method
+
+    with patch("ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcInterface", interface), patch(
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcPropertyParser", Mock()
+    ), patch("ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcProtocol", EchoProtocol), patch(
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcDeviceSensors", EchoSensors
+    ), patch.object(
+        B5dcDeviceComponentManager, "_update_build_state", AsyncMock()
+    ):
+        component_managers = [
+            B5dcDeviceComponentManager(
+                *server_addr,
+                POLL_PERIOD_SEC,
+                Mock(),
+                shared_event_loop=True,
+                event_loop=implementation,
+            )
+            for _ in range(num_devices)
+        ]
+        for component_manager in component_managers:
+            component_manager.start_communicating()
+        while not all(cm.is_connection_established() for cm in component_managers):
+            time.sleep(0.1)
+        time.sleep(2 * POLL_PERIOD_SEC)
+
+        loop_thread = component_managers[0].loop_thread
+        loop_type = type(component_managers[0].loop).__module__
+        cycles_started = poll_cycle_totals(component_managers)
+        cpu_started = thread_cpu_sec(loop_thread)
+        time.sleep(duration)
+        cpu_sec = thread_cpu_sec(loop_thread) - cpu_started
+        cycles = poll_cycle_totals(component_managers)
+        for component_manager in component_managers:
+            component_manager.stop_communicating()
+
+    cycle_count, cycle_sum = cycles[0] - cycles_started[0], cycles[1] - cycles_started[1]
+    reads = cycle_count * len(B5DC_REGISTERS)
+    return {
+        "loop": loop_type,
+        "loop_cpu_pct": 100 * cpu_sec / duration,
+        "cpu_us_per_read": 1e6 * cpu_sec / reads if reads else 0.0,
+        "mean_poll_cycle_ms": 1e3 * cycle_sum / cycle_count if cycle_count else 0.0,
+    }
+
+
+def measure(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run both measurements of one loop implementation against a new echo server."""
+    port_queue: Any = multiprocessing.Queue()
+    server = multiprocessing.Process(target=echo_server, args=(port_queue,), daemon=True)
+    server.start()
+    server_addr = ("127.0.0.1", port_queue.get(timeout=10))
+    try:
+        result: Dict[str, Any] = {}
+        for window in (1, 32):
+            result[f"window_{window}"] = measure_datagrams(
+                args.worker, server_addr, args.round_trips, window
+            )
+        result["poll"] = measure_poll_cycles(args.worker, server_addr, args.devices, args.duration)
+        return result
+    finally:
+        server.kill()
+
+
+def main() -> None:
+    """Run the benchmark for both loops in fresh processes and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--round-trips", type=int, default=50000)
+    parser.add_argument("--devices", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--worker", choices=["asyncio", "uvloop"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(measure(args)))
+        return
+
+    print(
+        f"round trips: {args.round_trips}, devices: {args.devices}, "
+        f"poll period: {POLL_PERIOD_SEC}s"
+    )
+    for implementation in ("asyncio", "uvloop"):
+        output = subprocess.run(
+            [sys.executable, __file__, "--worker", implementation]
+            + ["--round-trips", str(args.round_trips)]
+            + ["--devices", str(args.devices), "--duration", str(args.duration)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.splitlines()[-1])
+        for window in (1, 32):
+            datagrams = result[f"window_{window}"]
+            print(
+                f"{implementation:>7} datagrams, {window:>2} in flight: "
+                f"{datagrams['round_trips_per_sec']:.0f} round trips/s, "
+                f"{datagrams['cpu_us_per_round_trip']:.1f} us loop CPU per round trip"
+            )
+        poll = result["poll"]
+        print(
+            f"{implementation:>7} poll cycles ({poll['loop']}): "
+            f"loop CPU {poll['loop_cpu_pct']:.2f}%, "
+            f"{poll['cpu_us_per_read']:.1f} us per read, "
+            f"mean cycle {poll['mean_poll_cycle_ms']:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark array reconfiguration time of the fleet command fan-out.
+
+Each dish is simulated by an asyncio device proxy whose SetFrequency completes
+after a fixed command time with some jitter, so the benchmark measures the
+fan-out itself rather than Tango. The time to set the frequency of the whole
+array is reported for increasing concurrency limits, a limit of 1 being the
+equivalent of a client looping over the dishes, with the number of command status
+checks made per dish.
+
+Run with::
+
+    PYTHONPATH=.:./src python tests/benchmarks/bench_fleet_fan_out.py
+"""
+
+import argparse
+import asyncio
+import random
+from typing import Any, Dict
+
+from ska_control_model import ResultCode, TaskStatus
+
+from ska_mid_dish_b5dc_proxy.fleet.fan_out import set_frequency
+
+COMMAND_TIME_SEC = 0.05
+COMMAND_JITTER_SEC = 0.02
+
+
+class SimulatedDishProxy:  # pylint: disable=too-few-public-methods
+    """Asyncio device proxy stand-in whose commands take a simulated time."""
+
+    finish_times: Dict[str, float] = {}
+    command_time = COMMAND_TIME_SEC
+    status_checks = 0
+
+    def __init__(self, dish_device: str) -> None:
+        """Init simulated dish proxy."""
+        self._dish_device = dish_device
+
+    async def command_inout(self, command_name: str, argument: Any) -> Any:
+        """Submit a command or return the status of a submitted command."""
+        await asyncio.sleep(0.001)
+        now = asyncio.get_running_loop().time()
+        if command_name == "CheckLongRunningCommandStatus":
+            SimulatedDishProxy.status_checks += 1
+            finished = now >= self.finish_times[argument]
+            return (TaskStatus.COMPLETED if finished else TaskStatus.IN_PROGRESS).name
+        command_id = f"{self._dish_device}_{command_name}_{argument}"
+        self.finish_times[command_id] = (
+            now + self.command_time + random.uniform(0, COMMAND_JITTER_SEC)
+        )
+        return [ResultCode.QUEUED], [command_id]
+
+
+async def simulated_proxy(dish_device: str) -> SimulatedDishProxy:
+    """Return the simulated proxy of a dish."""
+    return SimulatedDishProxy(dish_device)
+
+
+def main() -> None:
+    """Run the benchmark and print the array reconfiguration times."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dishes", type=int, default=197)
+    parser.add_argument("--command-time", type=float, default=COMMAND_TIME_SEC)
+    args = parser.parse_args()
+
+    dishes = [f"mid-dish/b5dc-manager/SKA{index:03d}" for index in range(args.dishes)]
+    SimulatedDishProxy.command_time = args.command_time
+    print(f"dishes: {args.dishes}, simulated command time ms: {args.command_time * 1000:.0f}")
+    for max_concurrency in (1, 8, 32, args.dishes):
+        SimulatedDishProxy.status_checks = 0
+        report = asyncio.run(
+            set_frequency(
+                dishes, 2, max_concurrency=max_concurrency, proxy_factory=simulated_proxy
+            )
+        )
+        print(
+            f"max concurrency {max_concurrency:4d}: {report.elapsed:7.2f} s, "
+            f"failed {len(report.failed)}, stragglers {len(report.stragglers)}, "
+            f"status checks per dish {SimulatedDishProxy.status_checks / args.dishes:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark the cost of a poll cycle with DEBUG logging on and off.
+
+A component manager polls a simulated B5DC whose register values change on every
+read and whose last register always times out, so that each cycle logs component
+state updates at DEBUG and read timeouts at WARNING. The device logging target is
+simulated by a handler blocking for a fixed time per record, as a write to the
+logging service does. Poll cycles are timed on the event loop with the device
+logging level at DEBUG and at INFO, with the records passed on to the logging
+target by the listener thread or, for comparison, synchronously on the loop.
+
+Run with::
+
+    PYTHONPATH=.:./src python tests/benchmarks/bench_logging.py
+"""
+
+# pylint: disable=protected-access
+
+import argparse
+import asyncio
+import logging
+import time
+from typing import Any, List
+from unittest.mock import AsyncMock, Mock, patch
+
+import numpy as np
+from ska_mid_dish_dcp_lib.protocol.b5dc_protocol import B5dcProtocolTimeout
+
+from ska_mid_dish_b5dc_proxy.models.registers import B5DC_REGISTERS
+
+TARGET_WRITE_SEC = 0.0002
+TIMING_OUT_REGISTER = B5DC_REGISTERS[-1].name
+
+
+class SimulatedSensors:
+    """B5dc device sensors stand-in with changing values and a register timing out."""
+
+    def __init__(self, *_: Any) -> None:
+        """Init simulated sensors."""
+
+    async def update_sensor(self, register_name: str) -> None:
+        """Simulate a register read."""
+        if register_name == TIMING_OUT_REGISTER:
+            raise B5dcProtocolTimeout("Timed out")
+
+    def __getattr__(self, _: str) -> float:
+        """Return a new sensor value on every read."""
+        return time.monotonic()
+
+
+class SimulatedLoggingTarget(logging.Handler):
+    """Device logging target stand-in blocking for a fixed time per record."""
+
+    def __init__(self) -> None:
+        """Init simulated logging target."""
+        super().__init__()
+        self.records = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Format the record and simulate writing it."""
+        self.format(record)
+        time.sleep(TARGET_WRITE_SEC)
+        self.records += 1
+
+
+async def time_poll_cycles(component_manager: Any, cycles: int) -> List[float]:
+    """Run poll cycles back to back on the event loop and return their durations."""
+    durations = []
+    for _ in range(cycles):
+        started = time.perf_counter()
+        await component_manager._poll_cycle()
+        component_manager._flush_aggregated_logs()
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+def measure(level: int, queued: bool, cycles: int) -> str:
+    """Time the poll cycles of a component manager and return a summary line."""
+    # pylint: disable=import-outside-toplevel
+    from ska_mid_dish_b5dc_proxy.b5dc_cm import B5dcDeviceComponentManager
+
+    logger = logging.getLogger(f"bench_logging.{logging.getLevelName(level)}.{queued}")
+    logger.propagate = False
+    logger.setLevel(level)
+    target = SimulatedLoggingTarget()
+    logger.addHandler(target)
+    # The background poll task runs once, the cycles are then timed on their own
+    component_manager = B5dcDeviceComponentManager("127.0.0.1", 10001, 3600, logger)
+    component_manager.start_communicating()
+    while not component_manager.is_connection_established():
+        time.sleep(0.01)
+    if not queued:
+        component_manager._log_queue.stop()
+    time.sleep(0.5)
+    target.records = 0
+
+    durations = np.array(
+        asyncio.run_coroutine_threadsafe(
+            time_poll_cycles(component_manager, cycles), component_manager.loop
+        ).result()
+    )
+    component_manager.stop_communicating()
+    logger.removeHandler(target)
+    mode = "queued" if queued else "synchronous"
+    return (
+        f"{logging.getLevelName(level):>5} {mode:>11}: "
+        f"mean {1e6 * durations.mean():7.0f} us, p99 {1e6 * np.percentile(durations, 99):7.0f} us,"
+        f" {target.records / cycles:5.1f} records per cycle"
+    )
+
+
+def main() -> None:
+    """Run the benchmark with DEBUG on and off and print the poll cycle costs."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cycles", type=int, default=500)
+    args = parser.parse_args()
+
+    print(
+        f"{len(B5DC_REGISTERS)} registers, one timing out, {args.cycles} cycles, "
+        f"logging target {1e6 * TARGET_WRITE_SEC:.0f} us per record"
+    )
+    with patch("ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcInterface", Mock()), patch(
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcPropertyParser", Mock()
+    ), patch("ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcProtocol", Mock()), patch(
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcDeviceSensors", SimulatedSensors
+    ), patch(
+        "ska_mid_dish_b5dc_proxy.b5dc_cm.B5dcDeviceComponentManager._update_build_state",
+        AsyncMock(),
+    ):
+        for level in (logging.DEBUG, logging.INFO):
+            for queued in (False, True):
+                print(measure(level, queued, args.cycles))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark the per-device memory and CPU cost of hosting many devices in one process.
+
+A number of component managers are started in a fresh process, each either with a
+dedicated event loop thread and sockets or on the shared event loop and UDP socket
+pool, and each with its own B5DC address, as each dish has. The B5DC is simulated
+with a fixed round trip time. The process memory and CPU time are measured over a
+steady polling window and reported per device, together with the cost of the
+process itself, which hosting many devices in one process pays only once.
+
+Run with::
+
+    PYTHONPATH=.:./src python tests/benchmarks/bench_multi_device.py
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Dict
+from unittest.mock import AsyncMock, Mock, patch
+
+MONITOR_RTT_SEC = 0.005
+POLL_PERIOD_SEC = 1
+
+
+def rss_kib() -> int:
+    """Return the resident set size of this process in KiB."""
+    with open("/proc/self/status", encoding="utf-8") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+class SimulatedSensors:
+    """B5dc device sensors stand-in with a simulated round trip."""
+
+    def __init__(self, *_: Any) -> None:
+        """Init simulated sensors."""
+
+    async def update_sensor(self, _: str) -> None:
+        """Simulate a register read."""
+        await asyncio.sleep(MONITOR_RTT_SEC)
+
+    def __getattr__(self, _: str) -> float:
+        """Return a fixed sensor value."""
+        return 0.0
+
+
+def measure(num_devices: int, shared: bool, duration: float) -> Dict[str, float]:
+    """Start the component managers in this process and measure their cost."""
+    # pylint: disable=import-outside-toplevel
+    from ska_mid_dish_b5dc_proxy.b5dc_cm import B5dcDeviceComponentManager
+
+    imported_rss = rss_kib()
+    with patch("ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcInterface", Mock()), patch(
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcPropertyParser", Mock()
+    ), patch("ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcProtocol", Mock()), patch(
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcDeviceSensors", SimulatedSensors
+    ), patch.object(
+        B5dcDeviceComponentManager, "_update_build_state", AsyncMock()
+    ):
+        component_managers = [
+            B5dcDeviceComponentManager(
+                "127.0.0.1", 10001 + device, POLL_PERIOD_SEC, Mock(), shared_event_loop=shared
+            )
+            for device in range(num_devices)
+        ]
+        for component_manager in component_managers:
+            component_manager.start_communicating()
+        while not all(cm.is_connection_established() for cm in component_managers):
+            time.sleep(0.1)
+        # Let the first poll cycles and allocations settle
+        time.sleep(2 * POLL_PERIOD_SEC)
+
+        started_rss = rss_kib()
+        cpu_started = time.process_time()
+        time.sleep(duration)
+        cpu_sec = time.process_time() - cpu_started
+
+        return {
+            "process_rss_kib": imported_rss,
+            "per_device_rss_kib": (started_rss - imported_rss) / num_devices,
+            "per_device_cpu_pct": 100 * cpu_sec / duration / num_devices,
+            "threads": threading.active_count(),
+            "fds": len(os.listdir("/proc/self/fd")),
+        }
+
+
+def main() -> None:
+    """Run the benchmark for both modes in fresh processes and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--devices", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--worker", choices=["dedicated", "shared"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(measure(args.devices, args.worker == "shared", args.duration)))
+        return
+
+    print(f"devices: {args.devices}, poll period: {POLL_PERIOD_SEC}s")
+    for mode in ("dedicated", "shared"):
+        output = subprocess.run(
+            [sys.executable, __file__, "--worker", mode]
+            + ["--devices", str(args.devices), "--duration", str(args.duration)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.splitlines()[-1])
+        print(
+            f"{mode:>9}: per device {result['per_device_rss_kib']:.0f} KiB, "
+            f"{result['per_device_cpu_pct']:.2f}% CPU; threads {result['threads']}, "
+            f"fds {result['fds']}; process with imports {result['process_rss_kib']} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
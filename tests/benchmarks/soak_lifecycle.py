@@ -0,0 +1,207 @@
+"""
+Soak test of the component manager lifecycle over many Init, reconnect and restart cycles.
+
+Each cycle does what the Init command does to a device: a new component manager
+is created and started, its connection to the simulated B5DC is dropped and
+re-established, its event loop is made stuck, or stopped, in alternate cycles for
+the supervisor to replace, and communication is stopped. The thread count, open
+file descriptors and traced Python memory are sampled as the cycles run, for both
+a dedicated and the shared event loop, and must not grow.
+
+Run with::
+
+    PYTHONPATH=.:./src python tests/benchmarks/soak_lifecycle.py
+"""
+
+# pylint: disable=protected-access
+
+import argparse
+import asyncio
+import gc
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+from unittest.mock import patch
+
+POLL_PERIOD_SEC = 0.01
+WAIT_TIMEOUT_SEC = 5.0
+# Lag at which the supervisor replaces a stuck loop, shortened for the soak
+LOOP_STUCK_TIMEOUT_SEC = 0.05
+# Leeway for the garbage collector and allocator caches between samples
+MEMORY_GROWTH_LIMIT_KIB = 512
+
+
+class SimulatedProtocol(asyncio.DatagramProtocol):
+    """B5dc protocol stand-in; reads and writes are done by the simulated sensors."""
+
+    def __init__(self, *_: Any) -> None:
+        """Init simulated protocol."""
+
+    def sync_read_register(self, *_: Any) -> None:
+        """Do nothing."""
+
+    def sync_write_register(self, *_: Any) -> None:
+        """Do nothing."""
+
+
+class SimulatedSensors:
+    """B5dc device sensors stand-in answering reads immediately."""
+
+    def __init__(self, *_: Any) -> None:
+        """Init simulated sensors."""
+
+    async def update_sensor(self, _: str) -> None:
+        """Simulate a register read."""
+
+    def __getattr__(self, _: str) -> float:
+        """Return a fixed sensor value."""
+        return 0.0
+
+
+def stand_in(*_: Any, **__: Any) -> None:
+    """Stand in for a B5DC interface class, keeping no reference to its arguments."""
+
+
+async def skip_build_state(*_: Any) -> None:
+    """Stand in for the build state read."""
+
+
+def wait_until(condition: Callable[[], bool]) -> None:
+    """Wait for a condition to hold, failing after a timeout."""
+    deadline = time.monotonic() + WAIT_TIMEOUT_SEC
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError("Condition not met within the timeout")
+        time.sleep(0.005)
+
+
+async def drop_connection(component_manager: Any) -> None:
+    """Report the monitoring lane of a component manager as lost."""
+    connection_lost = component_manager.b5dc_client._connection_lost[0]
+    if not connection_lost.done():
+        connection_lost.set_result(None)
+
+
+def reconnect(component_manager: Any) -> None:
+    """Drop the connection of a component manager and wait for it to be re-established."""
+    lost_lanes = component_manager.b5dc_client._connection_lost
+    asyncio.run_coroutine_threadsafe(
+        drop_connection(component_manager), component_manager.loop
+    ).result()
+    # Reconnected once the client has new lanes and the connection is re-established
+    wait_until(
+        lambda: component_manager.b5dc_client._connection_lost is not lost_lanes
+        and component_manager.is_connection_established()
+    )
+
+
+def force_restart(component_manager: Any, stuck: bool) -> None:
+    """
+    Have the supervisor replace a stuck or a stopped event loop and reconnect.
+
+    The supervisor checks are run from here, the supervisor thread itself being
+    held off by the soak, and the last closes the abandoned loop.
+    """
+    loop, loop_thread = component_manager.loop, component_manager.loop_thread
+    unstuck = threading.Event()
+    if stuck:
+        loop.call_soon_threadsafe(unstuck.wait, WAIT_TIMEOUT_SEC)
+        # The first check sends the lag probe which the stuck loop does not answer
+        component_manager._check_event_loop()
+        time.sleep(2 * LOOP_STUCK_TIMEOUT_SEC)
+    else:
+        loop.call_soon_threadsafe(loop.stop)
+        loop_thread.join(WAIT_TIMEOUT_SEC)
+    component_manager._check_event_loop()
+    if component_manager.loop is loop:
+        raise RuntimeError("The supervisor did not replace the event loop")
+    unstuck.set()
+    loop_thread.join(WAIT_TIMEOUT_SEC)
+    wait_until(component_manager.is_connection_established)
+    component_manager._check_event_loop()
+
+
+def resources() -> Dict[str, int]:
+    """Return the thread, file descriptor and traced memory counts of this process."""
+    # Only count memory still referenced, not reference cycles awaiting collection
+    gc.collect()
+    return {
+        "threads": threading.active_count(),
+        "fds": len(os.listdir("/proc/self/fd")),
+        "memory_kib": tracemalloc.get_traced_memory()[0] // 1024,
+    }
+
+
+def soak(cycles: int, shared: bool) -> List[Dict[str, int]]:
+    """Run the lifecycle cycles and return the resource samples."""
+    # pylint: disable=import-outside-toplevel
+    from ska_mid_dish_b5dc_proxy.b5dc_cm import B5dcDeviceComponentManager
+
+    logger = logging.getLogger("soak")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+    samples = []
+    for cycle in range(cycles):
+        component_manager = B5dcDeviceComponentManager(
+            "127.0.0.1", 10001, POLL_PERIOD_SEC, logger, shared_event_loop=shared
+        )
+        component_manager.start_communicating()
+        wait_until(component_manager.is_connection_established)
+        reconnect(component_manager)
+        force_restart(component_manager, stuck=cycle % 2 == 0)
+        component_manager.stop_communicating()
+
+        if cycle % max(cycles // 10, 1) == 0 or cycle == cycles - 1:
+            samples.append({"cycle": cycle, **resources()})
+    return samples
+
+
+def main() -> None:
+    """Run the soak test for both event loop modes and print the resource samples."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cycles", type=int, default=300)
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    leaked = False
+    # Stand-ins rather than mocks, which would keep every call and its arguments
+    with patch("ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcInterface", stand_in), patch(
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcPropertyParser", stand_in
+    ), patch("ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcProtocol", SimulatedProtocol), patch(
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcDeviceSensors", SimulatedSensors
+    ), patch(
+        "ska_mid_dish_b5dc_proxy.b5dc_cm.WAIT_BEFORE_CONNECTION_RETRY_SEC", 0
+    ), patch(
+        "ska_mid_dish_b5dc_proxy.b5dc_cm.LOOP_STUCK_TIMEOUT_SEC", LOOP_STUCK_TIMEOUT_SEC
+    ), patch(
+        "ska_mid_dish_b5dc_proxy.b5dc_cm.LOOP_SUPERVISOR_PERIOD_SEC", 3600.0
+    ), patch(
+        "ska_mid_dish_b5dc_proxy.b5dc_cm.B5dcDeviceComponentManager._update_build_state",
+        skip_build_state,
+    ):
+        for shared in (False, True):
+            mode = "shared" if shared else "dedicated"
+            baseline = resources()
+            samples = soak(args.cycles, shared)
+            print(f"{mode} event loop, {args.cycles} Init/reconnect/restart cycles")
+            print(f"  baseline: {baseline}")
+            for sample in samples:
+                print(f"  {sample}")
+            # The first cycle warms up imports and caches
+            first, last = samples[0], samples[-1]
+            if (
+                last["threads"] > baseline["threads"]
+                or last["fds"] > baseline["fds"]
+                or last["memory_kib"] - first["memory_kib"] > MEMORY_GROWTH_LIMIT_KIB
+            ):
+                print(f"  resources grew over the {mode} soak")
+                leaked = True
+    sys.exit(1 if leaked else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Test the Tango-free asyncio B5DC client."""
+
+import asyncio
+from typing import Any
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from ska_mid_dish_dcp_lib.device.b5dc_device_mappings import B5dcFrequency, B5dcPllState
+from ska_mid_dish_dcp_lib.protocol.b5dc_protocol import B5dcProtocolTimeout
+
+from ska_mid_dish_b5dc_proxy.client.b5dc_client import B5dcClient
+
+
+def run_with_client(test_coroutine: Any) -> Any:
+    """Run a test coroutine against a client connected to mock B5DC interfaces."""
+    with patch("ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcInterface", Mock()), patch(
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcPropertyParser", Mock()
+    ), patch("ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcProtocol", Mock()), patch(
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcDeviceSensors",
+        Mock(side_effect=lambda *_: Mock(update_sensor=AsyncMock())),
+    ), patch(
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcDeviceConfigureFrequency", Mock()
+    ), patch(
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcDeviceConfigureAttenuation", Mock()
+    ), patch(
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcIicDevice", Mock()
+    ), patch(
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcFpgaFirmware", Mock()
+    ), patch(
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcPhysicalConfiguration", Mock()
+    ):
+
+        async def run() -> Any:
+            async with B5dcClient("127.0.0.1", 10001, Mock()) as client:
+                return await test_coroutine(client)
+
+        return asyncio.run(run())
+
+
+@pytest.mark.unit
+def test_b5dc_client_reads_registers_on_each_lane() -> None:
+    """Verify register reads return the values of the lane they were read on."""
+
+    async def read(client: B5dcClient) -> Any:
+        client.sensors.rf_temperature_degc = 25.0
+        client.command_sensors.rfcm_frequency = 13.2
+        return (
+            await client.read_registers(["spi_rfcm_rf_temp_ain5"]),
+            await client.read_registers(["spi_rfcm_frequency"], command_lane=True),
+            client,
+        )
+
+    monitoring, command, client = run_with_client(read)
+    assert monitoring == {"spi_rfcm_rf_temp_ain5": 25.0}
+    assert command == {"spi_rfcm_frequency": 13.2}
+    client.sensors.update_sensor.assert_awaited_once_with("spi_rfcm_rf_temp_ain5")
+    client.command_sensors.update_sensor.assert_awaited_once_with("spi_rfcm_frequency")
+
+
+@pytest.mark.unit
+def test_b5dc_client_configure_band5_reports_readback_mismatches() -> None:
+    """Verify the band 5 configuration is written and mismatched readbacks reported."""
+
+    async def configure(client: B5dcClient) -> Any:
+        client._device_freq_conf.set_frequency = AsyncMock()  # pylint: disable=W0212
+        client._device_attn_conf.set_attenuation = AsyncMock()  # pylint: disable=W0212
+        client.command_sensors.rfcm_frequency = 11.1
+        client.command_sensors.rfcm_h_attenuation_db = 10.0
+        client.command_sensors.rfcm_v_attenuation_db = 20.0
+        return await client.configure_band5(B5dcFrequency.F_13_2_GHZ, 10, 20)
+
+    readback, mismatches = run_with_client(configure)
+    assert readback["spi_rfcm_h_attenuation"] == 10.0
+    assert len(mismatches) == 1
+    assert mismatches[0].startswith("spi_rfcm_frequency expected 13.2")
+
+
+@pytest.mark.unit
+def test_b5dc_client_command_lane_has_one_request_in_flight() -> None:
+    """Verify the band 5 writes and readbacks are not overlapped on the command lane."""
+    in_flight, max_in_flight = [0], [0]
+
+    async def request(*_: Any) -> None:
+        in_flight[0] += 1
+        max_in_flight[0] = max(max_in_flight[0], in_flight[0])
+        await asyncio.sleep(0.001)
+        in_flight[0] -= 1
+
+    async def configure(client: B5dcClient) -> Any:
+        client._device_freq_conf.set_frequency = request  # pylint: disable=W0212
+        client._device_attn_conf.set_attenuation = request  # pylint: disable=W0212
+        client.command_sensors.update_sensor = AsyncMock(side_effect=request)
+        client.command_sensors.rfcm_frequency = 13.2
+        client.command_sensors.rfcm_h_attenuation_db = 10.0
+        client.command_sensors.rfcm_v_attenuation_db = 20.0
+        return await client.configure_band5(B5dcFrequency.F_13_2_GHZ, 10, 20)
+
+    _, mismatches = run_with_client(configure)
+    assert not mismatches
+    assert max_in_flight[0] == 1
+
+
+@pytest.mark.unit
+def test_b5dc_client_monitoring_read_gives_up_on_busy_lane() -> None:
+    """Verify a read bounded by a lock wait is given up while the lane stays busy."""
+
+    async def read(client: B5dcClient) -> Any:
+        with client._sensor_update_lock:  # pylint: disable=W0212
+            read_while_busy = await client.update_register(
+                "spi_rfcm_frequency", max_lock_wait=0.02
+            )
+        return read_while_busy, await client.update_register("spi_rfcm_frequency", 0.02), client
+
+    read_while_busy, read_back, client = run_with_client(read)
+    assert not read_while_busy
+    assert read_back
+    client.sensors.update_sensor.assert_awaited_once_with("spi_rfcm_frequency")
+
+
+@pytest.mark.unit
+def test_b5dc_client_snapshots_stream_register_values() -> None:
+    """Verify snapshots are streamed periodically, None marking a timed out read."""
+
+    async def stream(client: B5dcClient) -> Any:
+        client.sensors.rfcm_pll_lock = B5dcPllState.LOCKED
+        client.sensors.update_sensor = AsyncMock(
+            side_effect=[None, B5dcProtocolTimeout("Timed out"), None, None]
+        )
+        snapshots = []
+        async for snapshot in client.snapshots(
+            0.01, ["spi_rfcm_pll_lock", "spi_rfcm_rf_temp_ain5"]
+        ):
+            snapshots.append(snapshot)
+            if len(snapshots) == 2:
+                break
+        return snapshots
+
+    snapshots = run_with_client(stream)
+    assert snapshots[0]["spi_rfcm_pll_lock"] == B5dcPllState.LOCKED
+    assert snapshots[0]["spi_rfcm_rf_temp_ain5"] is None
+    assert snapshots[1]["spi_rfcm_pll_lock"] == B5dcPllState.LOCKED
@@ -1,5 +1,7 @@
 """Contains pytest fixtures for tango unit tests setup."""
 
+# pylint: disable=protected-access
+
 import time
 from typing import Any
 from unittest.mock import AsyncMock, Mock, patch
@@ -20,21 +22,34 @@ B5DC_FW_VER_TEST = "123"
 B5DC_MDL_NAME_TEST = "fpga_model_name"
 
 
+def wait_for_first_poll_cycle(b5dc_cm: B5dcDeviceComponentManager) -> None:
+    """
+    Wait for the poll task to finish so that it does not race the test.
+
+    The polling period of the test component managers is not a number, so the
+    poll task stops after its first cycle.
+    """
+    for _ in range(50):
+        if b5dc_cm._poll_task is None or b5dc_cm._poll_task.done():
+            return
+        time.sleep(0.1)
+
+
 @pytest.fixture(scope="function")
 def b5dc_cm_setup() -> Any:
     """Create component manager for testing."""
-    with patch("ska_mid_dish_b5dc_proxy.b5dc_cm.B5dcInterface", AsyncMock()), patch(
-        "ska_mid_dish_b5dc_proxy.b5dc_cm.B5dcPropertyParser", Mock()
+    with patch("ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcInterface", AsyncMock()), patch(
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcPropertyParser", Mock()
     ), patch(
-        "ska_mid_dish_b5dc_proxy.b5dc_cm.B5dcDeviceSensors", Mock()
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcDeviceSensors", Mock()
     ) as b5dc_sensor_mock, patch(
-        "ska_mid_dish_b5dc_proxy.b5dc_cm.B5dcProtocol", Mock()
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcProtocol", Mock()
     ), patch(
-        "ska_mid_dish_b5dc_proxy.b5dc_cm.B5dcIicDevice", Mock()
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcIicDevice", Mock()
     ), patch(
-        "ska_mid_dish_b5dc_proxy.b5dc_cm.B5dcFpgaFirmware", Mock()
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcFpgaFirmware", Mock()
     ) as b5dc_fw_mock, patch(
-        "ska_mid_dish_b5dc_proxy.b5dc_cm.B5dcPhysicalConfiguration", Mock()
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcPhysicalConfiguration", Mock()
     ) as b5dc_pca_mock, patch.object(
         B5dcDeviceComponentManager, "_update_sensor_with_lock"
     ) as update_sensor_mock:
@@ -64,25 +79,28 @@ def b5dc_cm_setup() -> Any:
                 break
 
         assert iterations < max_try - 1, "Connection not established"
+        wait_for_first_poll_cycle(b5dc_cm)
 
         yield b5dc_cm, [update_sensor_mock, b5dc_sensor_mock]
 
+        b5dc_cm.stop_communicating()
+
 
 @pytest.fixture(scope="function")
 def b5dc_cm_with_comms_failed() -> Any:
     """Create component manager for testing where the comms to b5dc failed."""
-    with patch("ska_mid_dish_b5dc_proxy.b5dc_cm.B5dcInterface", AsyncMock()), patch(
-        "ska_mid_dish_b5dc_proxy.b5dc_cm.B5dcPropertyParser", Mock()
+    with patch("ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcInterface", AsyncMock()), patch(
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcPropertyParser", Mock()
     ), patch(
-        "ska_mid_dish_b5dc_proxy.b5dc_cm.B5dcDeviceSensors", Mock()
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcDeviceSensors", Mock()
     ) as b5dc_sensor_mock, patch(
-        "ska_mid_dish_b5dc_proxy.b5dc_cm.B5dcProtocol", Mock()
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcProtocol", Mock()
     ), patch(
-        "ska_mid_dish_b5dc_proxy.b5dc_cm.B5dcIicDevice", Mock()
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcIicDevice", Mock()
     ), patch(
-        "ska_mid_dish_b5dc_proxy.b5dc_cm.B5dcFpgaFirmware", Mock()
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcFpgaFirmware", Mock()
     ) as b5dc_fw_mock, patch(
-        "ska_mid_dish_b5dc_proxy.b5dc_cm.B5dcPhysicalConfiguration", Mock()
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcPhysicalConfiguration", Mock()
     ) as b5dc_pca_mock, patch.object(
         B5dcDeviceComponentManager, "_update_sensor_with_lock"
     ) as update_sensor_mock:
@@ -100,9 +118,12 @@ def b5dc_cm_with_comms_failed() -> Any:
                 break
 
         assert iterations < max_try - 1, "Connection not established"
+        wait_for_first_poll_cycle(b5dc_cm)
 
         yield b5dc_cm, [update_sensor_mock, b5dc_sensor_mock]
 
+        b5dc_cm.stop_communicating()
+
 
 @pytest.fixture(scope="function")
 def callbacks() -> dict:
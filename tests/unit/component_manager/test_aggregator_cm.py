@@ -0,0 +1,48 @@
+"""Test the B5dc fleet aggregator component manager."""
+
+# pylint: disable=protected-access
+import time
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+from ska_control_model import CommunicationStatus
+
+from ska_mid_dish_b5dc_proxy.b5dc_aggregator_cm import B5dcAggregatorComponentManager
+from ska_mid_dish_b5dc_proxy.models.registers import B5DC_SNAPSHOT_FIELDS
+
+DISH_DEVICES = ["mid-dish/b5dc-manager/SKA001", "mid-dish/b5dc-manager/SKA002"]
+
+
+@pytest.mark.unit
+@pytest.mark.forked
+def test_aggregator_subscribes_once_per_dish_and_pushes_on_change() -> None:
+    """Verify one subscription per dish feeds the matrix and updates are pushed."""
+    matrix_update_callback = Mock()
+    with patch("ska_mid_dish_b5dc_proxy.b5dc_aggregator_cm.tango.DeviceProxy") as proxy_mock:
+        aggregator_cm = B5dcAggregatorComponentManager(
+            DISH_DEVICES,
+            Mock(),
+            push_period=0.05,
+            matrix_update_callback=matrix_update_callback,
+        )
+        aggregator_cm.start_communicating()
+    assert proxy_mock.return_value.subscribe_event.call_count == len(DISH_DEVICES)
+    assert aggregator_cm.communication_state == CommunicationStatus.ESTABLISHED
+
+    snapshot = [float(column) for column in range(len(B5DC_SNAPSHOT_FIELDS))]
+    aggregator_cm._snapshot_event_received(
+        DISH_DEVICES[1], Mock(err=False, attr_value=Mock(value=snapshot))
+    )
+    aggregator_cm._snapshot_event_received(DISH_DEVICES[0], Mock(err=True))
+    time.sleep(0.2)
+    matrix_update_callback.assert_called_once()
+
+    _, matrix = aggregator_cm.sensor_matrix.snapshot()
+    np.testing.assert_array_equal(matrix[1], snapshot)
+    assert np.isnan(matrix[0, 0])
+    assert matrix[0, -1] == CommunicationStatus.NOT_ESTABLISHED
+
+    aggregator_cm.stop_communicating()
+    assert proxy_mock.return_value.unsubscribe_event.call_count == len(DISH_DEVICES)
+    assert aggregator_cm.communication_state == CommunicationStatus.DISABLED
@@ -1,12 +1,16 @@
 # pylint: disable=protected-access
 """Test component manager handling of unhappy path on SetFrequency cmd call."""
+import asyncio
+import json
+import threading
 import time
-from unittest.mock import AsyncMock
+from typing import Any, Tuple
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 from ska_control_model import TaskStatus
 from ska_mid_dish_dcp_lib.device.b5dc_device import B5dcDeviceAttenuationException
-from ska_mid_dish_dcp_lib.device.b5dc_device_mappings import B5dcFrequency
+from ska_mid_dish_dcp_lib.device.b5dc_device_mappings import B5dcFrequency, B5dcPllState
 
 ATTENUATION_DB_IN_RANGE = 31
 ATTENUATION_DB_OUTSIDE_RANGE = -1
@@ -47,7 +51,7 @@ def test_b5dc_set_frequency_method_with_valid_input(
 ) -> None:
     """Verify SetFrequency returns expected LRC updates on supplying valid input."""
     b5dc_cm, _ = b5dc_cm_setup
-    b5dc_cm._b5dc_device_freq_conf = AsyncMock()
+    b5dc_cm.b5dc_client._device_freq_conf = AsyncMock()
 
     # Set the frequency and verify that expected lrc updates are published
     b5dc_cm._set_frequency(frequency_to_set, task_callback=callbacks["task_cb"])
@@ -92,7 +96,7 @@ def test_b5dc_set_attenuation_with_valid_input(
 ) -> None:
     """Verify SetAttenuation returns expected LRC updates on supplying valid input."""
     b5dc_cm, _ = b5dc_cm_setup
-    b5dc_cm._b5dc_device_attn_conf = AsyncMock()
+    b5dc_cm.b5dc_client._device_attn_conf = AsyncMock()
 
     # Set the attenuation and verify that expected lrc updates are published
     b5dc_cm._set_attenuation(
@@ -145,7 +149,7 @@ def test_b5dc_set_attenuation_with_invalid_input(
     """Verify SetAttenuation returns expected LRC updates on invalid input."""
     b5dc_cm, _ = b5dc_cm_setup
 
-    b5dc_cm._b5dc_device_attn_conf.set_attenuation = AsyncMock(
+    b5dc_cm.b5dc_client._device_attn_conf.set_attenuation = AsyncMock(
         side_effect=B5dcDeviceAttenuationException("ex")
     )
 
@@ -155,7 +159,7 @@ def test_b5dc_set_attenuation_with_invalid_input(
         task_callback=callbacks["task_cb"],
     )
 
-    b5dc_cm._b5dc_device_attn_conf.set_attenuation.assert_called_once()
+    b5dc_cm.b5dc_client._device_attn_conf.set_attenuation.assert_called_once()
 
     expected_call_kwargs = (
         {
@@ -184,3 +188,314 @@ def test_b5dc_set_attenuation_with_invalid_input(
     for count, call in enumerate(call_args_list):
         _, kwargs = call
         assert kwargs == expected_call_kwargs[count]
+
+
+@pytest.mark.unit
+@pytest.mark.forked
+@pytest.mark.parametrize(
+    "h_attenuation_db, v_attenuation_db, attn_reg_name, invalid_value",
+    [
+        (
+            ATTENUATION_DB_OUTSIDE_RANGE,
+            ATTENUATION_DB_IN_RANGE,
+            "spi_rfcm_h_attenuation",
+            ATTENUATION_DB_OUTSIDE_RANGE,
+        ),
+        (
+            ATTENUATION_DB_IN_RANGE,
+            ATTENUATION_DB_IN_RANGE + 1,
+            "spi_rfcm_v_attenuation",
+            ATTENUATION_DB_IN_RANGE + 1,
+        ),
+    ],
+)
+def test_b5dc_configure_band5_rejects_invalid_attenuation(
+    h_attenuation_db: int,
+    v_attenuation_db: int,
+    attn_reg_name: str,
+    invalid_value: int,
+    b5dc_cm_setup,
+) -> None:
+    """Verify ConfigureBand5 rejects out of range attenuations before queuing."""
+    b5dc_cm, _ = b5dc_cm_setup
+
+    cmd_handler_return = b5dc_cm.configure_band5(
+        B5dcFrequency.F_11_1_GHZ, h_attenuation_db, v_attenuation_db, None
+    )
+
+    expected_return = (
+        TaskStatus.REJECTED,
+        f"Invalid attenuation value supplied for {attn_reg_name}: {invalid_value}. "
+        f"Expected a value in the range [0-31dB]",
+    )
+    assert cmd_handler_return == expected_return
+
+
+@pytest.mark.unit
+@pytest.mark.forked
+def test_b5dc_configure_band5_rejects_invalid_freq(b5dc_cm_setup) -> None:
+    """Verify ConfigureBand5 returns TaskStatus.REJECTED for invalid freq. arg."""
+    b5dc_cm, _ = b5dc_cm_setup
+
+    status, _ = b5dc_cm.configure_band5(5, ATTENUATION_DB_IN_RANGE, ATTENUATION_DB_IN_RANGE)
+
+    assert status == TaskStatus.REJECTED
+
+
+@pytest.mark.unit
+@pytest.mark.forked
+@pytest.mark.parametrize(
+    "readback_frequency, expected_status",
+    [
+        (13.2, TaskStatus.COMPLETED),
+        (11.1, TaskStatus.FAILED),
+    ],
+)
+def test_b5dc_configure_band5_applies_and_verifies_configuration(
+    readback_frequency: float,
+    expected_status: TaskStatus,
+    callbacks: dict,
+    b5dc_cm_setup,
+) -> None:
+    """Verify ConfigureBand5 writes all registers and reports a single result."""
+    b5dc_cm, _ = b5dc_cm_setup
+    b5dc_cm.b5dc_client._device_freq_conf = AsyncMock()
+    b5dc_cm.b5dc_client._device_attn_conf = AsyncMock()
+    b5dc_cm.b5dc_client.command_sensors = Mock(
+        update_sensor=AsyncMock(),
+        rfcm_frequency=readback_frequency,
+        rfcm_h_attenuation_db=float(ATTENUATION_DB_IN_RANGE),
+        rfcm_v_attenuation_db=0.0,
+    )
+
+    b5dc_cm._configure_band5(
+        B5dcFrequency.F_13_2_GHZ,
+        ATTENUATION_DB_IN_RANGE,
+        0,
+        task_callback=callbacks["task_cb"],
+    )
+
+    b5dc_cm.b5dc_client._device_freq_conf.set_frequency.assert_awaited_once_with(
+        B5dcFrequency.F_13_2_GHZ
+    )
+    assert b5dc_cm.b5dc_client._device_attn_conf.set_attenuation.await_count == 2
+    assert b5dc_cm.b5dc_client.command_sensors.update_sensor.await_count == 3
+    assert b5dc_cm.sensor_store.value("spi_rfcm_frequency") == readback_frequency
+
+    call_args_list = callbacks["task_cb"].call_args_list
+    assert len(call_args_list) == 2
+    _, kwargs = call_args_list[-1]
+    assert kwargs["status"] == expected_status
+
+
+@pytest.mark.unit
+@pytest.mark.forked
+def test_b5dc_coalesced_set_command_supersedes_queued_command(b5dc_cm_setup) -> None:
+    """Verify a newer queued set command aborts an older one which has not started."""
+    b5dc_cm, _ = b5dc_cm_setup
+    b5dc_cm._coalesce_set_commands = True
+
+    async def slow_set_attenuation(*_: Any) -> None:
+        await asyncio.sleep(0.5)
+
+    b5dc_cm.b5dc_client._device_attn_conf = Mock(
+        set_attenuation=AsyncMock(side_effect=slow_set_attenuation)
+    )
+
+    task_callbacks = [Mock(), Mock(), Mock()]
+    for attenuation_db, task_callback in enumerate(task_callbacks):
+        status, _ = b5dc_cm.set_attenuation(
+            attenuation_db, "spi_rfcm_h_attenuation", task_callback=task_callback
+        )
+        assert status == TaskStatus.QUEUED
+        # let the first command start before queuing the others
+        time.sleep(0.1)
+
+    wait_count = 1
+    while wait_count <= 10:
+        if task_callbacks[-1].call_args.kwargs.get("status") != TaskStatus.COMPLETED:
+            time.sleep(0.2)
+            wait_count += 1
+        else:
+            break
+
+    task_callbacks[1].assert_called_with(
+        status=TaskStatus.ABORTED,
+        result="Superseded by a newer request to set spi_rfcm_h_attenuation",
+    )
+    set_attenuation_calls = b5dc_cm.b5dc_client._device_attn_conf.set_attenuation.call_args_list
+    assert [call.args[0] for call in set_attenuation_calls] == [0, 2]
+
+
+@pytest.mark.unit
+@pytest.mark.forked
+def test_b5dc_superseded_set_command_reports_one_terminal_status(b5dc_cm_setup) -> None:
+    """Verify a superseded command reports ABORTED only, even if the link drops."""
+    b5dc_cm, _ = b5dc_cm_setup
+    b5dc_cm._coalesce_set_commands = True
+    submitted = []
+
+    def submit_task(*_: Any, **kwargs: Any) -> Tuple[TaskStatus, str]:
+        submitted.append(kwargs)
+        return TaskStatus.QUEUED, "Task queued"
+
+    task_callbacks = [Mock(), Mock()]
+    with patch.object(b5dc_cm, "submit_task", side_effect=submit_task):
+        for attenuation_db, task_callback in enumerate(task_callbacks):
+            b5dc_cm.set_attenuation(
+                attenuation_db, "spi_rfcm_h_attenuation", task_callback=task_callback
+            )
+
+    with patch.object(b5dc_cm, "is_connection_established", return_value=False):
+        # The superseded task is let through to return, the newer one is rejected
+        assert submitted[0]["is_cmd_allowed"]()
+        assert not submitted[1]["is_cmd_allowed"]()
+    submitted[0]["task_callback"](status=TaskStatus.REJECTED)
+    submitted[1]["task_callback"](status=TaskStatus.REJECTED)
+
+    task_callbacks[0].assert_called_once_with(
+        status=TaskStatus.ABORTED,
+        result="Superseded by a newer request to set spi_rfcm_h_attenuation",
+    )
+    task_callbacks[1].assert_called_once_with(status=TaskStatus.REJECTED)
+
+
+@pytest.mark.unit
+@pytest.mark.forked
+def test_b5dc_abort_cancels_in_flight_set_command(callbacks: dict, b5dc_cm_setup) -> None:
+    """Verify aborting an in-flight set command cancels it and reports ABORTED promptly."""
+    b5dc_cm, _ = b5dc_cm_setup
+    write_cancelled = threading.Event()
+
+    async def hung_set_frequency(*_: Any) -> None:
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            write_cancelled.set()
+            raise
+
+    b5dc_cm.b5dc_client._device_freq_conf = Mock(
+        set_frequency=AsyncMock(side_effect=hung_set_frequency)
+    )
+
+    task_abort_event = threading.Event()
+    command_thread = threading.Thread(
+        target=b5dc_cm._set_frequency,
+        args=(B5dcFrequency.F_11_1_GHZ,),
+        kwargs={"task_callback": callbacks["task_cb"], "task_abort_event": task_abort_event},
+    )
+    command_thread.start()
+    time.sleep(0.2)
+
+    abort_requested = time.monotonic()
+    task_abort_event.set()
+    command_thread.join(timeout=2)
+
+    assert not command_thread.is_alive()
+    assert time.monotonic() - abort_requested < 1
+    assert write_cancelled.wait(timeout=1)
+    _, kwargs = callbacks["task_cb"].call_args
+    assert kwargs == {"status": TaskStatus.ABORTED}
+
+
+@pytest.mark.unit
+@pytest.mark.forked
+@pytest.mark.parametrize(
+    "reads_before_lock, expected_status",
+    [
+        (3, TaskStatus.COMPLETED),
+        (None, TaskStatus.FAILED),
+    ],
+)
+def test_b5dc_set_frequency_waits_for_pll_lock(
+    reads_before_lock: Any, expected_status: TaskStatus, callbacks: dict, b5dc_cm_setup
+) -> None:
+    """Verify SetFrequency completes only once the PLL locks, recording the lock time."""
+    b5dc_cm, _ = b5dc_cm_setup
+    b5dc_cm._wait_for_pll_lock = True
+    b5dc_cm._pll_lock_timeout = 0.5
+    b5dc_cm.b5dc_client._device_freq_conf = AsyncMock()
+
+    command_sensors = Mock(rfcm_pll_lock=B5dcPllState.NOT_LOCKED)
+    pll_reads = []
+
+    async def read_pll_lock(register_name: str) -> None:
+        pll_reads.append(register_name)
+        if reads_before_lock is not None and len(pll_reads) >= reads_before_lock:
+            command_sensors.rfcm_pll_lock = B5dcPllState.LOCKED
+
+    command_sensors.update_sensor = AsyncMock(side_effect=read_pll_lock)
+    b5dc_cm.b5dc_client.command_sensors = command_sensors
+
+    b5dc_cm._set_frequency(B5dcFrequency.F_13_2_GHZ, task_callback=callbacks["task_cb"])
+
+    _, kwargs = callbacks["task_cb"].call_args
+    assert kwargs["status"] == expected_status
+    counts, _ = b5dc_cm.pll_lock_time_histogram.snapshot()
+    if expected_status == TaskStatus.COMPLETED:
+        assert len(pll_reads) == reads_before_lock
+        assert counts.sum() == 1
+        assert b5dc_cm.last_pll_lock_time > 0
+        assert b5dc_cm.sensor_store.value("spi_rfcm_pll_lock") == B5dcPllState.LOCKED
+    else:
+        assert kwargs["result"] == (
+            f"PLL did not lock within 0.5s of SetFrequency({B5dcFrequency.F_13_2_GHZ})"
+        )
+        assert counts.sum() == 0
+
+
+@pytest.mark.unit
+@pytest.mark.forked
+def test_b5dc_traced_set_frequency_records_each_stage(
+    callbacks: dict, b5dc_cm_setup, tmp_path
+) -> None:
+    """Verify a traced command records a span for each stage to the trace file."""
+    b5dc_cm, _ = b5dc_cm_setup
+    b5dc_cm.b5dc_client._device_freq_conf = AsyncMock()
+    trace_file = tmp_path / "b5dc.trace.json"
+    b5dc_cm.tracer.open(str(trace_file), 1024 * 1024, 1)
+
+    with b5dc_cm.tracer.trace("SetFrequency") as trace:
+        b5dc_cm.set_frequency(B5dcFrequency.F_13_2_GHZ, callbacks["task_cb"])
+        trace.args["command_id"] = "1_SetFrequency"
+
+    # The result push span ends once the COMPLETED callback has returned
+    result_push = b5dc_cm.tracer.stages.index("result_push")
+    deadline = time.monotonic() + 5
+    while not b5dc_cm.tracer.stage_latencies()[1][result_push] and time.monotonic() < deadline:
+        time.sleep(0.05)
+    b5dc_cm.tracer.close()
+
+    _, kwargs = callbacks["task_cb"].call_args
+    assert kwargs["status"] == TaskStatus.COMPLETED
+    means, maxima = b5dc_cm.tracer.stage_latencies()
+    stage_means = dict(zip(b5dc_cm.tracer.stages, means))
+    for stage in ("command", "queue", "execute", "loop_dispatch", "b5dc_io", "result_push"):
+        assert stage_means[stage] > 0
+    assert all(mean <= maximum for mean, maximum in zip(means, maxima))
+
+    events = json.loads(trace_file.read_text().rstrip().rstrip(",") + "]")
+    assert {event["name"] for event in events} >= {"command", "execute", "b5dc_io"}
+    assert {event["args"]["trace"] for event in events} == {trace.trace_id}
+    assert all(event["cat"] == "SetFrequency" and event["ph"] == "X" for event in events)
+
+
+@pytest.mark.unit
+@pytest.mark.forked
+def test_b5dc_command_rejected_when_queue_is_full(b5dc_cm_setup) -> None:
+    """Verify a command is rejected with the reason while the queue is at its limit."""
+    b5dc_cm, _ = b5dc_cm_setup
+    b5dc_cm._max_queued_commands = 1
+    _, queued_callback = b5dc_cm.task_queue.track(Mock(), None, "set_attenuation")
+    queued_callback(status=TaskStatus.QUEUED)
+
+    assert b5dc_cm.set_frequency(B5dcFrequency.F_13_2_GHZ, None) == (
+        TaskStatus.REJECTED,
+        "Command rejected, 1 commands are already queued, the limit is 1",
+    )
+    families = {family.name: family for family in b5dc_cm.collect_metrics()}
+    assert (
+        "_total",
+        {"device": "b5dc", "command": "set_frequency"},
+        1,
+    ) in families["b5dc_command_rejections"].samples
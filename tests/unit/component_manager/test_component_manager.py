@@ -1,14 +1,32 @@
 """Test b5dc component manager."""
 
+# pylint: disable=protected-access
+import asyncio
+import dataclasses
 import json
+import threading
 import time
 from typing import Any
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
-
-from ska_mid_dish_b5dc_proxy.b5dc_cm import B5dcDeviceComponentManager
+from ska_control_model import CommunicationStatus, HealthState
+from ska_mid_dish_dcp_lib.device.b5dc_device_mappings import B5dcPllState
+from ska_mid_dish_dcp_lib.protocol.b5dc_protocol import B5dcProtocolTimeout
+
+from ska_mid_dish_b5dc_proxy.b5dc_cm import (
+    COMMAND_PREEMPT_MAX_WAIT_SEC,
+    LINK_DOWN_FAILURE_COUNT,
+    LINK_UP_SUCCESS_COUNT,
+    B5dcDeviceComponentManager,
+)
 from ska_mid_dish_b5dc_proxy.models.constants import B5DC_BUILD_STATE_DEVICE_NAME
+from ska_mid_dish_b5dc_proxy.models.registers import (
+    B5DC_REGISTERS,
+    B5DC_REGISTERS_BY_NAME,
+    B5DC_SNAPSHOT_FIELDS,
+)
+from ska_mid_dish_b5dc_proxy.telemetry.sensor_history import SampleQuality
 
 from .conftest import (
     B5DC_BACKPLANE_VER_TEST,
@@ -47,6 +65,78 @@ def test_b5dc_comms_thread_created(b5dc_cm_setup: Any) -> None:
     assert b5dc_cm.loop_thread.is_alive()
 
 
+@pytest.mark.unit
+@pytest.mark.forked
+def test_b5dc_stop_communicating_releases_loop(b5dc_cm_setup: Any) -> None:
+    """Verify stop_communicating stops the loop thread and communication can restart."""
+    b5dc_cm, _ = b5dc_cm_setup
+    loop, loop_thread = b5dc_cm.loop, b5dc_cm.loop_thread
+
+    b5dc_cm.stop_communicating()
+    assert not loop_thread.is_alive()
+    assert loop.is_closed()
+    assert not b5dc_cm.is_connection_established()
+    assert b5dc_cm.communication_state == CommunicationStatus.DISABLED
+
+    b5dc_cm.start_communicating()
+    for _ in range(50):
+        if b5dc_cm.is_connection_established():
+            break
+        time.sleep(0.1)
+    assert b5dc_cm.is_connection_established()
+    assert b5dc_cm.loop_thread is not loop_thread
+
+
+@pytest.mark.unit
+@pytest.mark.forked
+def test_b5dc_supervisor_restarts_dead_loop_thread(b5dc_cm_setup: Any) -> None:
+    """Verify the supervisor measures the loop lag and replaces a dead loop thread."""
+    b5dc_cm, _ = b5dc_cm_setup
+    b5dc_cm._check_event_loop()
+    time.sleep(0.1)
+    b5dc_cm._check_event_loop()
+    assert b5dc_cm.loop_lag < 0.1
+
+    loop, loop_thread = b5dc_cm.loop, b5dc_cm.loop_thread
+    loop.call_soon_threadsafe(loop.stop)
+    loop_thread.join(1.0)
+    b5dc_cm._check_event_loop()
+    assert loop.is_closed()
+    assert b5dc_cm.loop_thread is not loop_thread and b5dc_cm.loop_thread.is_alive()
+    for _ in range(50):
+        if b5dc_cm.is_connection_established():
+            break
+        time.sleep(0.1)
+    assert b5dc_cm.is_connection_established()
+
+
+@pytest.mark.unit
+@pytest.mark.forked
+def test_b5dc_supervisor_closes_abandoned_stuck_loop(b5dc_cm_setup: Any) -> None:
+    """Verify a stuck loop replaced by the supervisor is closed with its sockets once it stops."""
+    b5dc_cm, _ = b5dc_cm_setup
+    loop, loop_thread, client = b5dc_cm.loop, b5dc_cm.loop_thread, b5dc_cm.b5dc_client
+    lane_sockets = [
+        transport.get_extra_info("socket")
+        for transport in (client._transport, client._cmd_transport)
+    ]
+    unstuck = threading.Event()
+    loop.call_soon_threadsafe(unstuck.wait, 5.0)
+
+    with patch("ska_mid_dish_b5dc_proxy.b5dc_cm.LOOP_STUCK_TIMEOUT_SEC", 0.05):
+        b5dc_cm._check_event_loop()
+        time.sleep(0.1)
+        b5dc_cm._check_event_loop()
+    assert b5dc_cm.loop is not loop and b5dc_cm.b5dc_client is not client
+    assert not loop.is_closed()
+
+    unstuck.set()
+    loop_thread.join(1.0)
+    b5dc_cm._check_event_loop()
+    assert loop.is_closed()
+    assert all(lane_socket.fileno() == -1 for lane_socket in lane_sockets)
+
+
 @pytest.mark.unit
 @pytest.mark.forked
 def test_b5dc_build_state_populated(b5dc_cm_setup: Any) -> None:
@@ -119,8 +209,8 @@ def test_b5dc_variable_sync_update(b5dc_cm_setup: Any) -> None:
 
     # 1 additional call for the initial periodic update
     assert call_counts[register_name] == 2
-    # check that the last call to update component state has expected args
-    assert b5dc_cm.component_state[register_name] == mock_frequency_val
+    # check that the sensor store holds the updated value
+    assert b5dc_cm.sensor_store.value(register_name) == mock_frequency_val
 
 
 @pytest.mark.unit
@@ -130,10 +220,16 @@ def test_b5dc_polling_update_frequency() -> None:
     update_period = 2
     wait_duration = 11
 
-    with patch("ska_mid_dish_b5dc_proxy.b5dc_cm.B5dcInterface", AsyncMock()), patch(
-        "ska_mid_dish_b5dc_proxy.b5dc_cm.B5dcPropertyParser", Mock()
-    ), patch("ska_mid_dish_b5dc_proxy.b5dc_cm.B5dcDeviceSensors", Mock()), patch(
-        "ska_mid_dish_b5dc_proxy.b5dc_cm.B5dcProtocol", Mock()
+    with patch("ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcInterface", AsyncMock()), patch(
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcPropertyParser", Mock()
+    ), patch("ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcDeviceSensors", Mock()), patch(
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcProtocol", Mock()
+    ), patch(
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcIicDevice", Mock()
+    ), patch(
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcFpgaFirmware", Mock()
+    ), patch(
+        "ska_mid_dish_b5dc_proxy.client.b5dc_client.B5dcPhysicalConfiguration", Mock()
     ), patch.object(
         B5dcDeviceComponentManager, "_update_sensor_with_lock"
     ) as update_sensor_mock, patch.object(
@@ -157,3 +253,285 @@ def test_b5dc_polling_update_frequency() -> None:
 
         assert len(call_counts) == NUM_OF_ATTRIBUTES
         assert all(value == wait_duration // update_period + 1 for value in call_counts.values())
+
+
+@pytest.mark.unit
+@pytest.mark.forked
+def test_b5dc_monitoring_reads_yield_to_in_flight_command(b5dc_cm_setup: Any) -> None:
+    """Verify monitoring reads are held off while a command is in flight."""
+    b5dc_cm, _ = b5dc_cm_setup
+    command_duration = 0.3
+
+    b5dc_cm._command_lane_idle.clear()
+    threading.Timer(command_duration, b5dc_cm._command_lane_idle.set).start()
+
+    started = time.monotonic()
+    asyncio.run(b5dc_cm._yield_to_command_lane())
+    waited = time.monotonic() - started
+
+    assert command_duration <= waited < COMMAND_PREEMPT_MAX_WAIT_SEC
+
+
+@pytest.mark.unit
+@pytest.mark.forked
+def test_b5dc_client_reads_served_from_store_during_command(b5dc_cm_setup: Any) -> None:
+    """Verify a client read does not wait for an in-flight command or read the B5DC."""
+    b5dc_cm, mocks = b5dc_cm_setup
+    update_sensor_mock = mocks[0]
+    register_name = "spi_rfcm_frequency"
+    reads = get_arguments_histogram(update_sensor_mock.call_args_list)[register_name]
+
+    b5dc_cm._command_lane_idle.clear()
+    started = time.monotonic()
+    b5dc_cm.sync_register_outside_event_loop(register_name)
+    assert time.monotonic() - started < 0.1
+    b5dc_cm._command_lane_idle.set()
+
+    call_counts = get_arguments_histogram(update_sensor_mock.call_args_list)
+    assert call_counts[register_name] == reads
+    assert b5dc_cm._register_last_read[register_name] >= started
+
+
+@pytest.mark.unit
+@pytest.mark.forked
+def test_b5dc_polled_samples_recorded_in_history(b5dc_cm_setup: Any) -> None:
+    """Verify every polled register sample is appended to the sensor history."""
+    b5dc_cm, _ = b5dc_cm_setup
+
+    for register_name in B5DC_REGISTERS_BY_NAME:
+        _, timestamps, quality = b5dc_cm.get_sensor_history(register_name, 10)
+        assert len(timestamps) == 1
+        assert quality.tolist() == [SampleQuality.VALID]
+
+
+@pytest.mark.unit
+@pytest.mark.forked
+def test_b5dc_polled_samples_update_rolling_statistics(b5dc_cm_setup: Any) -> None:
+    """Verify polled register values update the rolling statistics once per poll cycle."""
+    b5dc_cm, mocks = b5dc_cm_setup
+    b5dc_sensor_mock = mocks[1]
+
+    for temperature in (20.0, 22.0, 24.0):
+        b5dc_sensor_mock.return_value.rf_temperature_degc = temperature
+        asyncio.run(b5dc_cm._sync_register_within_event_loop("spi_rfcm_rf_temp_ain5"))
+    assert b5dc_cm.component_state["spi_rfcm_rf_temp_ain5_mean_1m"] == 0.0
+    b5dc_cm._publish_statistics()
+
+    assert b5dc_cm.component_state["spi_rfcm_rf_temp_ain5_mean_1m"] == 22.0
+    assert b5dc_cm.component_state["spi_rfcm_rf_temp_ain5_min_1m"] == 20.0
+    assert b5dc_cm.component_state["spi_rfcm_rf_temp_ain5_max_1m"] == 24.0
+
+
+@pytest.mark.unit
+@pytest.mark.forked
+def test_b5dc_alarm_rules_update_health_on_transition(b5dc_cm_setup: Any) -> None:
+    """Verify the PLL lock alarm rule drives the B5DC health and active alarms."""
+    b5dc_cm, mocks = b5dc_cm_setup
+    b5dc_sensor_mock = mocks[1]
+
+    b5dc_cm._evaluate_alarms()
+    assert b5dc_cm.component_state["b5dchealth"] == HealthState.OK
+    assert b5dc_cm.component_state["activealarms"] == []
+
+    b5dc_sensor_mock.return_value.rfcm_pll_lock = B5dcPllState.NOT_LOCKED
+    asyncio.run(b5dc_cm._sync_register_within_event_loop("spi_rfcm_pll_lock"))
+    b5dc_cm._evaluate_alarms()
+    assert b5dc_cm.component_state["b5dchealth"] == HealthState.FAILED
+    assert b5dc_cm.component_state["activealarms"] == ["spi_rfcm_pll_lock"]
+
+    b5dc_sensor_mock.return_value.rfcm_pll_lock = B5dcPllState.LOCKED
+    asyncio.run(b5dc_cm._sync_register_within_event_loop("spi_rfcm_pll_lock"))
+    b5dc_cm._evaluate_alarms()
+    assert b5dc_cm.component_state["b5dchealth"] == HealthState.OK
+    assert b5dc_cm.component_state["activealarms"] == []
+
+    b5dc_sensor_mock.return_value.rfcm_pll_lock = B5dcPllState.NOT_LOCKED_WITH_LOSS_DETECTED
+    asyncio.run(b5dc_cm._sync_register_within_event_loop("spi_rfcm_pll_lock"))
+    b5dc_cm._evaluate_alarms()
+    assert b5dc_cm.component_state["b5dchealth"] == HealthState.FAILED
+    assert b5dc_cm.component_state["activealarms"] == ["spi_rfcm_pll_lock"]
+
+
+@pytest.mark.unit
+@pytest.mark.forked
+def test_b5dc_sensor_update_callback_called_on_change(b5dc_cm_setup: Any) -> None:
+    """Verify register changes are reported once and a failed read marks them invalid."""
+    b5dc_cm, mocks = b5dc_cm_setup
+    update_sensor_mock = mocks[0]
+    b5dc_sensor_mock = mocks[1]
+    sensor_update_callback = Mock()
+    b5dc_cm._sensor_update_callback = sensor_update_callback
+    register_name = "spi_rfcm_rf_temp_ain5"
+
+    b5dc_sensor_mock.return_value.rf_temperature_degc = 25.0
+    b5dc_cm.sync_register_outside_event_loop(register_name)
+    b5dc_cm.sync_register_outside_event_loop(register_name)
+    sensor_update_callback.assert_called_once()
+    assert sensor_update_callback.call_args.args[0] == register_name
+    assert sensor_update_callback.call_args.args[1] == 25.0
+    assert sensor_update_callback.call_args.args[3] == SampleQuality.VALID
+
+    update_sensor_mock.side_effect = B5dcProtocolTimeout("Timed out")
+    b5dc_cm.sync_register_outside_event_loop(register_name)
+    assert sensor_update_callback.call_count == 2
+    assert sensor_update_callback.call_args.args[1] == 25.0
+    assert sensor_update_callback.call_args.args[3] == SampleQuality.INVALID
+
+
+@pytest.mark.unit
+@pytest.mark.forked
+def test_b5dc_snapshot_published_on_register_change(b5dc_cm_setup: Any) -> None:
+    """Verify the compact snapshot is published only when a register has changed."""
+    b5dc_cm, mocks = b5dc_cm_setup
+    b5dc_sensor_mock = mocks[1]
+    component_state_callback = Mock()
+    b5dc_cm._component_state_callback = component_state_callback
+
+    b5dc_sensor_mock.return_value.rf_temperature_degc = 31.0
+    b5dc_cm.sync_register_outside_event_loop("spi_rfcm_rf_temp_ain5")
+    b5dc_cm._publish_snapshot()
+    b5dc_cm._publish_snapshot()
+
+    snapshot = b5dc_cm.component_state["sensorsnapshot"]
+    assert len(snapshot) == len(B5DC_SNAPSHOT_FIELDS)
+    assert snapshot[B5DC_SNAPSHOT_FIELDS.index("spi_rfcm_rf_temp_ain5")] == 31.0
+    assert snapshot[-1] == float(b5dc_cm.communication_state)
+    snapshot_calls = [
+        call for call in component_state_callback.call_args_list if "sensorsnapshot" in call.kwargs
+    ]
+    assert len(snapshot_calls) == 1
+
+
+@pytest.mark.unit
+@pytest.mark.forked
+def test_b5dc_register_poll_period_respected(b5dc_cm_setup: Any) -> None:
+    """Verify a register with its own poll period is skipped until it is due."""
+    b5dc_cm, mocks = b5dc_cm_setup
+    update_sensor_mock = mocks[0]
+    slow_register = "spi_rfcm_psu_pcb_temp_ain7"
+    registers = tuple(
+        (
+            dataclasses.replace(register, poll_period=3600.0)
+            if register.name == slow_register
+            else register
+        )
+        for register in B5DC_REGISTERS
+    )
+
+    update_sensor_mock.reset_mock()
+    with patch("ska_mid_dish_b5dc_proxy.b5dc_cm.B5DC_REGISTERS", registers):
+        asyncio.run(b5dc_cm._update_all_registers())
+        asyncio.run(b5dc_cm._update_all_registers())
+
+    call_counts = get_arguments_histogram(update_sensor_mock.call_args_list)
+    assert call_counts[slow_register] == 1
+    assert call_counts["spi_rfcm_rf_temp_ain5"] == 2
+
+
+@pytest.mark.unit
+@pytest.mark.forked
+def test_b5dc_demand_driven_polling(b5dc_cm_setup: Any) -> None:
+    """Verify only core, subscribed and recently read registers stay on the fast schedule."""
+    b5dc_cm, mocks = b5dc_cm_setup
+    update_sensor_mock = mocks[0]
+    b5dc_cm._demand_driven_polling = True
+    b5dc_cm._subscribed_registers_callback = lambda: {"spi_rfcm_rf_temp_ain5"}
+    b5dc_cm._register_last_read["spi_rfcm_h_attenuation"] = time.monotonic()
+
+    update_sensor_mock.reset_mock()
+    asyncio.run(b5dc_cm._update_all_registers())
+    asyncio.run(b5dc_cm._update_all_registers())
+
+    call_counts = get_arguments_histogram(update_sensor_mock.call_args_list)
+    assert call_counts["spi_rfcm_pll_lock"] == 2
+    assert call_counts["spi_rfcm_rf_temp_ain5"] == 2
+    assert call_counts["spi_rfcm_h_attenuation"] == 2
+    assert call_counts["spi_rfcm_psu_pcb_temp_ain7"] == 1
+
+
+@pytest.mark.unit
+@pytest.mark.forked
+def test_b5dc_communication_state_debounced(b5dc_cm_setup: Any) -> None:
+    """Verify a burst of failed reads shorter than the threshold keeps the connection up."""
+    b5dc_cm, mocks = b5dc_cm_setup
+    update_sensor_mock = mocks[0]
+    register_name = "spi_rfcm_rf_temp_ain5"
+
+    for _ in range(LINK_UP_SUCCESS_COUNT):
+        b5dc_cm.sync_register_outside_event_loop(register_name)
+    b5dc_cm._apply_link_state()
+    assert b5dc_cm.communication_state == CommunicationStatus.ESTABLISHED
+
+    update_sensor_mock.side_effect = B5dcProtocolTimeout("Timed out")
+    for _ in range(LINK_DOWN_FAILURE_COUNT - 1):
+        b5dc_cm.sync_register_outside_event_loop(register_name)
+    b5dc_cm._apply_link_state()
+    assert b5dc_cm.communication_state == CommunicationStatus.ESTABLISHED
+
+    b5dc_cm.sync_register_outside_event_loop(register_name)
+    b5dc_cm._apply_link_state()
+    assert b5dc_cm.communication_state == CommunicationStatus.NOT_ESTABLISHED
+
+
+@pytest.mark.unit
+@pytest.mark.forked
+def test_b5dc_communication_state_lost_while_reconnect_fails(b5dc_cm_setup: Any) -> None:
+    """Verify the connection is reported down when reconnecting keeps failing."""
+    b5dc_cm, _ = b5dc_cm_setup
+    assert b5dc_cm.communication_state == CommunicationStatus.ESTABLISHED
+
+    client = b5dc_cm.b5dc_client
+    connection_lost = client._connection_lost[0]
+    with patch("ska_mid_dish_b5dc_proxy.b5dc_cm.WAIT_BEFORE_CONNECTION_RETRY_SEC", 0.01):
+        client.connect = AsyncMock(side_effect=OSError("Network is unreachable"))
+        b5dc_cm.loop.call_soon_threadsafe(connection_lost.set_result, None)
+        for _ in range(50):
+            if b5dc_cm.communication_state == CommunicationStatus.NOT_ESTABLISHED:
+                break
+            time.sleep(0.1)
+    assert b5dc_cm.communication_state == CommunicationStatus.NOT_ESTABLISHED
+    assert client.connect.await_count >= LINK_DOWN_FAILURE_COUNT - 1
+
+
+@pytest.mark.unit
+@pytest.mark.forked
+def test_b5dc_repeated_read_timeouts_logged_once_per_window(b5dc_cm_setup: Any) -> None:
+    """Verify repeated read timeouts of a register are logged once, then counted."""
+    b5dc_cm, mocks = b5dc_cm_setup
+    update_sensor_mock = mocks[0]
+    register_name = "spi_rfcm_rf_temp_ain5"
+    sensor = B5DC_REGISTERS_BY_NAME[register_name].sensor_field
+
+    update_sensor_mock.side_effect = B5dcProtocolTimeout("Timed out")
+    for _ in range(5):
+        b5dc_cm.sync_register_outside_event_loop(register_name)
+    timeout_logs = [call for call in b5dc_cm._logger.log.call_args_list if call.args[-1] == sensor]
+    assert len(timeout_logs) == 1
+
+
+@pytest.mark.unit
+@pytest.mark.forked
+def test_b5dc_metrics_count_reads_and_timeouts(b5dc_cm_setup: Any) -> None:
+    """Verify the exported metrics count the register reads and their timeouts."""
+    b5dc_cm, mocks = b5dc_cm_setup
+    update_sensor_mock = mocks[0]
+    register_name = "spi_rfcm_rf_temp_ain5"
+    reads = b5dc_cm.read_rtt_histograms[register_name].snapshot()[0].sum()
+
+    b5dc_cm.sync_register_outside_event_loop(register_name)
+    update_sensor_mock.side_effect = B5dcProtocolTimeout("Timed out")
+    b5dc_cm.sync_register_outside_event_loop(register_name)
+
+    families = {family.name: family for family in b5dc_cm.collect_metrics()}
+    rtt_counts = {
+        labels["register"]: value
+        for suffix, labels, value in families["b5dc_read_rtt_seconds"].samples
+        if suffix == "_count"
+    }
+    assert rtt_counts[register_name] == reads + 1
+    assert (
+        "_total",
+        {"device": "b5dc", "register": register_name},
+        1,
+    ) in families["b5dc_read_timeouts"].samples
+    assert families["b5dc_executor_queue_depth"].samples == [("", {"device": "b5dc"}, 0)]
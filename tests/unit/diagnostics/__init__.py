@@ -0,0 +1 @@
+"""Unit test package for ska_mid_dish_b5dc_proxy diagnostics."""
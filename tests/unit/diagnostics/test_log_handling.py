@@ -0,0 +1,82 @@
+"""Test the logging helpers used on the polling hot path."""
+
+import logging
+import threading
+from typing import List
+
+import pytest
+
+from ska_mid_dish_b5dc_proxy.diagnostics.log_handling import AggregatedLog, LogQueue
+
+
+class _RecordingHandler(logging.Handler):
+    """Keep the handled records and the threads which handled them."""
+
+    def __init__(self) -> None:
+        """Init recording handler."""
+        super().__init__()
+        self.records: List[logging.LogRecord] = []
+        self.threads: List[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Record the record."""
+        self.records.append(record)
+        self.threads.append(threading.current_thread().name)
+
+
+@pytest.mark.unit
+def test_aggregated_log_counts_repeated_events_per_window() -> None:
+    """Verify repeated events are logged once and then as a count per window."""
+    logger = logging.getLogger("test_aggregated_log")
+    logger.propagate = False
+    handler = _RecordingHandler()
+    logger.addHandler(handler)
+    now = [0.0]
+    timeouts = AggregatedLog(logger, logging.WARNING, "Timeout on %s", 60.0, lambda: now[0])
+
+    for _ in range(5):
+        timeouts.record("pll")
+    timeouts.record("attenuation")
+    timeouts.flush()
+    assert [record.getMessage() for record in handler.records] == [
+        "Timeout on pll",
+        "Timeout on attenuation",
+    ]
+
+    now[0] = 61.0
+    timeouts.flush()
+    assert handler.records[-1].getMessage() == "Timeout on pll: 4 more in the last 61 s"
+    assert handler.records[-1].levelno == logging.WARNING
+    assert len(handler.records) == 3
+
+    # The window of pll was quiet, so the next event is logged straight away
+    now[0] = 122.0
+    timeouts.flush()
+    timeouts.record("pll")
+    assert handler.records[-1].getMessage() == "Timeout on pll"
+    assert len(handler.records) == 4
+    logger.removeHandler(handler)
+
+
+@pytest.mark.unit
+def test_log_queue_passes_records_on_from_a_listener_thread() -> None:
+    """Verify queued records respect the parent level and reach it on another thread."""
+    parent = logging.getLogger("test_log_queue")
+    parent.propagate = False
+    parent.setLevel(logging.INFO)
+    handler = _RecordingHandler()
+    parent.addHandler(handler)
+    log_queue = LogQueue(parent)
+
+    log_queue.start()
+    log_queue.logger.debug("filtered by the parent level")
+    log_queue.logger.info("queued %s", "record")
+    log_queue.stop()
+    assert [record.getMessage() for record in handler.records] == ["queued record"]
+    assert handler.threads[0] != threading.current_thread().name
+
+    # Stopped, the records are propagated synchronously
+    log_queue.logger.warning("direct")
+    assert handler.records[-1].getMessage() == "direct"
+    assert handler.threads[-1] == threading.current_thread().name
+    parent.removeHandler(handler)
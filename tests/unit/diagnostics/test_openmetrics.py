@@ -0,0 +1,83 @@
+"""Test the OpenMetrics endpoint."""
+
+import urllib.error
+import urllib.request
+from typing import List
+
+import pytest
+
+from ska_mid_dish_b5dc_proxy.diagnostics.openmetrics import (
+    CONTENT_TYPE,
+    MetricFamily,
+    OpenMetricsExporter,
+)
+from ska_mid_dish_b5dc_proxy.telemetry.histogram import Histogram
+
+
+def _device_metrics(device: str, timeouts: int) -> List[MetricFamily]:
+    """Return a counter and a histogram labelled with a device name."""
+    counter = MetricFamily("b5dc_read_timeouts", "counter", "Register reads timed out")
+    counter.add(timeouts, "_total", device=device)
+    histogram = Histogram((0.01, 0.1))
+    histogram.observe(0.005)
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    rtt = MetricFamily("b5dc_read_rtt_seconds", "histogram", "Read round trip", "seconds")
+    rtt.add_histogram(histogram, device=device)
+    return [counter, rtt]
+
+
+@pytest.mark.unit
+def test_exporter_renders_merged_families() -> None:
+    """Verify the families of the collectors are merged in the OpenMetrics format."""
+    exporter = OpenMetricsExporter()
+    exporter._collectors = {  # pylint: disable=protected-access
+        "a": lambda: _device_metrics("a", 2),
+        "b": lambda: _device_metrics('b"1', 0),
+    }
+
+    assert exporter.render().splitlines() == [
+        "# TYPE b5dc_read_timeouts counter",
+        "# HELP b5dc_read_timeouts Register reads timed out",
+        'b5dc_read_timeouts_total{device="a"} 2',
+        'b5dc_read_timeouts_total{device="b\\"1"} 0',
+        "# TYPE b5dc_read_rtt_seconds histogram",
+        "# HELP b5dc_read_rtt_seconds Read round trip",
+        "# UNIT b5dc_read_rtt_seconds seconds",
+        'b5dc_read_rtt_seconds_bucket{device="a",le="0.01"} 1',
+        'b5dc_read_rtt_seconds_bucket{device="a",le="0.1"} 2',
+        'b5dc_read_rtt_seconds_bucket{device="a",le="+Inf"} 3',
+        'b5dc_read_rtt_seconds_count{device="a"} 3',
+        'b5dc_read_rtt_seconds_sum{device="a"} 0.555',
+        'b5dc_read_rtt_seconds_bucket{device="b\\"1",le="0.01"} 1',
+        'b5dc_read_rtt_seconds_bucket{device="b\\"1",le="0.1"} 2',
+        'b5dc_read_rtt_seconds_bucket{device="b\\"1",le="+Inf"} 3',
+        'b5dc_read_rtt_seconds_count{device="b\\"1"} 3',
+        'b5dc_read_rtt_seconds_sum{device="b\\"1"} 0.555',
+        "# EOF",
+    ]
+
+
+@pytest.mark.unit
+def test_exporter_serves_metrics_while_collectors_are_registered() -> None:
+    """Verify the endpoint serves the metrics and stops after the last collector leaves."""
+    exporter = OpenMetricsExporter()
+    port = exporter.register("a", 0, lambda: _device_metrics("a", 1))
+    assert exporter.register("b", port + 1, lambda: _device_metrics("b", 1)) == port
+
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+        assert response.headers["Content-Type"] == CONTENT_TYPE
+        body = response.read().decode()
+    assert 'b5dc_read_timeouts_total{device="b"} 1' in body
+    assert body.endswith("# EOF\n")
+    with pytest.raises(urllib.error.HTTPError):
+        # pylint: disable=consider-using-with
+        urllib.request.urlopen(f"http://127.0.0.1:{port}/other", timeout=5)
+
+    exporter.unregister("a")
+    assert exporter.port == port
+    exporter.unregister("b")
+    assert exporter.port is None
+    with pytest.raises(urllib.error.URLError):
+        # pylint: disable=consider-using-with
+        urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5)
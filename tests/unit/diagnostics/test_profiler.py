@@ -0,0 +1,61 @@
+"""Test the on-demand profilers."""
+
+import os
+import threading
+import time
+from typing import Any, List
+
+import pytest
+
+from ska_mid_dish_b5dc_proxy.diagnostics.profiler import MemoryTracer, SamplingProfiler
+
+
+def _busy_wait(stop: threading.Event) -> None:
+    """Spin until stopped."""
+    while not stop.is_set():
+        pass
+
+
+@pytest.mark.unit
+def test_sampling_profiler_reports_busy_thread(tmp_path: Any) -> None:
+    """Verify the profile attributes the samples of a thread to the function it runs."""
+    stop = threading.Event()
+    busy_thread = threading.Thread(target=_busy_wait, args=(stop,), name="busy thread")
+    busy_thread.start()
+    profiler = SamplingProfiler(interval=0.005)
+
+    assert profiler.start(0.2) == 0.2
+    with pytest.raises(RuntimeError):
+        profiler.start(0.2)
+    # The profile ends by itself after its duration
+    time.sleep(0.4)
+    assert not profiler.running
+    stop.set()
+    busy_thread.join()
+
+    report = profiler.report()
+    assert "Thread busy thread:" in report
+    assert "_busy_wait (test_profiler.py" in report
+    path = os.path.join(tmp_path, "profile.txt")
+    profiler.write_collapsed_stacks(path)
+    with open(path, encoding="utf-8") as collapsed:
+        assert any(line.startswith("busy thread;") and "_busy_wait" in line for line in collapsed)
+
+
+@pytest.mark.unit
+def test_memory_tracer_reports_allocation_growth() -> None:
+    """Verify the trace reports the sites which allocated since it started."""
+    tracer = MemoryTracer(max_duration=1.0)
+    with pytest.raises(RuntimeError):
+        tracer.report()
+
+    assert tracer.start(10.0) == 1.0
+    retained: List[bytes] = [bytes(1024) for _ in range(1000)]
+    report = tracer.report(top=5)
+    assert report.startswith("Trace running")
+    assert "test_profiler.py" in report
+
+    tracer.stop()
+    assert not tracer.running
+    assert tracer.report(top=5).startswith("Trace stopped")
+    del retained
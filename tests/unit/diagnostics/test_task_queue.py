@@ -0,0 +1,62 @@
+"""Test the tracking of the tasks waiting in an executor queue."""
+
+from unittest.mock import Mock, patch
+
+import pytest
+from ska_control_model import TaskStatus
+
+from ska_mid_dish_b5dc_proxy.diagnostics.task_queue import TaskQueueTracker
+
+
+@pytest.mark.unit
+def test_task_queue_tracker_counts_queued_tasks() -> None:
+    """Verify tasks leave the queue when they start or are aborted while queued."""
+    tracker = TaskQueueTracker()
+    task, task_callback = Mock(return_value="done"), Mock()
+
+    started_func, started_callback = tracker.track(task, task_callback)
+    _, aborted_callback = tracker.track(task, None)
+    started_callback(status=TaskStatus.QUEUED)
+    aborted_callback(status=TaskStatus.QUEUED)
+    assert tracker.depth == 2
+
+    assert started_func(1, task_callback=started_callback) == "done"
+    task.assert_called_once_with(1, task_callback=started_callback)
+    started_callback(status=TaskStatus.IN_PROGRESS)
+    assert tracker.depth == 1
+    aborted_callback(status=TaskStatus.ABORTED)
+    assert tracker.depth == 0
+    task_callback.assert_any_call(status=TaskStatus.QUEUED)
+
+    # A task started before the executor reports it QUEUED is not counted
+    early_func, early_callback = tracker.track(task, None)
+    early_func()
+    early_callback(status=TaskStatus.QUEUED)
+    assert tracker.depth == 0
+
+
+@pytest.mark.unit
+def test_task_queue_tracker_admits_within_limits() -> None:
+    """Verify the wait is estimated from recent execution times and limits admission."""
+    tracker = TaskQueueTracker(buckets=(0.01, 1.0))
+    assert tracker.admission_refusal(max_depth=1, max_wait=0.5) is None
+
+    with patch("time.monotonic", side_effect=[10.0, 12.0, 12.2]):
+        func, _ = tracker.track(Mock(), None, "set_frequency")
+        func()
+    statistics = tracker.statistics()["set_frequency"]
+    assert statistics.queue_wait.snapshot()[0].tolist() == [0, 0, 1]
+    assert statistics.execution.snapshot()[0].tolist() == [0, 1, 0]
+
+    _, queued_callback = tracker.track(Mock(), None, "set_frequency")
+    queued_callback(status=TaskStatus.QUEUED)
+    assert tracker.estimated_wait() == pytest.approx(0.2)
+    assert tracker.admission_refusal(max_depth=0, max_wait=0.5) is None
+    assert tracker.admission_refusal(max_depth=0, max_wait=0.1) == (
+        "the estimated queue wait of 0.2 s exceeds the limit of 0.1 s"
+    )
+    assert tracker.admission_refusal(max_depth=1, max_wait=0) == (
+        "1 commands are already queued, the limit is 1"
+    )
+    tracker.record_rejection("set_frequency")
+    assert statistics.rejections == 1
@@ -0,0 +1,58 @@
+"""Test the span tracing of commands."""
+
+import json
+import threading
+from unittest.mock import Mock
+
+import pytest
+from ska_control_model import TaskStatus
+
+from ska_mid_dish_b5dc_proxy.diagnostics.tracing import CommandTracer
+
+
+@pytest.mark.unit
+def test_tracer_carries_trace_into_task_and_rotates_file(tmp_path) -> None:
+    """Verify a task records its stages in the trace it was submitted from."""
+    tracer = CommandTracer(("command", "queue", "execute", "result_push"), window=2)
+    trace_file = tmp_path / "trace.json"
+    tracer.open(str(trace_file), 2048, 1)
+    task, task_callback = Mock(), Mock()
+
+    # Outside a trace, tasks are submitted unchanged and nothing is recorded
+    assert tracer.wrap_task(task, task_callback) == (task, task_callback)
+    with tracer.span("execute"):
+        pass
+    assert tracer.stage_latencies() == ([0.0] * 4, [0.0] * 4)
+
+    for _ in range(20):
+        with tracer.trace("SetFrequency") as trace:
+            traced_func, traced_callback = tracer.wrap_task(task, task_callback)
+        thread = threading.Thread(
+            target=traced_func, kwargs={"task_callback": traced_callback}, daemon=True
+        )
+        thread.start()
+        thread.join()
+        traced_callback(status=TaskStatus.IN_PROGRESS)
+        traced_callback(status=TaskStatus.COMPLETED, result="done")
+    tracer.close()
+
+    assert tracer.current() is None
+    task.assert_called_with(task_callback=traced_callback)
+    task_callback.assert_called_with(status=TaskStatus.COMPLETED, result="done")
+    means, maxima = tracer.stage_latencies()
+    assert all(mean > 0 for mean in means)
+    assert all(mean <= maximum for mean, maximum in zip(means, maxima))
+
+    # Each file is a JSON array left open, rotated at the size limit
+    rotated_file = tmp_path / "trace.json.1"
+    assert rotated_file.exists()
+    for path in (rotated_file, trace_file):
+        events = json.loads(path.read_text().rstrip().rstrip(",") + "]")
+        assert {event["name"] for event in events} <= {
+            "command",
+            "queue",
+            "execute",
+            "result_push",
+        }
+    assert events[-1]["name"] == "result_push"
+    assert events[-1]["args"] == {"trace": trace.trace_id}
@@ -0,0 +1,166 @@
+"""Test the concurrent fleet command fan-out."""
+
+import asyncio
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+import pytest
+from ska_control_model import ResultCode, TaskStatus
+from tango import DevFailed
+
+from ska_mid_dish_b5dc_proxy.fleet.fan_out import (
+    ERROR,
+    NOT_SUBMITTED,
+    STATUS_CHECK_FAILED,
+    TIMED_OUT,
+    fan_out_command,
+    set_attenuation,
+)
+
+
+class FakeDishProxy:  # pylint: disable=too-few-public-methods
+    """Asyncio device proxy of a dish whose commands finish after a set delay."""
+
+    def __init__(self, fleet: "FakeFleet", dish_device: str) -> None:
+        """Initialise the proxy of a dish in the fake fleet."""
+        self._fleet = fleet
+        self._dish_device = dish_device
+
+    async def command_inout(self, command_name: str, argument: Any) -> Any:
+        """Submit a command or check the status of a submitted command."""
+        if command_name == "CheckLongRunningCommandStatus":
+            await asyncio.sleep(0.001)
+            self._fleet.status_checks[self._dish_device] += 1
+            if self._dish_device in self._fleet.failing_status_checks:
+                raise DevFailed()
+            loop_time = asyncio.get_running_loop().time()
+            if loop_time < self._fleet.finish_times[argument]:
+                return TaskStatus.IN_PROGRESS.name
+            self._fleet.in_flight -= 1
+            return TaskStatus.COMPLETED.name
+
+        self._fleet.commands.append((self._dish_device, command_name, argument))
+        if self._dish_device in self._fleet.broken:
+            raise RuntimeError("Unexpected reply")
+        if self._dish_device in self._fleet.rejecting:
+            return [ResultCode.REJECTED], ["Rejected"]
+        self._fleet.in_flight += 1
+        self._fleet.max_in_flight = max(self._fleet.max_in_flight, self._fleet.in_flight)
+        command_id = f"{self._dish_device}_{command_name}"
+        self._fleet.finish_times[
+            command_id
+        ] = asyncio.get_running_loop().time() + self._fleet.delays.get(self._dish_device, 0.01)
+        return [ResultCode.QUEUED], [command_id]
+
+
+class FakeFleet:  # pylint: disable=too-many-instance-attributes,too-few-public-methods
+    """Creates fake dish proxies and records the commands they receive."""
+
+    def __init__(
+        self,
+        delays: Dict[str, float],
+        rejecting: Tuple[str, ...] = (),
+        failing_status_checks: Tuple[str, ...] = (),
+        broken: Tuple[str, ...] = (),
+    ) -> None:
+        """Initialise the fleet with per-dish command delays and failures."""
+        self.delays = delays
+        self.rejecting = rejecting
+        self.failing_status_checks = failing_status_checks
+        self.broken = broken
+        self.commands: List[Tuple[str, str, Any]] = []
+        self.status_checks: Counter = Counter()
+        self.finish_times: Dict[str, float] = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def proxy(self, dish_device: str) -> FakeDishProxy:
+        """Return the proxy of a dish, failing for an unknown dish."""
+        if dish_device not in self.delays:
+            raise DevFailed()
+        return FakeDishProxy(self, dish_device)
+
+
+@pytest.mark.unit
+def test_fan_out_bounds_concurrency_and_reports_stragglers() -> None:
+    """Verify commands run concurrently up to the limit and slow dishes are reported."""
+    dishes = [f"dish{index}" for index in range(8)]
+    fleet = FakeFleet({dish: 0.02 for dish in dishes} | {"dish3": 0.2})
+
+    report = asyncio.run(
+        fan_out_command(dishes, "SetFrequency", 2, max_concurrency=4, proxy_factory=fleet.proxy)
+    )
+
+    assert fleet.max_in_flight == 4
+    assert [result.dish_device for result in report.results] == dishes
+    assert all(result.succeeded for result in report.results)
+    assert report.failed == []
+    assert report.stragglers == ["dish3"]
+    # The fast dishes overlap the slow one rather than adding to it
+    assert report.elapsed < sum(result.latency for result in report.results)
+
+
+@pytest.mark.unit
+def test_fan_out_reports_rejected_unreachable_and_timed_out_dishes() -> None:
+    """Verify per-dish failures are reported without failing the other dishes."""
+    fleet = FakeFleet({"dish0": 0.01, "dish1": 0.01, "dish2": 5.0}, rejecting=("dish1",))
+
+    report = asyncio.run(
+        set_attenuation(
+            ["dish0", "dish1", "dish2", "unknown"],
+            "h",
+            10,
+            timeout=0.2,
+            proxy_factory=fleet.proxy,
+        )
+    )
+
+    statuses = {result.dish_device: result.status for result in report.results}
+    assert statuses == {
+        "dish0": TaskStatus.COMPLETED.name,
+        "dish1": TaskStatus.REJECTED.name,
+        "dish2": TIMED_OUT,
+        "unknown": NOT_SUBMITTED,
+    }
+    assert fleet.commands[0] == ("dish0", "SetHPolAttenuation", 10)
+    assert report.failed == ["dish1", "dish2", "unknown"]
+    assert report.stragglers[0] == "dish2"
+
+    with pytest.raises(ValueError):
+        asyncio.run(set_attenuation(["dish0"], "x", 10, proxy_factory=fleet.proxy))
+
+
+@pytest.mark.unit
+def test_fan_out_reports_failed_status_checks_and_unexpected_errors() -> None:
+    """Verify a failed status check and an unexpected error are reported per dish."""
+    fleet = FakeFleet(
+        {"dish0": 0.01, "dish1": 0.01, "dish2": 0.01},
+        failing_status_checks=("dish1",),
+        broken=("dish2",),
+    )
+
+    report = asyncio.run(
+        fan_out_command(["dish0", "dish1", "dish2"], "SetFrequency", 2, proxy_factory=fleet.proxy)
+    )
+
+    statuses = {result.dish_device: result.status for result in report.results}
+    assert statuses == {
+        "dish0": TaskStatus.COMPLETED.name,
+        "dish1": STATUS_CHECK_FAILED,
+        "dish2": ERROR,
+    }
+    assert "Unexpected reply" in report.results[2].message
+    assert report.failed == ["dish1", "dish2"]
+    assert report.stragglers == []
+
+
+@pytest.mark.unit
+def test_fan_out_backs_off_status_checks_of_slow_dishes() -> None:
+    """Verify the status of a slow command is checked with a growing period."""
+    fleet = FakeFleet({"dish0": 0.6})
+
+    report = asyncio.run(fan_out_command(["dish0"], "SetFrequency", 2, proxy_factory=fleet.proxy))
+
+    assert report.results[0].succeeded
+    # Checks at about 0, 0.05, 0.13, 0.24, 0.41 and 0.66 s, rather than every 50 ms
+    assert fleet.status_checks["dish0"] <= 7
@@ -5,6 +5,8 @@ from typing import Any
 import pytest
 import tango
 
+from ska_mid_dish_b5dc_proxy.models.registers import B5DC_REGISTERS
+
 attributes = [
     "rfcmFrequency",
     "rfcmPllLock",
@@ -17,6 +19,8 @@ attributes = [
     "vPolRfPowerOut",
     "rfTemperature",
     "rfcmPsuPcbTemperature",
+    "b5dcHealth",
+    "activeAlarms",
 ]
 
 
@@ -28,6 +32,18 @@ def test_client_test_attributes_exist(b5dc_proxy: Any) -> None:
     assert set(attributes).issubset(set(attr))
 
 
+@pytest.mark.unit
+@pytest.mark.forked
+def test_register_attributes_configured_from_registry(b5dc_proxy: Any) -> None:
+    """Verify the register attributes take their configuration from the registry."""
+    for register in B5DC_REGISTERS:
+        config = b5dc_proxy.get_attribute_config(register.attribute_name)
+        assert config.description == register.doc
+        assert config.unit == register.unit
+
+    assert b5dc_proxy.get_attribute_config("rfcmPllLock").data_type == tango.CmdArgType.DevEnum
+
+
 @pytest.mark.parametrize("attr", attributes)
 @pytest.mark.unit
 @pytest.mark.forked
@@ -54,3 +70,15 @@ def test_client_receives_change_event(b5dc_proxy: Any, event_store_class: Any, a
     )
 
     assert event_store_class.get_queue_events()
+
+
+@pytest.mark.unit
+@pytest.mark.forked
+def test_statistics_attributes_exist(b5dc_proxy: Any) -> None:
+    """Verify rolling statistics attributes are exposed for the analogue registers."""
+    attr = set(b5dc_proxy.get_attribute_list())
+
+    for statistic in ("Mean", "Min", "Max", "Std"):
+        assert f"hPolRfPowerIn{statistic}1m" in attr
+        assert f"rfTemperature{statistic}1m" in attr
+        assert f"rfcmPllLock{statistic}1m" not in attr
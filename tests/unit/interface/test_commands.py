@@ -0,0 +1,68 @@
+"""Test the B5dcProxy device commands not requiring a B5DC connection."""
+
+import json
+import time
+from typing import Any
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from tango.test_context import DeviceTestContext
+
+from ska_mid_dish_b5dc_proxy.b5dc_proxy import B5dcProxy
+from ska_mid_dish_b5dc_proxy.telemetry.sensor_history import SampleQuality
+
+
+@pytest.mark.unit
+@pytest.mark.forked
+def test_get_sensor_history_returns_sample_arrays(b5dc_proxy: Any) -> None:
+    """Verify GetSensorHistory returns the sample arrays of the requested register."""
+    history = json.loads(b5dc_proxy.GetSensorHistory([[10], ["spi_rfcm_frequency"]]))
+
+    assert history == {
+        "register": "spi_rfcm_frequency",
+        "values": [],
+        "timestamps": [],
+        "quality": [],
+    }
+
+
+@pytest.mark.unit
+@pytest.mark.forked
+def test_get_sensor_history_returns_null_for_invalid_samples() -> None:
+    """Verify GetSensorHistory returns valid JSON with a null value for an invalid sample."""
+    history_arrays = (
+        np.array([13.2, np.nan]),
+        np.array([1000.0, 1001.0]),
+        np.array([SampleQuality.VALID, SampleQuality.INVALID], dtype=np.uint8),
+    )
+    with patch(
+        "ska_mid_dish_b5dc_proxy.b5dc_cm.B5dcDeviceComponentManager.start_communicating"
+    ), patch(
+        "ska_mid_dish_b5dc_proxy.b5dc_cm.B5dcDeviceComponentManager.get_sensor_history",
+        return_value=history_arrays,
+    ):
+        tango_context = DeviceTestContext(B5dcProxy, process=True)
+        tango_context.start()
+        try:
+            reply = tango_context.device.GetSensorHistory([[2], ["spi_rfcm_frequency"]])
+        finally:
+            tango_context.stop()
+
+    history = json.loads(reply, parse_constant=pytest.fail)
+    assert history["values"] == [13.2, None]
+    assert history["quality"] == [SampleQuality.VALID, SampleQuality.INVALID]
+
+
+@pytest.mark.unit
+@pytest.mark.forked
+def test_profile_commands_return_reports(b5dc_proxy: Any) -> None:
+    """Verify the profiling commands return a thread profile and a memory snapshot."""
+    assert b5dc_proxy.StartProfile(0.5) == "Profiling for 0.5 s"
+    time.sleep(0.2)
+    report = b5dc_proxy.StopProfile()
+    assert report.startswith("Collapsed stacks written to ")
+    assert "samples over" in report
+
+    assert b5dc_proxy.StartMemoryTrace(1.0) == "Tracing memory allocations for 1 s"
+    assert b5dc_proxy.GetMemorySnapshot(5).startswith("Trace running")
@@ -0,0 +1,73 @@
+"""Test the threshold alarm engine."""
+
+import json
+
+import numpy as np
+import pytest
+
+from ska_mid_dish_b5dc_proxy.telemetry.alarm_engine import (
+    AlarmEngine,
+    AlarmRule,
+    parse_alarm_rules,
+)
+
+
+@pytest.mark.unit
+def test_alarm_engine_applies_hysteresis() -> None:
+    """Verify an alarm is raised above its threshold and clears only past the hysteresis."""
+    engine = AlarmEngine(
+        ["temp"], [AlarmRule("over_temp", "temp", high=60.0, hysteresis=2.0, severity="FAILED")]
+    )
+    assert engine.evaluate(np.array([50.0]))
+    assert engine.active_alarms == []
+    assert engine.severity == 0
+
+    assert engine.evaluate(np.array([61.0]))
+    assert engine.active_alarms == ["over_temp"]
+    assert engine.severity == 2
+
+    # Back under the threshold but within the hysteresis band
+    assert not engine.evaluate(np.array([59.0]))
+    assert engine.active_alarms == ["over_temp"]
+
+    # A failed read holds the alarm state
+    assert not engine.evaluate(np.array([np.nan]))
+
+    assert engine.evaluate(np.array([57.5]))
+    assert engine.active_alarms == []
+
+
+@pytest.mark.unit
+def test_alarm_engine_evaluates_ranges_and_alarm_values() -> None:
+    """Verify range and discrete value rules across registers and the summary severity."""
+    engine = AlarmEngine(
+        ["rf_in", "pll"],
+        [
+            AlarmRule("rf_in_range", "rf_in", low=-30.0, high=-10.0, severity="DEGRADED"),
+            AlarmRule("pll_unlocked", "pll", alarm_values=(0.0,), severity="FAILED"),
+        ],
+    )
+    engine.evaluate(np.array([-35.0, 1.0]))
+    assert engine.active_alarms == ["rf_in_range"]
+    assert engine.severity == 1
+
+    assert engine.evaluate(np.array([-35.0, 0.0]))
+    assert engine.active_alarms == ["rf_in_range", "pll_unlocked"]
+    assert engine.severity == 2
+
+    assert engine.evaluate(np.array([-20.0, 1.0]))
+    assert engine.active_alarms == []
+
+
+@pytest.mark.unit
+def test_parse_alarm_rules() -> None:
+    """Verify rules are parsed from JSON and invalid configuration is rejected."""
+    rules = parse_alarm_rules(
+        json.dumps([{"register": "temp", "high": 60, "hysteresis": 2, "severity": "FAILED"}])
+    )
+    assert rules == [AlarmRule("temp", "temp", high=60, hysteresis=2.0, severity="FAILED")]
+
+    with pytest.raises(ValueError):
+        parse_alarm_rules(json.dumps([{"high": 60}]))
+    with pytest.raises(ValueError):
+        AlarmEngine(["temp"], [AlarmRule("temp", "temp", high=60, severity="BAD")])
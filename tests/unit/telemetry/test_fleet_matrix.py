@@ -0,0 +1,38 @@
+"""Test the fleet sensor matrix."""
+
+import numpy as np
+import pytest
+
+from ska_mid_dish_b5dc_proxy.telemetry.fleet_matrix import FleetSensorMatrix
+
+FIELDS = ["reg_a", "reg_b", "connection_state"]
+
+
+@pytest.mark.unit
+def test_fleet_matrix_columns_follow_dish_snapshots() -> None:
+    """Verify snapshots fill dish rows and columns give the fleet-wide view of a field."""
+    matrix = FleetSensorMatrix(["dish1", "dish2"], FIELDS)
+    assert np.isnan(matrix.column("reg_a")).all()
+    assert matrix.generation == 0
+
+    matrix.update("dish1", [1.0, 2.0, 3.0])
+    matrix.update("dish2", [4.0, 5.0, 3.0, 99.0])
+    np.testing.assert_array_equal(matrix.column("reg_b"), [2.0, 5.0])
+    assert matrix.generation == 2
+
+    matrix.update("dish2", [6.0])
+    generation, values = matrix.snapshot()
+    assert generation == 3
+    assert values[1, 0] == 6.0
+    assert np.isnan(values[1, 1:]).all()
+
+
+@pytest.mark.unit
+def test_fleet_matrix_invalidate_keeps_connection_state() -> None:
+    """Verify an unreachable dish has unknown values but a known connection state."""
+    matrix = FleetSensorMatrix(["dish1"], FIELDS)
+    matrix.update("dish1", [1.0, 2.0, 3.0])
+
+    matrix.invalidate("dish1", 1.0)
+    assert np.isnan(matrix.column("reg_a")).all()
+    np.testing.assert_array_equal(matrix.column("connection_state"), [1.0])
@@ -0,0 +1,26 @@
+"""Test the fixed bucket histogram."""
+
+import pytest
+
+from ska_mid_dish_b5dc_proxy.telemetry.histogram import Histogram
+
+
+@pytest.mark.unit
+def test_histogram_buckets_observations() -> None:
+    """Verify observations land in the bucket bounded above by the next bound."""
+    histogram = Histogram([0.1, 0.5, 1.0])
+
+    for value in (0.05, 0.1, 0.2, 0.5, 0.9, 3.0):
+        histogram.observe(value)
+
+    counts, total = histogram.snapshot()
+    assert counts.tolist() == [2, 2, 1, 1]
+    assert total == pytest.approx(4.75)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("bounds", [[], [1.0, 1.0], [2.0, 1.0]])
+def test_histogram_rejects_invalid_bounds(bounds: list) -> None:
+    """Verify the bucket bounds must be strictly increasing."""
+    with pytest.raises(ValueError):
+        Histogram(bounds)
@@ -0,0 +1,42 @@
+"""Test the debounced link state."""
+
+import pytest
+
+from ska_mid_dish_b5dc_proxy.telemetry.link_state import LinkStateDebouncer
+
+
+@pytest.mark.unit
+def test_link_state_debounces_transitions() -> None:
+    """Verify the link changes state only after consecutive successes or failures."""
+    link_state = LinkStateDebouncer(success_threshold=2, failure_threshold=3)
+    link_state.record_success()
+    assert not link_state.connected
+    link_state.record_success()
+    assert link_state.connected
+
+    # A burst of failures shorter than the threshold keeps the link up
+    link_state.record_failure()
+    link_state.record_failure()
+    link_state.record_success()
+    link_state.record_failure()
+    link_state.record_failure()
+    assert link_state.connected
+    link_state.record_failure()
+    assert not link_state.connected
+
+    # A lone success does not bring the link back up
+    link_state.record_success()
+    link_state.record_failure()
+    link_state.record_success()
+    assert not link_state.connected
+
+    link_state.record_success()
+    link_state.reset()
+    assert not link_state.connected
+
+
+@pytest.mark.unit
+def test_link_state_rejects_invalid_thresholds() -> None:
+    """Verify thresholds must be positive."""
+    with pytest.raises(ValueError):
+        LinkStateDebouncer(success_threshold=0, failure_threshold=1)
@@ -0,0 +1,65 @@
+"""Test the incremental rolling-window statistics."""
+
+import math
+
+import numpy as np
+import pytest
+
+from ska_mid_dish_b5dc_proxy.telemetry.rolling_statistics import (
+    RollingWindowStatistics,
+    SensorStatistics,
+    window_suffix,
+)
+
+
+@pytest.mark.unit
+def test_rolling_statistics_match_windowed_reference() -> None:
+    """Verify the incremental statistics match a direct computation over the window."""
+    rng = np.random.default_rng(5)
+    window_sec = 10.0
+    samples = [(float(timestamp), float(rng.normal(-30, 2))) for timestamp in range(100)]
+    statistics = RollingWindowStatistics(window_sec)
+
+    for index, (timestamp, value) in enumerate(samples):
+        statistics.add(timestamp, value)
+        window = np.array(
+            [sample for time, sample in samples[: index + 1] if time >= timestamp - window_sec]
+        )
+        assert statistics.count == window.size
+        assert statistics.mean == pytest.approx(window.mean())
+        assert statistics.min == window.min()
+        assert statistics.max == window.max()
+        assert statistics.std == pytest.approx(window.std(), abs=1e-9)
+
+
+@pytest.mark.unit
+def test_rolling_statistics_empty_window_is_nan() -> None:
+    """Verify the statistics are NaN before any sample is added."""
+    statistics = RollingWindowStatistics(60)
+    assert all(
+        math.isnan(value)
+        for value in (statistics.mean, statistics.min, statistics.max, statistics.std)
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "window_sec, expected_suffix", [(30, "30s"), (60, "1m"), (90, "90s"), (7200, "2h")]
+)
+def test_window_suffix(window_sec: int, expected_suffix: str) -> None:
+    """Verify window lengths are labelled with the largest whole unit."""
+    assert window_suffix(window_sec) == expected_suffix
+
+
+@pytest.mark.unit
+def test_sensor_statistics_updates_keyed_by_state_key() -> None:
+    """Verify a register sample updates all statistics of each of its windows."""
+    statistics = SensorStatistics(["reg_a"], [60, 300])
+
+    updates = statistics.add("reg_a", 2.0, 1000.0)
+
+    assert set(updates) == {key for key, *_ in statistics.state_keys()}
+    assert updates["reg_a_mean_1m"] == 2.0
+    assert updates["reg_a_std_5m"] == 0.0
+    assert not statistics.add("reg_b", 2.0, 1000.0)
+    assert not statistics.add("reg_a", None, 1001.0)
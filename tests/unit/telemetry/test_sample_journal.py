@@ -0,0 +1,112 @@
+"""Test the memory-mapped on-disk sample journal."""
+
+import errno
+import logging
+import math
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from ska_mid_dish_b5dc_proxy.telemetry.sample_journal import (
+    MAX_QUEUED_SAMPLES,
+    RECORD,
+    SEGMENT_HEADER,
+    SampleJournal,
+    read_journal,
+)
+from ska_mid_dish_b5dc_proxy.telemetry.sensor_history import SampleQuality
+
+LOGGER = logging.getLogger(__name__)
+
+
+@pytest.mark.unit
+def test_sample_journal_round_trip(tmp_path: str) -> None:
+    """Verify journaled samples are read back in order, including invalid samples."""
+    journal = SampleJournal(str(tmp_path), ["reg_a", "reg_b"], LOGGER)
+    journal.start()
+    journal.record("reg_a", 1.5, 1000.0, SampleQuality.VALID)
+    journal.record("reg_b", None, 1001.0, SampleQuality.INVALID)
+    journal.record("reg_a", 2, 1002.0, SampleQuality.VALID)
+    journal.close()
+
+    samples = list(read_journal(str(tmp_path)))
+    assert [(s.register_name, s.timestamp, s.quality) for s in samples] == [
+        ("reg_a", 1000.0, SampleQuality.VALID),
+        ("reg_b", 1001.0, SampleQuality.INVALID),
+        ("reg_a", 1002.0, SampleQuality.VALID),
+    ]
+    assert samples[0].value == 1.5
+    assert math.isnan(samples[1].value)
+    assert samples[2].value == 2.0
+
+
+@pytest.mark.unit
+def test_sample_journal_rotates_within_size_cap(tmp_path: str) -> None:
+    """Verify segments rotate and the oldest are removed to respect the size cap."""
+    records_per_segment = 4
+    segment_size = SEGMENT_HEADER.size + records_per_segment * RECORD.size
+    journal = SampleJournal(
+        str(tmp_path),
+        ["reg_a"],
+        LOGGER,
+        segment_size_bytes=segment_size,
+        max_size_bytes=3 * segment_size,
+    )
+    journal.start()
+    for sample in range(20):
+        journal.record("reg_a", float(sample), 1000.0 + sample, SampleQuality.VALID)
+    journal.close()
+
+    segments = [name for name in os.listdir(tmp_path) if name.endswith(".b5j")]
+    assert len(segments) == 3
+    values = [sample.value for sample in read_journal(str(tmp_path))]
+    # Only the newest three segments of four samples each are kept
+    assert values == [float(sample) for sample in range(8, 20)]
+
+
+@pytest.mark.unit
+def test_sample_journal_reader_stops_at_torn_record(tmp_path: str) -> None:
+    """Verify a record without its valid marker, as left by a crash, is not read."""
+    journal = SampleJournal(str(tmp_path), ["reg_a"], LOGGER)
+    journal.start()
+    for sample in range(3):
+        journal.record("reg_a", float(sample), 1000.0 + sample, SampleQuality.VALID)
+    journal.close()
+
+    (segment,) = [name for name in os.listdir(tmp_path) if name.endswith(".b5j")]
+    with open(os.path.join(tmp_path, segment), "r+b") as segment_file:
+        segment_file.seek(SEGMENT_HEADER.size + 2 * RECORD.size)
+        segment_file.write(b"\x00")
+
+    assert [sample.value for sample in read_journal(str(tmp_path))] == [0.0, 1.0]
+
+
+@pytest.mark.unit
+def test_sample_journal_rejects_segment_larger_than_cap(tmp_path: str) -> None:
+    """Verify the size cap must allow for at least one segment."""
+    with pytest.raises(ValueError):
+        SampleJournal(
+            str(tmp_path), ["reg_a"], LOGGER, segment_size_bytes=2048, max_size_bytes=1024
+        )
+
+
+@pytest.mark.unit
+def test_sample_journal_stops_when_segment_can_not_be_allocated(tmp_path: str) -> None:
+    """Verify a full disk stops the writer and close does not wait on its full queue."""
+    journal = SampleJournal(str(tmp_path), ["reg_a"], LOGGER)
+    with patch(
+        "ska_mid_dish_b5dc_proxy.telemetry.sample_journal.os.posix_fallocate",
+        side_effect=OSError(errno.ENOSPC, "No space left on device"),
+    ):
+        journal.start()
+        journal._writer_thread.join(5)  # pylint: disable=protected-access
+    for sample in range(MAX_QUEUED_SAMPLES + 1):
+        journal.record("reg_a", float(sample), 1000.0 + sample, SampleQuality.VALID)
+
+    started = time.monotonic()
+    journal.close(timeout=2.0)
+    assert time.monotonic() - started < 1.0
+    assert journal.dropped_samples == 1
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".b5j")]
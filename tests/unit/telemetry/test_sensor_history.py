@@ -0,0 +1,47 @@
+"""Test the in-memory sensor history ring buffers."""
+
+import numpy as np
+import pytest
+
+from ska_mid_dish_b5dc_proxy.telemetry.sensor_history import SampleQuality, SensorHistory
+
+
+@pytest.mark.unit
+def test_sensor_history_returns_latest_samples_oldest_first() -> None:
+    """Verify the latest samples are returned in order once the buffer has wrapped."""
+    history = SensorHistory(["reg_a", "reg_b"], depth=4)
+    for sample in range(6):
+        history.append("reg_a", float(sample), 1000.0 + sample)
+    history.append("reg_b", 42.0, 2000.0)
+
+    values, timestamps, quality = history.latest("reg_a", 3)
+    assert values.tolist() == [3.0, 4.0, 5.0]
+    assert timestamps.tolist() == [1003.0, 1004.0, 1005.0]
+    assert quality.tolist() == [SampleQuality.VALID] * 3
+
+    values, _, _ = history.latest("reg_a", 10)
+    assert values.tolist() == [2.0, 3.0, 4.0, 5.0]
+
+    values, _, _ = history.latest("reg_b", 10)
+    assert values.tolist() == [42.0]
+
+
+@pytest.mark.unit
+def test_sensor_history_records_invalid_samples() -> None:
+    """Verify failed reads and non numeric values are kept as NaN samples."""
+    history = SensorHistory(["reg_a"], depth=4)
+    history.append("reg_a", None, 1000.0, SampleQuality.INVALID)
+    history.append("reg_a", 1.5, 1001.0)
+
+    values, _, quality = history.latest("reg_a", 2)
+    assert np.isnan(values[0])
+    assert values[1] == 1.5
+    assert quality.tolist() == [SampleQuality.INVALID, SampleQuality.VALID]
+
+
+@pytest.mark.unit
+def test_sensor_history_rejects_unknown_register() -> None:
+    """Verify requesting history of an unknown register raises ValueError."""
+    history = SensorHistory(["reg_a"], depth=4)
+    with pytest.raises(ValueError):
+        history.latest("reg_b", 1)
@@ -0,0 +1,59 @@
+"""Test the versioned sensor store."""
+
+import math
+
+import pytest
+
+from ska_mid_dish_b5dc_proxy.telemetry.sensor_history import SampleQuality
+from ska_mid_dish_b5dc_proxy.telemetry.sensor_store import SensorStore
+
+
+@pytest.mark.unit
+def test_sensor_store_reads_written_samples() -> None:
+    """Verify written samples are read back, a failed read keeping the last value."""
+    store = SensorStore(["reg_a", "reg_b"], initial_values={"reg_b": 3})
+    assert store.read("reg_b")[0] == 3.0
+
+    assert store.write("reg_a", 1.5, 1000.0)
+    assert store.read("reg_a") == (1.5, 1000.0, SampleQuality.VALID)
+
+    assert store.write("reg_a", None, 1001.0, SampleQuality.INVALID)
+    assert store.read("reg_a") == (1.5, 1001.0, SampleQuality.INVALID)
+
+    store.write("reg_b", "not a number", 1002.0)
+    assert math.isnan(store.value("reg_b"))
+
+    with pytest.raises(ValueError):
+        store.slot("reg_c")
+
+
+@pytest.mark.unit
+def test_sensor_store_tracks_changes_by_generation() -> None:
+    """Verify the generation only advances on a change and changed registers are listed."""
+    store = SensorStore(["reg_a", "reg_b", "reg_c"])
+    start = store.generation
+
+    store.write("reg_a", 1.0, 1000.0)
+    store.write("reg_c", 2.0, 1000.0)
+    assert store.changed_since(start) == ["reg_a", "reg_c"]
+
+    checkpoint = store.generation
+    assert not store.write("reg_a", 1.0, 1001.0)
+    assert store.generation == checkpoint
+    assert store.changed_since(checkpoint) == []
+
+    store.write("reg_c", math.nan, 1002.0)
+    assert not store.write("reg_c", math.nan, 1003.0)
+    assert store.changed_since(checkpoint) == ["reg_c"]
+
+
+@pytest.mark.unit
+def test_sensor_store_valid_values_masks_invalid_samples() -> None:
+    """Verify the snapshot of valid values is NaN for invalid samples."""
+    store = SensorStore(["reg_a", "reg_b"])
+    store.write("reg_a", 1.0, 1000.0)
+    store.write("reg_b", None, 1000.0, SampleQuality.INVALID)
+
+    values = store.valid_values()
+    assert values[0] == 1.0
+    assert math.isnan(values[1])
@@ -0,0 +1,35 @@
+"""Test the creation of the connection event loops."""
+
+import asyncio
+import sys
+from unittest.mock import Mock, patch
+
+import pytest
+
+from ska_mid_dish_b5dc_proxy.transport.event_loops import new_event_loop
+
+
+@pytest.mark.unit
+def test_uvloop_event_loop_created_when_installed() -> None:
+    """Verify uvloop is used when it is installed and selected."""
+    uvloop = pytest.importorskip("uvloop")
+    loop = new_event_loop("uvloop")
+    try:
+        assert isinstance(loop, uvloop.Loop)
+        assert loop.run_until_complete(asyncio.sleep(0, result=1)) == 1
+    finally:
+        loop.close()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("implementation", ["asyncio", "uvloop", "other"])
+def test_event_loop_falls_back_to_asyncio(implementation: str) -> None:
+    """Verify the default loop is used when selected or when uvloop is unavailable."""
+    logger = Mock()
+    with patch.dict(sys.modules, {"uvloop": None}):
+        loop = new_event_loop(implementation, logger)
+    try:
+        assert isinstance(loop, asyncio.SelectorEventLoop)
+        assert logger.warning.called == (implementation != "asyncio")
+    finally:
+        loop.close()
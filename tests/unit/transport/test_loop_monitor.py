@@ -0,0 +1,50 @@
+"""Test the event loop health checks."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from ska_mid_dish_b5dc_proxy.transport.loop_monitor import LoopLagProbe, RestartBackoff
+
+
+@pytest.mark.unit
+def test_loop_lag_probe_reports_stuck_loop() -> None:
+    """Verify the probe measures a running loop and reports a growing lag when it is stuck."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    probe = LoopLagProbe(loop)
+
+    probe.probe()
+    time.sleep(0.05)
+    assert probe.probe() < 0.05
+
+    # Block the loop thread
+    unblock = threading.Event()
+    loop.call_soon_threadsafe(unblock.wait)
+    time.sleep(0.05)
+    probe.probe()
+    time.sleep(0.2)
+    assert probe.probe() >= 0.2
+
+    unblock.set()
+    time.sleep(0.05)
+    assert probe.probe() >= 0.2
+    time.sleep(0.05)
+    assert probe.probe() < 0.2
+
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+@pytest.mark.unit
+def test_restart_backoff_doubles_up_to_the_maximum() -> None:
+    """Verify the restart delay doubles up to its bound and resets once healthy."""
+    backoff = RestartBackoff(1.0, 5.0)
+    assert [backoff.next_delay() for _ in range(5)] == [1.0, 2.0, 4.0, 5.0, 5.0]
+    assert backoff.restarts == 5
+    backoff.reset()
+    assert backoff.next_delay() == 1.0
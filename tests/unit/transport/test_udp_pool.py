@@ -0,0 +1,210 @@
+"""Test the shared event loop and pooled UDP transports."""
+
+# pylint: disable=protected-access
+import asyncio
+import threading
+from asyncio import DatagramProtocol
+from typing import Any, List, Tuple
+
+import pytest
+
+from ska_mid_dish_b5dc_proxy.transport.event_loops import new_event_loop
+from ska_mid_dish_b5dc_proxy.transport.shared_loop import SharedEventLoop
+from ska_mid_dish_b5dc_proxy.transport.udp_pool import UdpTransportPool
+
+
+class EchoServer(DatagramProtocol):
+    """UDP server replying to each datagram with its name and the datagram."""
+
+    def __init__(self, name: bytes) -> None:
+        """Initialise the server with the name prefixed to its replies."""
+        self.name = name
+        self.transport: Any = None
+
+    def connection_made(self, transport: Any) -> None:
+        """Keep the server transport."""
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr: Any) -> None:
+        """Reply to the sender."""
+        self.transport.sendto(self.name + b":" + data, addr)
+
+
+class RecordingClient(DatagramProtocol):
+    """Client protocol recording the datagrams received and whether the connection closed."""
+
+    def __init__(self) -> None:
+        """Initialise the client."""
+        self.received: List[bytes] = []
+        self.errors: List[Exception] = []
+        self.closed = False
+
+    def datagram_received(self, data: bytes, addr: Any) -> None:
+        """Record the datagram."""
+        self.received.append(data)
+
+    def error_received(self, exc: Exception) -> None:
+        """Record the error."""
+        self.errors.append(exc)
+
+    def connection_lost(self, exc: Any) -> None:
+        """Record the connection closing."""
+        self.closed = True
+
+
+async def start_echo_server(name: bytes) -> Tuple[Any, Tuple[str, int]]:
+    """Start an echo server on a free local port."""
+    transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+        lambda: EchoServer(name), local_addr=("127.0.0.1", 0)
+    )
+    return transport, transport.get_extra_info("sockname")
+
+
+@pytest.mark.unit
+def test_udp_pool_routes_datagrams_by_server_address() -> None:
+    """Verify connections share pooled sockets and each receives only its own replies."""
+
+    async def exchange() -> None:
+        pool = UdpTransportPool(asyncio.get_running_loop())
+        server_a, addr_a = await start_echo_server(b"a")
+        server_b, addr_b = await start_echo_server(b"b")
+
+        transport_a, client_a = await pool.create_endpoint(RecordingClient, addr_a)
+        transport_b, client_b = await pool.create_endpoint(RecordingClient, addr_b)
+        # A second connection to the same server, as for the command lane
+        transport_a2, client_a2 = await pool.create_endpoint(RecordingClient, addr_a)
+        assert pool.socket_count == 2
+
+        transport_a.sendto(b"1")
+        transport_b.sendto(b"2")
+        transport_a2.sendto(b"3")
+        await asyncio.sleep(0.1)
+        assert client_a.received == [b"a:1"]
+        assert client_b.received == [b"b:2"]
+        assert client_a2.received == [b"a:3"]
+
+        transport_b.close()
+        await asyncio.sleep(0)
+        assert client_b.closed
+        transport_b.sendto(b"4")
+
+        pool.close()
+        await asyncio.sleep(0.1)
+        assert client_a.closed and client_a2.closed
+        assert client_b.received == [b"b:2"]
+        server_a.close()
+        server_b.close()
+
+    asyncio.run(exchange())
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("implementation", ["asyncio", "uvloop"])
+def test_udp_pool_passes_send_error_only_to_failing_connection(implementation: str) -> None:
+    """Verify a failed send is reported to its connection and not the others on the socket."""
+
+    async def exchange() -> None:
+        pool = UdpTransportPool(asyncio.get_running_loop())
+        server_a, addr_a = await start_echo_server(b"a")
+        server_b, addr_b = await start_echo_server(b"b")
+
+        transport_a, client_a = await pool.create_endpoint(RecordingClient, addr_a)
+        transport_b, client_b = await pool.create_endpoint(RecordingClient, addr_b)
+        assert pool.socket_count == 1
+
+        # Larger than a UDP datagram can be, so the send fails
+        transport_a.sendto(bytes(70000))
+        transport_b.sendto(b"1")
+        await asyncio.sleep(0.1)
+        assert [type(error) for error in client_a.errors] == [OSError]
+        assert client_b.errors == []
+        assert client_b.received == [b"b:1"]
+
+        pool.close()
+        server_a.close()
+        server_b.close()
+
+    loop = new_event_loop(implementation)
+    try:
+        loop.run_until_complete(exchange())
+    finally:
+        loop.close()
+
+
+@pytest.mark.unit
+def test_shared_event_loop_stops_after_last_release() -> None:
+    """Verify the shared loop is started once and stopped when its last user releases it."""
+    shared_loop = SharedEventLoop()
+    loop, thread, pool = shared_loop.acquire()
+    assert shared_loop.acquire() == (loop, thread, pool)
+    assert thread.is_alive() and shared_loop.users == 2
+
+    shared_loop.release()
+    assert thread.is_alive()
+    shared_loop.release()
+    assert not thread.is_alive()
+    assert loop.is_closed()
+
+    new_loop, new_thread, _ = shared_loop.acquire()
+    assert new_loop is not loop and new_thread.is_alive()
+    shared_loop.release()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("implementation", ["asyncio", "uvloop"])
+def test_shared_event_loop_release_closes_pooled_sockets(implementation: str) -> None:
+    """Verify the last release closes the pooled sockets before stopping the loop."""
+    shared_loop = SharedEventLoop()
+    loop, _, pool = shared_loop.acquire(implementation)
+    _, client = asyncio.run_coroutine_threadsafe(
+        pool.create_endpoint(RecordingClient, ("127.0.0.1", 9)), loop
+    ).result()
+    pooled_socket = pool._sockets[0].transport.get_extra_info("socket")
+
+    shared_loop.release()
+    assert client.closed
+    assert pooled_socket.fileno() == -1
+
+
+@pytest.mark.unit
+def test_shared_event_loop_restart_replaces_failed_loop_once() -> None:
+    """Verify the first user reporting a failed loop replaces it for every user."""
+    shared_loop = SharedEventLoop()
+    loop, thread, _ = shared_loop.acquire()
+    shared_loop.acquire()
+
+    new_loop, new_thread, _ = shared_loop.restart(loop)
+    assert new_loop is not loop and new_thread.is_alive()
+    thread.join(1.0)
+    assert not thread.is_alive()
+    assert shared_loop.restart(loop)[0] is new_loop
+
+    shared_loop.release()
+    shared_loop.release()
+    assert not new_thread.is_alive()
+
+
+@pytest.mark.unit
+def test_shared_event_loop_closes_abandoned_loop_once_stopped() -> None:
+    """Verify a stuck loop replaced by restart is closed with its pool once it stops."""
+    shared_loop = SharedEventLoop()
+    loop, thread, pool = shared_loop.acquire()
+    _, client = asyncio.run_coroutine_threadsafe(
+        pool.create_endpoint(RecordingClient, ("127.0.0.1", 9)), loop
+    ).result()
+    pooled_socket = pool._sockets[0].transport.get_extra_info("socket")
+    unstuck = threading.Event()
+    loop.call_soon_threadsafe(unstuck.wait, 5.0)
+
+    new_loop, _, _ = shared_loop.restart(loop)
+    shared_loop.close_abandoned_loops()
+    assert not loop.is_closed() and not client.closed
+
+    unstuck.set()
+    thread.join(1.0)
+    shared_loop.close_abandoned_loops()
+    assert loop.is_closed()
+    assert client.closed
+    assert pooled_socket.fileno() == -1
+    assert not new_loop.is_closed()
+    shared_loop.release()